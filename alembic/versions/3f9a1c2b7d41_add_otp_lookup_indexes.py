@@ -0,0 +1,31 @@
+"""Add OTP lookup indexes
+
+Revision ID: 3f9a1c2b7d41
+Revises:
+Create Date: 2026-10-16
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '3f9a1c2b7d41'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+# startup.sh runs this chain before the app starts, so on a fresh database the
+# tables don't exist yet; Base.metadata.create_all then builds them with their
+# current indexes. Each revision therefore skips tables that aren't there yet.
+
+
+def upgrade():
+    if not sa.inspect(op.get_bind()).has_table("otps"):
+        return
+    op.execute("CREATE INDEX IF NOT EXISTS ix_otp_phone_code ON otps (phone, otp)")
+    op.execute("CREATE INDEX IF NOT EXISTS ix_otp_email_code ON otps (email, otp)")
+    op.execute("CREATE INDEX IF NOT EXISTS ix_otp_expires ON otps (expires_at)")
+
+
+def downgrade():
+    op.execute("DROP INDEX IF EXISTS ix_otp_expires")
+    op.execute("DROP INDEX IF EXISTS ix_otp_email_code")
+    op.execute("DROP INDEX IF EXISTS ix_otp_phone_code")
@@ -0,0 +1,27 @@
+"""Index per-leg payment transaction IDs for callback lookups
+
+Revision ID: 5d8f2a9c6e34
+Revises: c71d09e5a2f8
+Create Date: 2026-10-16
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '5d8f2a9c6e34'
+down_revision = 'c71d09e5a2f8'
+branch_labels = None
+depends_on = None
+
+_COLUMNS = ("ctm_transaction_id", "mtc_transaction_id", "atp_transaction_id", "blp_transaction_id")
+
+
+def upgrade():
+    if not sa.inspect(op.get_bind()).has_table("payment"):
+        return
+    for column in _COLUMNS:
+        op.execute(f"CREATE INDEX IF NOT EXISTS ix_payment_{column} ON payment ({column})")
+
+
+def downgrade():
+    for column in _COLUMNS:
+        op.execute(f"DROP INDEX IF EXISTS ix_payment_{column}")
@@ -0,0 +1,35 @@
+"""Enforce one OTP per phone/email for upserts
+
+Revision ID: 8b2e4d6f0a13
+Revises: 3f9a1c2b7d41
+Create Date: 2026-10-16
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '8b2e4d6f0a13'
+down_revision = '3f9a1c2b7d41'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if not sa.inspect(op.get_bind()).has_table("otps"):
+        return
+    # Keep only the newest OTP per target before adding the unique indexes.
+    op.execute("DELETE FROM otps a USING otps b WHERE a.phone = b.phone AND a.id < b.id")
+    op.execute("DELETE FROM otps a USING otps b WHERE a.email = b.email AND a.id < b.id")
+    op.execute("CREATE UNIQUE INDEX IF NOT EXISTS uq_otp_phone ON otps (phone)")
+    op.execute("CREATE UNIQUE INDEX IF NOT EXISTS uq_otp_email ON otps (email)")
+    # Superseded by the unique indexes above.
+    op.execute("DROP INDEX IF EXISTS ix_otp_phone_code")
+    op.execute("DROP INDEX IF EXISTS ix_otp_email_code")
+
+
+def downgrade():
+    if not sa.inspect(op.get_bind()).has_table("otps"):
+        return
+    op.execute("CREATE INDEX IF NOT EXISTS ix_otp_phone_code ON otps (phone, otp)")
+    op.execute("CREATE INDEX IF NOT EXISTS ix_otp_email_code ON otps (email, otp)")
+    op.execute("DROP INDEX IF EXISTS uq_otp_email")
+    op.execute("DROP INDEX IF EXISTS uq_otp_phone")
@@ -0,0 +1,23 @@
+"""Index payment.original_payment_id for the reversal idempotency lookup
+
+Revision ID: 9a3c5e7f1b26
+Revises: 5d8f2a9c6e34
+Create Date: 2026-10-16
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '9a3c5e7f1b26'
+down_revision = '5d8f2a9c6e34'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if not sa.inspect(op.get_bind()).has_table("payment"):
+        return
+    op.execute("CREATE INDEX IF NOT EXISTS ix_payment_original_payment_id ON payment (original_payment_id)")
+
+
+def downgrade():
+    op.execute("DROP INDEX IF EXISTS ix_payment_original_payment_id")
@@ -0,0 +1,25 @@
+"""Trigram GIN index on billing.service_name for substring search
+
+Revision ID: a8c0e2b4d6f7
+Revises: f1a3c5e7b9d2
+Create Date: 2026-10-16
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'a8c0e2b4d6f7'
+down_revision = 'f1a3c5e7b9d2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Must precede the app's create_all, which also declares this index.
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    if not sa.inspect(op.get_bind()).has_table("billing"):
+        return
+    op.execute("CREATE INDEX IF NOT EXISTS ix_billing_service_name_trgm ON billing USING gin (service_name gin_trgm_ops)")
+
+
+def downgrade():
+    op.execute("DROP INDEX IF EXISTS ix_billing_service_name_trgm")
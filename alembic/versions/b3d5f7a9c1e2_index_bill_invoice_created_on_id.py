@@ -0,0 +1,26 @@
+"""Index billing and invoice on (created_on DESC, id DESC) for keyset pagination
+
+Revision ID: b3d5f7a9c1e2
+Revises: 9a3c5e7f1b26
+Create Date: 2026-10-16
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'b3d5f7a9c1e2'
+down_revision = '9a3c5e7f1b26'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    if inspector.has_table("billing"):
+        op.execute("CREATE INDEX IF NOT EXISTS ix_billing_created_on_id ON billing (created_on DESC, id DESC)")
+    if inspector.has_table("invoice"):
+        op.execute("CREATE INDEX IF NOT EXISTS ix_invoice_created_on_id ON invoice (created_on DESC, id DESC)")
+
+
+def downgrade():
+    op.execute("DROP INDEX IF EXISTS ix_invoice_created_on_id")
+    op.execute("DROP INDEX IF EXISTS ix_billing_created_on_id")
@@ -0,0 +1,30 @@
+"""Generated tsvector column and GIN index for billing.service_name word search
+
+Revision ID: c4e6a8b0d2f5
+Revises: a8c0e2b4d6f7
+Create Date: 2026-10-16
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'c4e6a8b0d2f5'
+down_revision = 'a8c0e2b4d6f7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if not sa.inspect(op.get_bind()).has_table("billing"):
+        return
+    op.execute(
+        "ALTER TABLE billing ADD COLUMN IF NOT EXISTS search_tsv tsvector "
+        "GENERATED ALWAYS AS (to_tsvector('simple', coalesce(service_name, ''))) STORED"
+    )
+    op.execute("CREATE INDEX IF NOT EXISTS ix_billing_search_tsv ON billing USING gin (search_tsv)")
+
+
+def downgrade():
+    if not sa.inspect(op.get_bind()).has_table("billing"):
+        return
+    op.execute("DROP INDEX IF EXISTS ix_billing_search_tsv")
+    op.execute("ALTER TABLE billing DROP COLUMN IF EXISTS search_tsv")
@@ -0,0 +1,28 @@
+"""Store OTP codes as HMAC-SHA256 digests
+
+Revision ID: c71d09e5a2f8
+Revises: 8b2e4d6f0a13
+Create Date: 2026-10-16
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'c71d09e5a2f8'
+down_revision = '8b2e4d6f0a13'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if not sa.inspect(op.get_bind()).has_table("otps"):
+        return
+    # Plaintext codes can no longer be verified; they expire within seconds anyway.
+    op.execute("DELETE FROM otps")
+    op.alter_column('otps', 'otp', type_=sa.String(64), existing_nullable=False)
+
+
+def downgrade():
+    if not sa.inspect(op.get_bind()).has_table("otps"):
+        return
+    op.execute("DELETE FROM otps")
+    op.alter_column('otps', 'otp', type_=sa.String(6), existing_nullable=False)
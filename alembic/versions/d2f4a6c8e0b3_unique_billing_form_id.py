@@ -0,0 +1,25 @@
+"""Enforce one bill per form_id for the ON CONFLICT insert
+
+Revision ID: d2f4a6c8e0b3
+Revises: b3d5f7a9c1e2
+Create Date: 2026-10-16
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'd2f4a6c8e0b3'
+down_revision = 'b3d5f7a9c1e2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if not sa.inspect(op.get_bind()).has_table("billing"):
+        return
+    # create_bill has always refused duplicate form_ids, so existing rows are left as-is;
+    # this fails loudly if a past race let one through.
+    op.execute("CREATE UNIQUE INDEX IF NOT EXISTS uq_billing_form_id ON billing (form_id)")
+
+
+def downgrade():
+    op.execute("DROP INDEX IF EXISTS uq_billing_form_id")
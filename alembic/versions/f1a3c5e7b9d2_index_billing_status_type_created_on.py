@@ -0,0 +1,25 @@
+"""Index billing on (status, created_on DESC) and (billing_type, created_on DESC)
+
+Revision ID: f1a3c5e7b9d2
+Revises: d2f4a6c8e0b3
+Create Date: 2026-10-16
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'f1a3c5e7b9d2'
+down_revision = 'd2f4a6c8e0b3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if not sa.inspect(op.get_bind()).has_table("billing"):
+        return
+    op.execute("CREATE INDEX IF NOT EXISTS ix_billing_status_created_on ON billing (status, created_on DESC)")
+    op.execute("CREATE INDEX IF NOT EXISTS ix_billing_billing_type_created_on ON billing (billing_type, created_on DESC)")
+
+
+def downgrade():
+    op.execute("DROP INDEX IF EXISTS ix_billing_billing_type_created_on")
+    op.execute("DROP INDEX IF EXISTS ix_billing_status_created_on")
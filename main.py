@@ -7,5 +7,7 @@ if __name__ == "__main__":
         "main:app",
         host="0.0.0.0",
         port=3090,
-        reload=settings.DEBUG
+        reload=settings.DEBUG,
+        # uvloop where installed (Linux/macOS), stdlib asyncio otherwise
+        loop="auto"
     )
\ No newline at end of file
@@ -1,15 +1,37 @@
 from fastapi import FastAPI
-from fastapi.responses import RedirectResponse
+from fastapi.responses import ORJSONResponse, RedirectResponse
 from another_fastapi_jwt_auth import AuthJWT
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic_settings import BaseSettings
+import logging
+import logging.config
 import sys
 import os
 
 # Add the current directory to Python path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
+from config import settings
+
+# Configure stdlib logging once, before any module logs at import time.
+logging.config.dictConfig({
+    "version": 1,
+    "disable_existing_loggers": False,
+    "formatters": {
+        "default": {"format": "%(asctime)s %(levelname)s %(name)s: %(message)s"},
+    },
+    "handlers": {
+        "console": {"class": "logging.StreamHandler", "formatter": "default"},
+    },
+    "root": {"level": settings.LOG_LEVEL, "handlers": ["console"]},
+    "loggers": {
+        name: {"level": settings.LOG_LIBRARY_LEVEL}
+        for name in ("sqlalchemy.engine", "urllib3", "httpx", "httpcore", "apscheduler")
+    },
+})
+
 import exceptions
+from utilities.jwt_middleware import JWTAuthMiddleware
 from routes import base_routes
 from core.auth.controller.authcontroller import auth_routes
 from core.user.controller.usercontroller import user_routes
@@ -18,7 +40,7 @@ from core.notification.controller.notificationcontroller import notification_rou
 from core.payments.controller.billcontroller import bill_routes
 from core.billing.controller.billing_controller import billing_routes
 from core.payments.controller.invoicecontroller import invoice_routes
-from core.payments.controller.paymentcontroller import payment_routes
+from core.payments.controller.paymentcontroller import payment_routes, PROTECTED_PATH_PREFIXES as PAYMENT_PROTECTED_PATHS
 from core.otp.controller.otpcontroller import otp_routes
 from core.subscription.controller.subscription_controller import subscription_routes
 from core.credits.controller.credit_controller import credit_routes
@@ -37,8 +59,8 @@ from core.interventions.controller.intervention_controller import intervention_r
 from core.conversationmanager.controller.conversation_controller import conversation_routes
 
 from utilities.dbconfig import Base, engine
-from config import settings
 from utilities.exceptions import DatabaseValidationError
+from utilities.paymentgatewayclient import PaymentGatewayException
 from fastapi.exceptions import RequestValidationError
 from sqlalchemy import inspect
 
@@ -54,8 +76,11 @@ async def lifespan(app: FastAPI):
     logger.info("[APP_STARTUP] Application starting...")
     try:
         import utilities.dbmodels  # noqa: F401 — register all ORM models
-        Base.metadata.create_all(bind=engine)
         from sqlalchemy import inspect, text
+        # The billing trigram index needs gin_trgm_ops before create_all can build the schema
+        with engine.begin() as conn:
+            conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        Base.metadata.create_all(bind=engine)
         from core.credits.service.credit_service import CreditService
         from utilities.dbconfig import SessionLocal
 
@@ -81,6 +106,16 @@ async def lifespan(app: FastAPI):
             db.close()
     except Exception as e:
         logger.warning(f"[APP_STARTUP] Credit table init skipped: {e}")
+    try:
+        from core.otp.service.otpservice import OTPService
+        OTPService.start_cleanup_scheduler()
+    except Exception as e:
+        logger.warning(f"[APP_STARTUP] OTP cleanup scheduler not started: {e}")
+    try:
+        from core.payments.service.payment_check_service import PaymentCheckService
+        PaymentCheckService.resume_pending_checks()
+    except Exception as e:
+        logger.warning(f"[APP_STARTUP] Pending payment checks not resumed: {e}")
     yield
     # Shutdown
     logger.info("[APP_SHUTDOWN] Application shutting down...")
@@ -89,6 +124,38 @@ async def lifespan(app: FastAPI):
         PaymentCheckService.shutdown_scheduler()
     except Exception as e:
         logger.error(f"[APP_SHUTDOWN_ERROR] Error shutting down scheduler: {str(e)}")
+    try:
+        from core.otp.service.otpservice import OTPService
+        OTPService.shutdown_cleanup_scheduler()
+    except Exception as e:
+        logger.error(f"[APP_SHUTDOWN_ERROR] Error shutting down OTP cleanup scheduler: {str(e)}")
+    try:
+        from core.wirepick.service.wirepickservice import close_async_client
+        await close_async_client()
+    except Exception as e:
+        logger.error(f"[APP_SHUTDOWN_ERROR] Error closing SMS client: {str(e)}")
+    try:
+        from core.otp.service.otp_rate_limiter import otp_rate_limiter
+        await otp_rate_limiter.close()
+    except Exception as e:
+        logger.error(f"[APP_SHUTDOWN_ERROR] Error closing OTP rate limiter: {str(e)}")
+    try:
+        from core.payments.service.payment_cache import payment_cache
+        await payment_cache.close()
+    except Exception as e:
+        logger.error(f"[APP_SHUTDOWN_ERROR] Error closing payment cache: {str(e)}")
+    try:
+        from utilities.paymentgatewayclient import get_payment_gateway_client
+        if get_payment_gateway_client.cache_info().currsize:
+            get_payment_gateway_client().close()
+            await get_payment_gateway_client().aclose()
+    except Exception as e:
+        logger.error(f"[APP_SHUTDOWN_ERROR] Error closing payment gateway client: {str(e)}")
+    try:
+        from utilities.dbconfig import async_engine
+        await async_engine.dispose()
+    except Exception as e:
+        logger.error(f"[APP_SHUTDOWN_ERROR] Error disposing async database engine: {str(e)}")
 
 
 app = FastAPI(
@@ -110,6 +177,7 @@ app = FastAPI(
     license_info={
         "name": "MIT",
     },
+    default_response_class=ORJSONResponse,
     lifespan=lifespan
 )
 
@@ -131,8 +199,13 @@ async def swagger_redirect():
 
 
 # -----------------------------------------------------------
-# Middleware (CORS)
+# Middleware (JWT, CORS)
 # -----------------------------------------------------------
+# Added before CORS so CORS stays outermost and 401 responses carry CORS headers.
+app.add_middleware(
+    JWTAuthMiddleware,
+    path_prefixes=tuple(f"/api/v1/payment{path}" for path in PAYMENT_PROTECTED_PATHS),
+)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -146,6 +219,7 @@ app.add_middleware(
 
 app.add_exception_handler(DatabaseValidationError, exceptions.database_validation_exception_handler)
 app.add_exception_handler(RequestValidationError, exceptions.validation_exception_handler)
+app.add_exception_handler(PaymentGatewayException, exceptions.payment_gateway_exception_handler)
 
 # Routes Registration
 
@@ -80,6 +80,20 @@ class Settings(BaseSettings):
     OTP_EXPIRE_SECONDS: int = int(os.environ.get("OTP_EXPIRE_SECONDS", 30))
     # Backward-compatible minutes value for any legacy call sites.
     OTP_EXPIRE_MINUTES: float = OTP_EXPIRE_SECONDS / 60
+    # How often expired OTP rows are purged by the background cleanup job.
+    OTP_CLEANUP_INTERVAL_MINUTES: int = int(os.environ.get("OTP_CLEANUP_INTERVAL_MINUTES", 5))
+    # Secret mixed into stored OTP hashes; falls back to SECRET_KEY when unset.
+    OTP_PEPPER: str = os.environ.get("OTP_PEPPER", "")
+    # Rate limits (fixed windows, tracked in Redis) for /otp/send and /otp/verify.
+    OTP_SEND_LIMIT: int = int(os.environ.get("OTP_SEND_LIMIT", 1))
+    OTP_SEND_WINDOW_SECONDS: int = int(os.environ.get("OTP_SEND_WINDOW_SECONDS", 60))
+    OTP_VERIFY_LIMIT: int = int(os.environ.get("OTP_VERIFY_LIMIT", 5))
+    OTP_VERIFY_WINDOW_SECONDS: int = int(os.environ.get("OTP_VERIFY_WINDOW_SECONDS", 300))
+    # Per client IP, applied per endpoint within the same windows as above.
+    OTP_IP_RATE_LIMIT: int = int(os.environ.get("OTP_IP_RATE_LIMIT", 20))
+    # Consecutive failed verifications before a phone/email is locked out.
+    OTP_MAX_FAILED_VERIFICATIONS: int = int(os.environ.get("OTP_MAX_FAILED_VERIFICATIONS", 5))
+    OTP_LOCKOUT_SECONDS: int = int(os.environ.get("OTP_LOCKOUT_SECONDS", 900))
 
     # MongoDB Logging
     MONGO_URI: str = os.environ.get('MONGO_URI', 'mongodb://localhost:27017/')
@@ -87,6 +101,8 @@ class Settings(BaseSettings):
     
     # Logging levels
     LOG_LEVEL: str = os.environ.get('LOG_LEVEL', 'INFO')
+    # Level for chatty third-party loggers (SQL echo, per-request HTTP client lines)
+    LOG_LIBRARY_LEVEL: str = os.environ.get('LOG_LIBRARY_LEVEL', 'WARNING')
 
     # Comma-separated users.id values that receive admin inbox notifications
     ADMIN_NOTIFICATION_USER_IDS: str = os.environ.get("ADMIN_NOTIFICATION_USER_IDS", "")
@@ -1,10 +1,9 @@
 from fastapi import APIRouter, Depends, HTTPException
 from another_fastapi_jwt_auth import AuthJWT
-from another_fastapi_jwt_auth.exceptions import MissingTokenError
-import jwt
 from sqlalchemy.orm import Session
 from core.agent.dto.commandreqeust import CommandRequest
-from utilities.dbconfig import SessionLocal
+from utilities.dbconfig import get_db
+from utilities.deps import validate_token
 from core.agent.agent import AutoBus
 from core.agent.dto.media_generation_request import MediaGenerationRequest
 from core.credits.model.credit_types import CreditType
@@ -14,7 +13,6 @@ from core.user.service.user_service import UserService
 from core.media.dto.media_generation_response import ImageGenerationResponse, VideoGenerationResponse
 import logging
 
-logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
 # Lazy initialization - only create the agent when first needed
@@ -28,34 +26,6 @@ def get_autobus_agent():
         _autobus_agent_instance = AutoBus()
     return _autobus_agent_instance
 
-def validate_token(authjwt: AuthJWT = Depends()):
-    try:
-        authjwt.jwt_required()
-        return authjwt
-    except jwt.ExpiredSignatureError:
-        raise HTTPException(
-            status_code=401, 
-            detail="Token expired. Please log in again."
-        )
-    except MissingTokenError:
-        raise HTTPException(
-            status_code=401,
-            detail="No token found. Please create an account and log in.",
-        )
-    except Exception as e:
-        logger.error(f"Token validation error: {str(e)}", exc_info=True)
-        raise HTTPException(
-            status_code=401,
-            detail=f"Invalid token: {str(e)}"
-        )
-    
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-    
 agent_routes = APIRouter()
 
 @agent_routes.post("/command")
@@ -1,7 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException, Form
 from another_fastapi_jwt_auth import AuthJWT
-from another_fastapi_jwt_auth.exceptions import MissingTokenError
-import jwt
 from sqlalchemy.orm import Session
 from core.auth.service.sessiondriver import SessionDriver, TokenData
 from core.exceptions import *
@@ -13,43 +11,13 @@ from core.auth.dto.request.otp_verify import OTPVerifyRequest
 from core.auth.service.authservice import AuthService
 from core.exceptions.AuthException import InvalidCredentialsError
 from core.exceptions.UserException import UserAlreadyExistsError
-from utilities.dbconfig import SessionLocal
+from utilities.dbconfig import get_db
+from utilities.deps import validate_token
 import logging
 
-logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
 
-def validate_token(authjwt: AuthJWT = Depends()):
-    try:
-        authjwt.jwt_required()
-        return authjwt
-    except jwt.ExpiredSignatureError:
-        raise HTTPException(
-            status_code=401,
-            detail="Token expired. Please log in again."
-        )
-    except MissingTokenError:
-        raise HTTPException(
-            status_code=401,
-            detail="No token found. Please create an account and log in.",
-        )
-    except Exception as e:
-        logger.error(f"Token validation error: {str(e)}", exc_info=True)
-        raise HTTPException(
-            status_code=401,
-            detail=f"Invalid token: {str(e)}"
-        )
-
-
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
-
 auth_routes = APIRouter()
 
 
@@ -9,8 +9,6 @@ import logging
 from config import settings
 import redis
 import json
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 class TokenData(BaseModel):
@@ -47,7 +47,6 @@ from core.user.service.user_service import UserService
 from core.rag.rag_index_job_store import RagIndexJobStore
 from core.rag.rag_index_service import RagIndexService
 
-logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
 # Reuse your existing token validation and DB dependencies
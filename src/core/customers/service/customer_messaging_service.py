@@ -14,7 +14,7 @@ from core.customers.dto.customer_dto import (
 )
 from core.customers.service.customer_service import CustomerService
 from core.customers.utility.network_detector import Network
-from core.wirepick.service.wirepickservice import WirepickSMSService, WirepickSMSException
+from core.wirepick.service.wirepickservice import WirepickSMSException, wirepick_sms_service
 
 logger = logging.getLogger(__name__)
 
@@ -27,7 +27,7 @@ class CustomerMessagingService:
     def __init__(self, db: Session):
         self.db = db
         self.customer_service = CustomerService(db)
-        self.sms_service = WirepickSMSService()
+        self.sms_service = wirepick_sms_service
 
     def send_sms(
         self,
@@ -3,6 +3,8 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+_NON_DIGITS = re.compile(r'\D')
+
 
 class Network:
     """Network type enumeration"""
@@ -109,7 +111,7 @@ class NetworkDetector:
             return None, "Phone number cannot be empty"
 
         # Remove any non-digit characters
-        cleaned = re.sub(r'\D', '', phone)
+        cleaned = _NON_DIGITS.sub('', phone)
 
         if not cleaned:
             logger.warning(f"[NETWORK_DETECTOR] No valid digits in phone number: {phone}")
@@ -131,17 +133,12 @@ class NetworkDetector:
 
         logger.info(f"[NETWORK_DETECTOR] Detecting network from phone: {phone} -> prefix: {prefix}")
 
-        # Check against all network prefixes
-        for network, prefixes in NetworkDetector.NETWORK_PREFIXES.items():
-            if prefix in prefixes:
-                network_name = {
-                    Network.MTN: "MTN",
-                    Network.VOD: "Vodafone",
-                    Network.AIR: "AirtelTigo",
-                }.get(network, network)
-                
-                logger.info(f"[NETWORK_DETECTOR] Detected network: {network_name}")
-                return network, network_name
+        # Constant-time lookup in the prefix table built from NETWORK_PREFIXES
+        network = _NETWORK_BY_PREFIX.get(prefix)
+        if network is not None:
+            network_name = _NETWORK_NAMES.get(network, network)
+            logger.info(f"[NETWORK_DETECTOR] Detected network: {network_name}")
+            return network, network_name
 
         # Unknown prefix
         logger.warning(f"[NETWORK_DETECTOR] Unknown network prefix: {prefix}")
@@ -287,4 +284,17 @@ class NetworkDetector:
             True if valid Ghana mobile number, False otherwise
         """
         network, _ = NetworkDetector.detect_network_from_phone(phone)
-        return network is not None
\ No newline at end of file
+        return network is not None
+
+
+# Prefix -> network table and display names, built once from NETWORK_PREFIXES
+_NETWORK_BY_PREFIX = {
+    prefix: network
+    for network, prefixes in NetworkDetector.NETWORK_PREFIXES.items()
+    for prefix in prefixes
+}
+_NETWORK_NAMES = {
+    Network.MTN: "MTN",
+    Network.VOD: "Vodafone",
+    Network.AIR: "AirtelTigo",
+}
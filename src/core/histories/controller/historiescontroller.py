@@ -24,7 +24,6 @@ from core.notification.dto.response.message_response import MessageResponse
 from core.notification.service.notification_service import NotificationService
 from another_fastapi_jwt_auth.exceptions import MissingTokenError
 
-logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
 # Reuse your existing token validation and DB dependencies
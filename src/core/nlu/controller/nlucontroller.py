@@ -11,18 +11,10 @@ from core.credits.model.credit_types import CreditType
 from core.credits.service.credit_service import CreditService
 from core.subscription.service.subscription_service import SubscriptionService
 from core.user.service.user_service import UserService
-from utilities.dbconfig import SessionLocal
+from utilities.dbconfig import SessionLocal, get_db
 
-logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
 # Initialize NLU system
 nlu_system = AutobusNLUSystem()
 
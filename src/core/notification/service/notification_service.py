@@ -6,7 +6,7 @@ from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
 from core.notification.model.Notification import Notification, NotificationStatus, NotificationType
 from core.user.model.User import User
-from core.wirepick.service.wirepickservice import WirepickSMSService, WirepickSMSException
+from core.wirepick.service.wirepickservice import WirepickSMSException, wirepick_sms_service
 from config import settings
 
 # DTO Models
@@ -21,7 +21,7 @@ logger = logging.getLogger(__name__)
 class NotificationService:
     def __init__(self, db: Session):
         self.db = db
-        self.sms_service = WirepickSMSService()
+        self.sms_service = wirepick_sms_service
         self.sms_enabled = getattr(settings, 'SMS_NOTIFICATION_ENABLED', True)
 
     def _format_sms_message(self, notification_type: NotificationType, data: dict) -> str:
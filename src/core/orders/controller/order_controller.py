@@ -13,7 +13,6 @@ from core.orders.dto.order_update_dto import OrderUpdateDTO
 from core.user.controller.usercontroller import validate_token, get_db
 from another_fastapi_jwt_auth import AuthJWT
 
-logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
 order_routes = APIRouter()
@@ -1,31 +1,57 @@
-from fastapi import APIRouter, Depends, HTTPException
+import asyncio
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.orm import Session
 from utilities.dbconfig import get_db
 from core.otp.service.otpservice import OTPService
+from core.otp.service.otp_rate_limiter import otp_rate_limiter
 from core.otp.dto.request.otp_send_request import OTPSendRequest
 from core.otp.dto.request.otp_verify_request import OTPVerifyRequest
 from core.otp.dto.response.otp_send_response import OTPSendResponse
 from core.otp.dto.response.otp_verify_response import OTPVerifyResponse
 from core.otp.dto.request.otp_test import OTPTest
+from core.wirepick.service.wirepickservice import PHONE_STRIP, WirepickSMSService, get_sms_service
 
 otp_routes = APIRouter()
 
 
+def get_otp_service(
+    db: Session = Depends(get_db),
+    sms_service: WirepickSMSService = Depends(get_sms_service),
+) -> OTPService:
+    return OTPService(db, sms_service)
+
+
+def _client_ip(http_request: Request) -> str:
+    return http_request.client.host if http_request.client else "unknown"
+
+
+def _rate_limit_identifier(phone: Optional[str], email: Optional[str]) -> str:
+    """Phone or email in the form OTPs are keyed by, so formatting variants share one limit."""
+    return phone.translate(PHONE_STRIP) if phone else (email or "").lower()
+
+
 @otp_routes.post("/send", response_model=OTPSendResponse)
-def send_otp(request: OTPSendRequest, db: Session = Depends(get_db)):
+async def send_otp(
+    request: OTPSendRequest,
+    http_request: Request,
+    otp_service: OTPService = Depends(get_otp_service),
+):
     """Send OTP to phone or email"""
-    otp_service = OTPService(db)
-    
     if not request.phone and not request.email:
         raise HTTPException(status_code=400, detail="Either phone or email must be provided")
     
     if request.phone and request.email:
         raise HTTPException(status_code=400, detail="Provide either phone or email, not both")
     
+    await otp_rate_limiter.check_send(_rate_limit_identifier(request.phone, request.email), _client_ip(http_request))
+    
     if request.phone:
-        result = otp_service.send_otp_phone(request.phone)
+        result = await otp_service.send_otp_phone_async(request.phone)
     else:
-        result = otp_service.send_otp_email(request.email)
+        # SMTP delivery is blocking; run it in a worker thread.
+        result = await asyncio.to_thread(otp_service.send_otp_email, request.email)
     
     if not result.success:
         raise HTTPException(status_code=500, detail=result.message)
@@ -34,25 +60,34 @@ def send_otp(request: OTPSendRequest, db: Session = Depends(get_db)):
 
 
 @otp_routes.post("/verify", response_model=OTPVerifyResponse)
-def verify_otp(request: OTPVerifyRequest, db: Session = Depends(get_db)):
+async def verify_otp(
+    request: OTPVerifyRequest,
+    http_request: Request,
+    otp_service: OTPService = Depends(get_otp_service),
+):
     """Verify OTP for phone or email"""
-    otp_service = OTPService(db)
-    
     if not request.phone and not request.email:
         raise HTTPException(status_code=400, detail="Either phone or email must be provided")
     
     if request.phone and request.email:
         raise HTTPException(status_code=400, detail="Provide either phone or email, not both")
     
-    is_valid = otp_service.validate_otp(
+    identifier = _rate_limit_identifier(request.phone, request.email)
+    await otp_rate_limiter.check_verify(identifier, _client_ip(http_request))
+    
+    is_valid = await asyncio.to_thread(
+        otp_service.validate_otp,
         phone=request.phone,
         email=request.email,
         otp=request.otp
     )
     
     if not is_valid:
+        await otp_rate_limiter.record_verify_failure(identifier)
         raise HTTPException(status_code=400, detail="Invalid or expired OTP")
     
+    await otp_rate_limiter.reset_verify_failures(identifier)
+    
     return {
         "success": True,
         "message": "OTP verified successfully"
@@ -61,12 +96,15 @@ def verify_otp(request: OTPVerifyRequest, db: Session = Depends(get_db)):
 # Add to your controller for testing
 
 @otp_routes.post("/test-sms")
-def test_sms(request: OTPTest, db: Session = Depends(get_db)):
+async def test_sms(
+    request: OTPTest,
+    http_request: Request,
+    sms_service: WirepickSMSService = Depends(get_sms_service),
+):
     """Test endpoint to debug SMS sending"""
-    from core.wirepick.service.wirepickservice import WirepickSMSService
+    await otp_rate_limiter.check_send(_rate_limit_identifier(request.phone, None), _client_ip(http_request))
     
-    sms_service = WirepickSMSService()
-    result = sms_service.send_sms(request.phone, "Test message from debug endpoint")
+    result = await sms_service.send_sms_async(request.phone, "Test message from debug endpoint")
     
     return {
         "phone": request.phone,
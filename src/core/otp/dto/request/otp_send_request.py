@@ -1,7 +1,9 @@
-from pydantic import BaseModel, EmailStr, Field
+from pydantic import BaseModel, ConfigDict, EmailStr, Field
 from typing import Optional
 
 
 class OTPSendRequest(BaseModel):
+    model_config = ConfigDict(frozen=True, extra="forbid", str_strip_whitespace=True)
+
     phone: Optional[str] = Field(None, min_length=10, max_length=15)
-    email: Optional[EmailStr] = None
\ No newline at end of file
+    email: Optional[EmailStr] = None
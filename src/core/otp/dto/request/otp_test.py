@@ -1,6 +1,8 @@
-from pydantic import BaseModel, EmailStr, Field
+from pydantic import BaseModel, ConfigDict, EmailStr, Field
 from typing import Optional
 
 
 class OTPTest(BaseModel):
-    phone: Optional[str] = Field(None, min_length=10, max_length=15)
\ No newline at end of file
+    model_config = ConfigDict(frozen=True, extra="forbid", str_strip_whitespace=True)
+
+    phone: Optional[str] = Field(None, min_length=10, max_length=15)
@@ -1,8 +1,10 @@
-from pydantic import BaseModel, EmailStr, Field
-from typing import Optional
+from pydantic import BaseModel, ConfigDict, EmailStr, Field, StringConstraints
+from typing import Annotated, Optional
 
 
 class OTPVerifyRequest(BaseModel):
+    model_config = ConfigDict(frozen=True, extra="forbid", str_strip_whitespace=True)
+
     phone: Optional[str] = Field(None, min_length=10, max_length=15)
     email: Optional[EmailStr] = None
-    otp: str = Field(..., min_length=5, max_length=5)
\ No newline at end of file
+    otp: Annotated[str, StringConstraints(pattern=r"^\d{5}$")]
@@ -1,6 +1,8 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 
 
 class OTPVerifyResponse(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     success: bool
-    message: str
\ No newline at end of file
+    message: str
@@ -1,24 +1,28 @@
-import os
-from datetime import datetime, timedelta, timezone
+from datetime import datetime, timezone
 
-from sqlalchemy import Column, String, DateTime, Integer
+from sqlalchemy import Column, String, DateTime, Integer, Index
 from sqlalchemy.orm import Mapped, mapped_column
 from utilities.dbconfig import Base
 
 
 class OTP(Base):
     __tablename__ = "otps"
+    __table_args__ = (
+        # One live OTP per phone/email; these back the ON CONFLICT upsert on send
+        # and the lookups on verify. NULLs don't collide, so each covers only its target.
+        Index("uq_otp_phone", "phone", unique=True),
+        Index("uq_otp_email", "email", unique=True),
+        Index("ix_otp_expires", "expires_at"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     phone: Mapped[str] = mapped_column(String, nullable=True)
     email: Mapped[str] = mapped_column(String, nullable=True)
-    otp: Mapped[str] = mapped_column(String(6), nullable=False)
+    # HMAC-SHA256 hex digest of the code, never the code itself
+    otp: Mapped[str] = mapped_column(String(64), nullable=False)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
-    expires_at: Mapped[datetime] = mapped_column(
-        DateTime(timezone=True),
-        default=lambda: datetime.now(timezone.utc)
-        + timedelta(seconds=int(os.getenv("OTP_EXPIRE_SECONDS", "300") or "300")),
-    )
+    # Set on every upsert from settings.OTP_EXPIRE_SECONDS, on the DB clock validate_otp compares against
+    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True))
     updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
 
     def is_expired(self) -> bool:
@@ -0,0 +1,101 @@
+# core/otp/service/otp_rate_limiter.py
+
+import logging
+from typing import Optional
+
+import redis.asyncio as aioredis
+from fastapi import HTTPException, status
+from redis.exceptions import RedisError
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class OTPRateLimiter:
+    """
+    Fixed-window rate limiting for the OTP endpoints, backed by Redis.
+
+    Limits are keyed on the target phone/email and on the client IP. If Redis
+    is unreachable the limiter fails open so OTP delivery keeps working.
+    """
+
+    KEY_PREFIX = "otp:rl"
+
+    def __init__(self, client: Optional[aioredis.Redis] = None):
+        self._client = client
+
+    def _redis(self) -> aioredis.Redis:
+        if self._client is None:
+            self._client = aioredis.Redis(
+                host=settings.REDIS_HOST,
+                port=int(settings.REDIS_PORT),
+                password=settings.REDIS_PASSWORD or None,
+                db=0,
+                decode_responses=True,
+                socket_connect_timeout=5,
+            )
+        return self._client
+
+    async def _hit(self, key: str, window_seconds: int) -> Optional[int]:
+        """Count a hit in the current window; returns the hit count, or None if Redis is down."""
+        try:
+            async with self._redis().pipeline(transaction=True) as pipe:
+                pipe.set(key, 0, ex=window_seconds, nx=True)
+                pipe.incr(key)
+                _, count = await pipe.execute()
+            return count
+        except RedisError as e:
+            logger.warning(f"OTP rate limiter unavailable, allowing request: {e}")
+            return None
+
+    async def _enforce(self, key: str, limit: int, window_seconds: int) -> None:
+        count = await self._hit(key, window_seconds)
+        if count is not None and count > limit:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many OTP requests. Please try again later.",
+                headers={"Retry-After": str(window_seconds)},
+            )
+
+    async def check_send(self, identifier: str, client_ip: str) -> None:
+        """Raise 429 if `identifier` or `client_ip` exceeded the OTP send limits."""
+        window = settings.OTP_SEND_WINDOW_SECONDS
+        await self._enforce(f"{self.KEY_PREFIX}:send:id:{identifier}", settings.OTP_SEND_LIMIT, window)
+        await self._enforce(f"{self.KEY_PREFIX}:send:ip:{client_ip}", settings.OTP_IP_RATE_LIMIT, window)
+
+    async def check_verify(self, identifier: str, client_ip: str) -> None:
+        """Raise 429 if `identifier` is locked out or exceeded the OTP verify limits."""
+        try:
+            failures = await self._redis().get(f"{self.KEY_PREFIX}:fail:{identifier}")
+        except RedisError as e:
+            logger.warning(f"OTP rate limiter unavailable, allowing request: {e}")
+            failures = None
+        if failures is not None and int(failures) >= settings.OTP_MAX_FAILED_VERIFICATIONS:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many failed attempts. Please request a new OTP later.",
+                headers={"Retry-After": str(settings.OTP_LOCKOUT_SECONDS)},
+            )
+
+        window = settings.OTP_VERIFY_WINDOW_SECONDS
+        await self._enforce(f"{self.KEY_PREFIX}:verify:id:{identifier}", settings.OTP_VERIFY_LIMIT, window)
+        await self._enforce(f"{self.KEY_PREFIX}:verify:ip:{client_ip}", settings.OTP_IP_RATE_LIMIT, window)
+
+    async def record_verify_failure(self, identifier: str) -> None:
+        """Count a failed verification towards the lockout for `identifier`."""
+        await self._hit(f"{self.KEY_PREFIX}:fail:{identifier}", settings.OTP_LOCKOUT_SECONDS)
+
+    async def reset_verify_failures(self, identifier: str) -> None:
+        try:
+            await self._redis().delete(f"{self.KEY_PREFIX}:fail:{identifier}")
+        except RedisError as e:
+            logger.warning(f"Failed to reset OTP failure counter: {e}")
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+otp_rate_limiter = OTPRateLimiter()
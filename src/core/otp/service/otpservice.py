@@ -1,102 +1,175 @@
 # core/otp/service/otpservice.py
 
-import random
-import string
-from datetime import datetime, timedelta, timezone
+import asyncio
+import hashlib
+import hmac
+import secrets
+from datetime import datetime, timedelta
 from typing import Optional
 import os
 import smtplib
 import ssl
 from email.message import EmailMessage
+from apscheduler.schedulers.background import BackgroundScheduler
+from sqlalchemy import delete, func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import Session
+from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_exponential_jitter
 from core.otp.model.otp import OTP
 from core.otp.dto.response.otp_send_response import OTPSendResponse
-from core.wirepick.service.wirepickservice import WirepickSMSService, WirepickSMSException
+from core.wirepick.service.wirepickservice import PHONE_STRIP, WirepickSMSException, WirepickSMSService, get_sms_service
 from config import settings
+from utilities.dbconfig import SessionLocal
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Wirepick intermittently returns 429/5xx; retry a few times before giving up on the OTP.
+_sms_retry = retry(
+    stop=stop_after_attempt(3),
+    wait=wait_exponential_jitter(initial=0.2, max=3.0),
+    retry=retry_if_exception_type(WirepickSMSException),
+    reraise=True,
+)
+
 
 class OTPService:
-    def __init__(self, db: Session):
+    _cleanup_scheduler = None
+
+    def __init__(self, db: Session, sms_service: Optional[WirepickSMSService] = None):
         self.db = db
-        self.sms_service = WirepickSMSService()
+        self.sms_service = sms_service or get_sms_service()
 
     def generate_otp(self) -> str:
         """Generate a 5-digit OTP"""
-        return ''.join(random.choices(string.digits, k=5))
+        return f"{secrets.randbelow(100000):05d}"
+
+    @staticmethod
+    def _hash_otp(otp_code: str) -> str:
+        """Digest stored in place of the OTP so a DB reader cannot use live codes."""
+        pepper = (settings.OTP_PEPPER or settings.SECRET_KEY).encode()
+        return hmac.new(pepper, otp_code.encode(), hashlib.sha256).hexdigest()
 
     def _format_otp_message(self, otp_code: str) -> str:
         """Format OTP message for SMS"""
         return f"Your verification code is: {otp_code}. Valid for {settings.OTP_EXPIRE_SECONDS} seconds."
 
+    def _store_otp(self, otp_code: str, **target) -> datetime:
+        """
+        Upsert the OTP for a single phone/email `target`, replacing any previous code.
+
+        Expiry is computed from the DB clock; returns the stored `expires_at`.
+        """
+        (column,) = target
+        stmt = pg_insert(OTP).values(
+            otp=self._hash_otp(otp_code),
+            expires_at=func.now() + timedelta(seconds=settings.OTP_EXPIRE_SECONDS),
+            **target,
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[column],
+            set_={
+                "otp": stmt.excluded.otp,
+                "expires_at": stmt.excluded.expires_at,
+                "created_at": stmt.excluded.created_at,
+                "updated_at": stmt.excluded.updated_at,
+            },
+        )
+        expires_at = self.db.execute(stmt.returning(OTP.expires_at)).scalar_one()
+        self.db.commit()
+        return expires_at
+
+    def _discard_otp(self, otp_code: str, **target) -> None:
+        """Remove an OTP whose delivery failed, unless a newer code already replaced it."""
+        self.db.execute(delete(OTP).filter_by(otp=self._hash_otp(otp_code), **target))
+        self.db.commit()
+
+    @_sms_retry
+    def _deliver_sms(self, phone: str, message: str) -> dict:
+        return self.sms_service.send_sms(phone, message)
+
+    @_sms_retry
+    async def _deliver_sms_async(self, phone: str, message: str) -> dict:
+        return await self.sms_service.send_sms_async(phone, message)
+
+    def _sms_send_response(self, phone: str, expires_at: datetime, sms_result: dict) -> OTPSendResponse:
+        """Translate a Wirepick send result into the OTP send response."""
+        if sms_result.get('success'):
+            logger.info(f"OTP sent successfully to {phone}. Message ID: {sms_result.get('msgid')}")
+            return OTPSendResponse(
+                success=True,
+                message="OTP sent successfully to your phone",
+                data={
+                    "phone": phone,
+                    "expires_at": expires_at.isoformat(),
+                    "message_id": sms_result.get('msgid')  # Optional: return message ID for tracking
+                }
+            )
+
+        error_msg = sms_result.get('error', 'Unknown SMS error')
+        logger.error(f"Failed to send OTP via Wirepick: {error_msg}")
+        return OTPSendResponse(
+            success=False,
+            message="Failed to send OTP. SMS provider error."
+        )
+
     def send_otp_phone(self, phone: str) -> OTPSendResponse:
         """Send OTP to phone number using Wirepick SMS"""
+        phone = phone.translate(PHONE_STRIP)
         try:
             otp_code = self.generate_otp()
-            expires_at = datetime.now(timezone.utc) + timedelta(seconds=settings.OTP_EXPIRE_SECONDS)
-            
-            # Delete any existing OTP for this phone
-            self.db.query(OTP).filter(OTP.phone == phone).delete()
-            
-            # Create new OTP record
-            otp_record = OTP(
-                phone=phone,
-                otp=otp_code,
-                expires_at=expires_at
+            expires_at = self._store_otp(otp_code, phone=phone)
+            message = self._format_otp_message(otp_code)
+
+            try:
+                result = self._sms_send_response(phone, expires_at, self._deliver_sms(phone, message))
+            except WirepickSMSException as e:
+                logger.error(f"Wirepick SMS error for {phone}: {str(e)}")
+                result = OTPSendResponse(
+                    success=False,
+                    message="Failed to send OTP. Please try again later."
+                )
+
+            if not result.success:
+                # SMS sending failed, rollback OTP creation
+                self._discard_otp(otp_code, phone=phone)
+            return result
+
+        except Exception as e:
+            logger.error(f"Error sending OTP to phone {phone}: {str(e)}")
+            return OTPSendResponse(
+                success=False,
+                message="Failed to send OTP. Please try again."
             )
-            
-            self.db.add(otp_record)
-            self.db.commit()
-            self.db.refresh(otp_record)
-            
-            # Format the OTP message
+
+    async def send_otp_phone_async(self, phone: str) -> OTPSendResponse:
+        """
+        Non-blocking variant of `send_otp_phone` for async endpoints.
+
+        The SMS call goes through the shared async HTTP client; the sync session's
+        DB round-trips run in a worker thread.
+        """
+        phone = phone.translate(PHONE_STRIP)
+        try:
+            otp_code = self.generate_otp()
+            expires_at = await asyncio.to_thread(self._store_otp, otp_code, phone=phone)
             message = self._format_otp_message(otp_code)
 
             try:
-                sms_result = self.sms_service.send_sms(phone, message)
-                
-                if sms_result.get('success'):
-                    logger.info(f"OTP sent successfully to {phone}. Message ID: {sms_result.get('msgid')}")
-                    
-                    # You can store the msgid in your OTP record if needed
-                    # otp_record.external_id = sms_result.get('msgid')
-                    # self.db.commit()
-                    
-                    return OTPSendResponse(
-                        success=True,
-                        message="OTP sent successfully to your phone",
-                        data={
-                            "phone": phone,
-                            "expires_at": expires_at.isoformat(),
-                            "message_id": sms_result.get('msgid')  # Optional: return message ID for tracking
-                        }
-                    )
-                else:
-                    # SMS sending failed, rollback OTP creation
-                    self.db.delete(otp_record)
-                    self.db.commit()
-                    
-                    error_msg = sms_result.get('error', 'Unknown SMS error')
-                    logger.error(f"Failed to send OTP via Wirepick: {error_msg}")
-                    
-                    return OTPSendResponse(
-                        success=False,
-                        message=f"Failed to send OTP. SMS provider error."
-                    )
-                    
+                sms_result = await self._deliver_sms_async(phone, message)
+                result = self._sms_send_response(phone, expires_at, sms_result)
             except WirepickSMSException as e:
-                # SMS service error, rollback OTP creation
-                self.db.delete(otp_record)
-                self.db.commit()
-                
                 logger.error(f"Wirepick SMS error for {phone}: {str(e)}")
-                return OTPSendResponse(
+                result = OTPSendResponse(
                     success=False,
                     message="Failed to send OTP. Please try again later."
                 )
-            
+
+            if not result.success:
+                # SMS sending failed, rollback OTP creation
+                await asyncio.to_thread(self._discard_otp, otp_code, phone=phone)
+            return result
+
         except Exception as e:
             logger.error(f"Error sending OTP to phone {phone}: {str(e)}")
             return OTPSendResponse(
@@ -108,21 +181,8 @@ class OTPService:
         """Send OTP to email address"""
         try:
             otp_code = self.generate_otp()
-            expires_at = datetime.now(timezone.utc) + timedelta(seconds=settings.OTP_EXPIRE_SECONDS)
-            
-            # Delete any existing OTP for this email
-            self.db.query(OTP).filter(OTP.email == email).delete()
-            
-            # Create new OTP record
-            otp_record = OTP(
-                email=email,
-                otp=otp_code,
-                expires_at=expires_at
-            )
-            
-            self.db.add(otp_record)
-            self.db.commit()
-            self.db.refresh(otp_record)
+            # Replace any existing OTP for this email
+            expires_at = self._store_otp(otp_code, email=email)
 
             subject = "Your Autobus verification code"
             body = f"Your verification code is: {otp_code}. Valid for {settings.OTP_EXPIRE_SECONDS} seconds."
@@ -137,8 +197,7 @@ class OTPService:
 
             if not smtp_password:
                 # Rollback OTP creation if we cannot send
-                self.db.delete(otp_record)
-                self.db.commit()
+                self._discard_otp(otp_code, email=email)
                 logger.error("ZEPTOMAIL_SMTP_PASSWORD/ZEPTOMAIL_API_TOKEN not set; cannot send OTP email")
                 return OTPSendResponse(success=False, message="Email service not configured")
 
@@ -168,8 +227,7 @@ class OTPService:
                 )
             except Exception as e:
                 # Rollback OTP creation if email send fails
-                self.db.delete(otp_record)
-                self.db.commit()
+                self._discard_otp(otp_code, email=email)
                 logger.error(f"Failed to send OTP email to {email}: {e}")
                 return OTPSendResponse(success=False, message="Failed to send OTP email. Please try again.")
             
@@ -182,37 +240,23 @@ class OTPService:
 
     def validate_otp(self, phone: Optional[str] = None, email: Optional[str] = None, otp: str = None) -> bool:
         """Validate OTP for phone or email"""
+        # Reject incomplete input before any statement is built or the DB is consulted
+        if not otp or (not phone and not email):
+            return False
+        
         try:
-            if not otp:
-                return False
-            
-            # Build query based on what's provided
-            query = self.db.query(OTP).filter(OTP.otp == otp)
-            
-            if phone:
-                query = query.filter(OTP.phone == phone)
-            elif email:
-                query = query.filter(OTP.email == email)
-            else:
-                return False
-            
-            otp_record = query.first()
-            
-            if not otp_record:
-                return False
-            
-            # Check if OTP has expired
-            if otp_record.is_expired():
-                # Clean up expired OTP
-                self.db.delete(otp_record)
-                self.db.commit()
-                return False
-            
-            # OTP is valid, delete it to prevent reuse
-            self.db.delete(otp_record)
+            # Consume the OTP in one round-trip: a returned row means the code matched and
+            # was still live. Matching on the keyed HMAC digest leaks nothing useful through
+            # comparison timing, since the digest can't be predicted without the pepper.
+            key_col, key_val = (OTP.phone, phone.translate(PHONE_STRIP)) if phone else (OTP.email, email)
+            stmt = (
+                delete(OTP)
+                .where(key_col == key_val, OTP.otp == self._hash_otp(otp), OTP.expires_at > func.now())
+                .returning(OTP.id)
+            )
+            row = self.db.execute(stmt).first()
             self.db.commit()
-            
-            return True
+            return row is not None
             
         except Exception as e:
             logger.error(f"Error validating OTP: {str(e)}")
@@ -221,9 +265,41 @@ class OTPService:
     def cleanup_expired_otps(self):
         """Clean up expired OTP records"""
         try:
-            current_time = datetime.now(timezone.utc)
-            expired_count = self.db.query(OTP).filter(OTP.expires_at < current_time).delete()
+            # Range delete served by ix_otp_expires; uses the DB clock like validate_otp
+            expired_count = self.db.execute(delete(OTP).where(OTP.expires_at < func.now())).rowcount
             self.db.commit()
             logger.info(f"Cleaned up {expired_count} expired OTP records")
         except Exception as e:
-            logger.error(f"Error cleaning up expired OTPs: {str(e)}")
\ No newline at end of file
+            logger.error(f"Error cleaning up expired OTPs: {str(e)}")
+
+    @staticmethod
+    def _run_cleanup_job():
+        db = SessionLocal()
+        try:
+            OTPService(db).cleanup_expired_otps()
+        finally:
+            db.close()
+
+    @classmethod
+    def start_cleanup_scheduler(cls):
+        """Purge expired OTPs every OTP_CLEANUP_INTERVAL_MINUTES in the background."""
+        if cls._cleanup_scheduler is None:
+            cls._cleanup_scheduler = BackgroundScheduler()
+            cls._cleanup_scheduler.add_job(
+                func=cls._run_cleanup_job,
+                trigger="interval",
+                minutes=settings.OTP_CLEANUP_INTERVAL_MINUTES,
+                id="otp_cleanup",
+                replace_existing=True,
+                max_instances=1,
+                coalesce=True,
+            )
+        if not cls._cleanup_scheduler.running:
+            cls._cleanup_scheduler.start()
+            logger.info("[SCHEDULER] OTP cleanup scheduler started")
+
+    @classmethod
+    def shutdown_cleanup_scheduler(cls):
+        if cls._cleanup_scheduler and cls._cleanup_scheduler.running:
+            cls._cleanup_scheduler.shutdown()
+            logger.info("[SCHEDULER] OTP cleanup scheduler shutdown")
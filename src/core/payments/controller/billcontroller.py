@@ -1,97 +1,87 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Body, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from typing import List, Optional
 from another_fastapi_jwt_auth import AuthJWT
-import jwt
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 import logging
-from another_fastapi_jwt_auth.exceptions import MissingTokenError
 
-from sqlalchemy.orm import Session
 from core.payments.service.billservice import BillService
 from core.payments.model.bill import BillStatus, BillingType
 from core.payments.model.timeline import Timeline
 from core.payments.dto.request.billcreate import BillCreate
 from core.payments.dto.request.billupdate import BillUpdate
-from utilities.dbconfig import SessionLocal
+from utilities.dbconfig import get_async_db
+from utilities.deps import validate_token
+from core.payments.dto.response.billresponse import BillResponse
 from core.payments.dto.response.pagedbillresponse import PaginatedBillsResponse
-from another_fastapi_jwt_auth.exceptions import MissingTokenError
 
-logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
-def validate_token(authjwt: AuthJWT = Depends()):
-    try:
-        authjwt.jwt_required()
-        return authjwt
-    except jwt.ExpiredSignatureError:
-        raise HTTPException(
-            status_code=401, 
-            detail="Token expired. Please log in again."
-        )
-    except MissingTokenError:
-        raise HTTPException(
-            status_code=401,
-            detail="No token found. Please create an account and log in.",
-        )
-    except Exception as e:
-        logger.error(f"Token validation error: {str(e)}", exc_info=True)
-        raise HTTPException(
-            status_code=401,
-            detail=f"Invalid token: {str(e)}"
-        )
-        
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
 bill_routes = APIRouter()
 
+MAX_BULK_BILLS = 500
+
 @bill_routes.post("/")
-def create_bill(bill_data: BillCreate, authjwt: AuthJWT = Depends(validate_token), db: Session = Depends(get_db)):
+async def create_bill(bill_data: BillCreate, authjwt: AuthJWT = Depends(validate_token), db: AsyncSession = Depends(get_async_db)):
     bill_service = BillService(db)
     try:
-        bill_id = bill_service.create_bill(bill_data)
+        bill_id = await bill_service.create_bill(bill_data)
         return {"id": bill_id}
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+@bill_routes.post("/bulk")
+async def create_bills_bulk(
+    bill_data_list: List[BillCreate] = Body(..., min_length=1, max_length=MAX_BULK_BILLS),
+    authjwt: AuthJWT = Depends(validate_token),
+    db: AsyncSession = Depends(get_async_db)
+):
+    bill_service = BillService(db)
+    try:
+        bill_ids = await bill_service.create_bills_bulk(bill_data_list)
+        return {"ids": bill_ids}
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 @bill_routes.get("/{bill_id}")
-def get_bill_by_id(bill_id: int, authjwt: AuthJWT = Depends(validate_token), db: Session = Depends(get_db)):
+async def get_bill_by_id(bill_id: int, authjwt: AuthJWT = Depends(validate_token), db: AsyncSession = Depends(get_async_db)):
     bill_service = BillService(db)
     try:
-        return bill_service.get_bill_by_id(bill_id)
+        return await bill_service.get_bill_by_id(bill_id)
     except Exception as e:
         raise HTTPException(status_code=404, detail=str(e))
 
 @bill_routes.delete("/{bill_id}")
-def delete_bill(bill_id: int, authjwt: AuthJWT = Depends(validate_token), db: Session = Depends(get_db)):
+async def delete_bill(bill_id: int, authjwt: AuthJWT = Depends(validate_token), db: AsyncSession = Depends(get_async_db)):
     bill_service = BillService(db)
     try:
-        bill_service.delete_bill(bill_id)
+        await bill_service.delete_bill(bill_id)
         return {"message": "Bill deleted successfully"}
     except Exception as e:
         raise HTTPException(status_code=404, detail=str(e))
 
 @bill_routes.put("/update-bill")
-def update_bill(bill_data: BillUpdate, authjwt: AuthJWT = Depends(validate_token), db: Session = Depends(get_db)):
+async def update_bill(bill_data: BillUpdate, authjwt: AuthJWT = Depends(validate_token), db: AsyncSession = Depends(get_async_db)):
     bill_service = BillService(db)
     try:
-        return bill_service.update_bill(bill_data.id, bill_data)
+        return await bill_service.update_bill(bill_data.id, bill_data)
     except Exception as e:
         raise HTTPException(status_code=404, detail=str(e))
 
 @bill_routes.get("/all/{page}/{size}/{timeline}")
-def get_all_bills(
+async def get_all_bills(
     page: int,
     size: int,
     timeline: Timeline,
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page; when set, page is ignored"),
     authjwt: AuthJWT = Depends(validate_token),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     bill_service = BillService(db)
-    result = bill_service.get_all_bills_paginated(page, size, timeline)
+    try:
+        result = await bill_service.get_all_bills_paginated(page, size, timeline, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
     return PaginatedBillsResponse(
         bills=result["bills"],
@@ -99,37 +89,54 @@ def get_all_bills(
         page=result["page"],
         size=result["size"],
         has_next=result["has_next"],
-        has_prev=result["has_prev"]
+        has_prev=result["has_prev"],
+        next_cursor=result["next_cursor"]
     )
 
+@bill_routes.get("/all/{page}/{size}/{timeline}/stream")
+async def stream_all_bills(
+    page: int,
+    size: int,
+    timeline: Timeline,
+    authjwt: AuthJWT = Depends(validate_token),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    NDJSON variant of /all/{page}/{size}/{timeline} for large pages: one bill per line,
+    serialized as rows arrive instead of after the whole page is loaded. No totals.
+    """
+    bill_service = BillService(db)
+    lines = (BillResponse.model_validate(row).model_dump_json() + "\n" async for row in bill_service.stream_bills(page, size, timeline))
+    return StreamingResponse(lines, media_type="application/x-ndjson")
+
 @bill_routes.get("/find-by/{service_name}")
-def get_bills_by_service_name(service_name: str, authjwt: AuthJWT = Depends(validate_token), db: Session = Depends(get_db)):
+async def get_bills_by_service_name(service_name: str, authjwt: AuthJWT = Depends(validate_token), db: AsyncSession = Depends(get_async_db)):
     bill_service = BillService(db)
-    return bill_service.find_bill_by_service_name(service_name)
+    return await bill_service.find_bill_by_service_name(service_name)
 
 @bill_routes.get("/by-status/{status}")
-def get_bills_by_status(status: BillStatus, authjwt: AuthJWT = Depends(validate_token), db: Session = Depends(get_db)):
+async def get_bills_by_status(status: BillStatus, authjwt: AuthJWT = Depends(validate_token), db: AsyncSession = Depends(get_async_db)):
     bill_service = BillService(db)
-    return bill_service.find_bills_by_status(status)
+    return await bill_service.find_bills_by_status(status)
 
 @bill_routes.get("/by-type/{billing_type}")
-def get_bills_by_billing_type(billing_type: BillingType, authjwt: AuthJWT = Depends(validate_token), db: Session = Depends(get_db)):
+async def get_bills_by_billing_type(billing_type: BillingType, authjwt: AuthJWT = Depends(validate_token), db: AsyncSession = Depends(get_async_db)):
     bill_service = BillService(db)
-    return bill_service.find_bills_by_billing_type(billing_type)
+    return await bill_service.find_bills_by_billing_type(billing_type)
 
 @bill_routes.get("/find-by-form_id/{form_id}")
-def get_bill_by_form_id(form_id: int, authjwt: AuthJWT = Depends(validate_token), db: Session = Depends(get_db)):
+async def get_bill_by_form_id(form_id: int, authjwt: AuthJWT = Depends(validate_token), db: AsyncSession = Depends(get_async_db)):
     bill_service = BillService(db)
     try:
-        return bill_service.find_bill_by_form_id(form_id)
+        return await bill_service.find_bill_by_form_id(form_id)
     except Exception as e:
         raise HTTPException(status_code=404, detail=str(e))
 
 @bill_routes.delete("/delete-by-form_id/{form_id}")
-def delete_bill_by_form_id(form_id: int, authjwt: AuthJWT = Depends(validate_token), db: Session = Depends(get_db)):
+async def delete_bill_by_form_id(form_id: int, authjwt: AuthJWT = Depends(validate_token), db: AsyncSession = Depends(get_async_db)):
     bill_service = BillService(db)
     try:
-        bill_service.delete_bill_by_form_id(form_id)
+        await bill_service.delete_bill_by_form_id(form_id)
         return {"message": "Bill deleted successfully"}
     except Exception as e:
         raise HTTPException(status_code=404, detail=str(e))
\ No newline at end of file
@@ -1,78 +1,50 @@
 import logging
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import Optional
 from another_fastapi_jwt_auth import AuthJWT
-import jwt
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 import logging
-from another_fastapi_jwt_auth.exceptions import MissingTokenError
 
-from sqlalchemy.orm import Session
 from core.payments.service.invoiceservice import InvoiceService
 from core.payments.model.timeline import Timeline
-from utilities.dbconfig import SessionLocal
+from utilities.dbconfig import get_async_db
+from utilities.deps import validate_token
 from core.payments.dto.response.pagedinvoiceresponse import PaginatedInvoicesResponse
-from another_fastapi_jwt_auth.exceptions import MissingTokenError
 
-logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
-def validate_token(authjwt: AuthJWT = Depends()):
-    try:
-        authjwt.jwt_required()
-        return authjwt
-    except jwt.ExpiredSignatureError:
-        raise HTTPException(
-            status_code=401, 
-            detail="Token expired. Please log in again."
-        )
-    except MissingTokenError:
-        raise HTTPException(
-            status_code=401,
-            detail="No token found. Please create an account and log in.",
-        )
-    except Exception as e:
-        logger.error(f"Token validation error: {str(e)}", exc_info=True)
-        raise HTTPException(
-            status_code=401,
-            detail=f"Invalid token: {str(e)}"
-        )
-
-
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
 invoice_routes = APIRouter()
 
 @invoice_routes.get("/{invoice_id}")
-def get_invoice_by_id(invoice_id: int, authjwt: AuthJWT = Depends(validate_token), db: Session = Depends(get_db)):
+async def get_invoice_by_id(invoice_id: int, authjwt: AuthJWT = Depends(validate_token), db: AsyncSession = Depends(get_async_db)):
     invoice_service = InvoiceService(db)
     try:
-        return invoice_service.get_invoice_by_id(invoice_id)
+        return await invoice_service.get_invoice_by_id(invoice_id)
     except Exception as e:
         raise HTTPException(status_code=404, detail=str(e))
 
 @invoice_routes.get("/number/{invoice_number}")
-def get_by_invoice_number(invoice_number: str, authjwt: AuthJWT = Depends(validate_token), db: Session = Depends(get_db)):
+async def get_by_invoice_number(invoice_number: str, authjwt: AuthJWT = Depends(validate_token), db: AsyncSession = Depends(get_async_db)):
     invoice_service = InvoiceService(db)
     try:
-        return invoice_service.get_invoice_by_invoice_number(invoice_number)
+        return await invoice_service.get_invoice_by_invoice_number(invoice_number)
     except Exception as e:
         raise HTTPException(status_code=404, detail=str(e))
 
 @invoice_routes.get("/all/{page}/{size}/{timeline}")
-def get_all_invoices(
+async def get_all_invoices(
     page: int,
     size: int,
     timeline: Timeline,
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page; when set, page is ignored"),
     authjwt: AuthJWT = Depends(validate_token),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     invoice_service = InvoiceService(db)
-    result = invoice_service.get_all_invoices_paginated(page, size, timeline)
+    try:
+        result = await invoice_service.get_all_invoices_paginated(page, size, timeline, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
     return PaginatedInvoicesResponse(
         invoices=result["invoices"],
@@ -80,5 +52,6 @@ def get_all_invoices(
         page=result["page"],
         size=result["size"],
         has_next=result["has_next"],
-        has_prev=result["has_prev"]
+        has_prev=result["has_prev"],
+        next_cursor=result["next_cursor"]
     )
\ No newline at end of file
@@ -1,74 +1,162 @@
-from fastapi import APIRouter, Depends, HTTPException, Path, Query, Request
-from another_fastapi_jwt_auth import AuthJWT
-import jwt
+from fastapi import APIRouter, BackgroundTasks, Body, Depends, HTTPException, Path, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.exceptions import RequestValidationError
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from pydantic import ValidationError
 from sqlalchemy.orm import Session
-from typing import List
+from typing import Annotated, Any, List, Optional
 from decimal import Decimal
+import asyncio
+import json
 import logging
-from another_fastapi_jwt_auth.exceptions import MissingTokenError
+import orjson
+import time
 from datetime import datetime
 
 from core.exceptions.PaymentException import PaymentNotFoundException
 from core.payments.dto.paymentdto import PaymentDto
+from core.payments.dto.request.extbillerquery import ExtBillerQuery
+from core.payments.dto.request.extbillersinquiry import ExtBillersInquiry
 from core.payments.dto.response.pagedpaymentresponse import PagedPaymentResponse
 from core.payments.dto.response.paymentcallbackresponse import PaymentCallbackResponse
 from core.payments.dto.response.paymentresultresponse import PaymentResultResponse
 from core.payments.model.paymentmethod import PaymentMethod
+from core.payments.model.paymentstatus import PaymentStatus
 from core.payments.model.timeline import Timeline
 from core.payments.service.paymentservice import PaymentService
-from utilities.dbconfig import SessionLocal
+from core.payments.service.payment_cache import payment_cache
+from core.customers.utility.network_detector import NetworkDetector
+from utilities.dbconfig import SessionLocal, get_db
+from utilities.paymentgatewayclient import CachedResponse, PaymentGatewayClient, get_payment_gateway_client
+from utilities.phone_utils import convert_to_local_ghana_format
+from utilities.uniqueidgenerator import UniqueIdGenerator
 
 
-logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
-def validate_token(authjwt: AuthJWT = Depends()):
-    try:
-        authjwt.jwt_required()
-        return authjwt
-    except jwt.ExpiredSignatureError:
-        raise HTTPException(
-            status_code=401, 
-            detail="Token expired. Please log in again."
-        )
-    except MissingTokenError:
-        raise HTTPException(
-            status_code=401,
-            detail="No token found. Please create an account and log in.",
-        )
-    except Exception as e:
-        logger.error(f"Token validation error: {str(e)}", exc_info=True)
-        raise HTTPException(
-            status_code=401,
-            detail=f"Invalid token: {str(e)}"
-        )
+# orjson renders the paged/list payloads and the gateway result dicts faster than stdlib json
+payment_routes = APIRouter(default_response_class=ORJSONResponse)
+
+# Fixed parts of the direct Orchard requests built below
+ORCHARD_SERVICE_ID = "4892"
+ORCHARD_CALLBACK_URL = "https://autobus-dcahe0a8cjecffcm.canadacentral-01.azurewebsites.net/api/v1/payment/callback"
+TWO_PLACES = Decimal("0.00")
+
+# Query-parameter formats rejected with a 422 before anything is sent to Orchard
+GHANA_PHONE_PATTERN = r"^(0\d{9}|233\d{9})$"
+BILL_ACCOUNT_PATTERN = r"^[A-Za-z0-9]{5,20}$"
+TELCO_BILLER_PATTERN = r"^(?i:GOT|DST|MPP|VPP|STT|VBB)$"
+
+# (epoch second, formatted local time) of the last Orchard "ts" value
+_ts_cache = (0, "")
+
+
+def _orchard_timestamp() -> str:
+    """Local time as "%Y-%m-%d %H:%M:%S", formatted at most once per second."""
+    global _ts_cache
+    now = int(time.time())
+    cached = _ts_cache
+    if now != cached[0]:
+        cached = _ts_cache = (now, time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(now)))
+    return cached[1]
+
+
+def _orchard_request(trans_type: str, amount: Decimal, customer_number: str, exttrid: str, nw: str, reference: str) -> dict:
+    """Direct Orchard sendRequest payload; service ID and callback URL are fixed."""
+    return {
+        "amount": str(amount.quantize(TWO_PLACES)),
+        "customer_number": customer_number,
+        "exttrid": exttrid,
+        "nw": nw,
+        "reference": reference,
+        "service_id": ORCHARD_SERVICE_ID,
+        "ts": _orchard_timestamp(),
+        "callback_url": ORCHARD_CALLBACK_URL,
+        "trans_type": trans_type,
+    }
+
+
+# Status stream: DB fallback interval when no event arrives, and overall lifetime
+STATUS_STREAM_POLL_SECONDS = 30
+STATUS_STREAM_MAX_SECONDS = 600
+
+# Mobile money networks a CTM debit can target; anything else falls back to MTN
+CTM_NETWORKS = frozenset({"MTN", "VOD", "AIR"})
+# Fixed part of the /ctm test payload; its callback deliberately points nowhere
+_CTM_TEST_STATIC = {
+    "service_id": ORCHARD_SERVICE_ID,
+    "trans_type": "CTM",
+    "callback_url": "https://your-callback-url.com/callback",
+}
+
+# Batched inquiries: largest accepted batch, and Orchard calls in flight across all batches
+MAX_BATCH_INQUIRIES = 50
+_orchard_inquiry_slots = asyncio.Semaphore(20)
+
+# Statuses after which the callback sends no notification / stops the status-check job
+_NOTIFICATION_SKIP_STATES = frozenset({
+    PaymentStatus.SUCCESS, PaymentStatus.FAILED, PaymentStatus.CTM_FAILED, PaymentStatus.MTC_FAILED,
+})
+_TERMINAL_STATES = _NOTIFICATION_SKIP_STATES | {PaymentStatus.ATP_FAILED, PaymentStatus.BLP_FAILED}
+# Second-leg statuses the status-check job keeps polling, by leg name
+_PROCESSING_LEGS = {
+    PaymentStatus.MTC_PROCESSING: "MTC",
+    PaymentStatus.ATP_PROCESSING: "ATP",
+    PaymentStatus.BLP_PROCESSING: "BLP",
+}
+
+
+def _gateway_body(http_response) -> Any:
+    """
+    Orchard response body, parsed once.
 
-def get_db():
-    db = SessionLocal()
+    Gateway error pages (502/504 HTML) are not JSON; they come back as a truncated
+    {"raw": ...} so the caller still reports the real HTTP status.
+    """
+    if isinstance(http_response, CachedResponse):
+        return http_response.json()
+    raw = http_response.content
+    if not raw:
+        return {}
     try:
-        yield db
-    finally:
-        db.close()
-        
-payment_routes = APIRouter()
+        return orjson.loads(raw)
+    except orjson.JSONDecodeError:
+        return {"raw": raw[:512].decode("utf-8", "replace")}
+
+
+def get_payment_service(
+    db: Session = Depends(get_db),
+    payment_gateway_client: PaymentGatewayClient = Depends(get_payment_gateway_client),
+) -> PaymentService:
+    return PaymentService(db, payment_gateway_client)
+
+
+# Routes (relative to the router prefix) whose bearer token is checked by JWTAuthMiddleware
+PROTECTED_PATH_PREFIXES = (
+    "pay",
+    "/get-payment-by-id/",
+    "/get-all-payment/",
+    "/method/",
+    "/revenue",
+    "/service/",
+    "/customer/",
+    "/status/",
+)
 
 @payment_routes.post("pay", response_model=PaymentResultResponse)
 def create_payment(
     payment: PaymentDto,
     request: Request,
-    db: Session = Depends(get_db),
-    authjwt: AuthJWT = Depends(validate_token)
+    payment_service: PaymentService = Depends(get_payment_service)
 ):
-    payment_service = PaymentService(db)
     return payment_service.make_payment(payment, request)
 
 @payment_routes.get("/get-payment-by-id/{id}", response_model=PaymentDto)
 def get_payment_by_id(
     id: int = Path(..., description="Payment ID"),
-    db: Session = Depends(get_db),
-    authjwt: AuthJWT = Depends(validate_token)
+    payment_service: PaymentService = Depends(get_payment_service)
 ):
-    payment_service = PaymentService(db)
     return payment_service.get_payment_by_id(id)
 
 @payment_routes.get("/get-all-payment/{page}/{size}/{timeline}", response_model=PagedPaymentResponse)
@@ -76,62 +164,86 @@ def get_all_payments(
     page: int = Path(..., description="Page number"),
     size: int = Path(..., description="Page size"),
     timeline: Timeline = Path(..., description="Timeline filter"),
-    db: Session = Depends(get_db),
-    authjwt: AuthJWT = Depends(validate_token)
+    payment_service: PaymentService = Depends(get_payment_service)
 ):
-    payment_service = PaymentService(db)
     return payment_service.get_all_payments(page, size, timeline)
 
 
 @payment_routes.get("/method/{payment_method}", response_model=List[PaymentDto])
 def get_payments_by_method(
     payment_method: PaymentMethod = Path(..., description="Payment method"),
-    db: Session = Depends(get_db),
-    authjwt: AuthJWT = Depends(validate_token)
+    payment_service: PaymentService = Depends(get_payment_service)
 ):
-    payment_service = PaymentService(db)
     return payment_service.get_payments_by_method(payment_method)
 
 @payment_routes.get("/revenue", response_model=Decimal)
 def get_total_revenue(
-    db: Session = Depends(get_db),
-    authjwt: AuthJWT = Depends(validate_token)
+    payment_service: PaymentService = Depends(get_payment_service)
 ):
-    payment_service = PaymentService(db)
     return payment_service.get_total_revenue()
 
 @payment_routes.get("/revenue/{timeline}", response_model=Decimal)
 def get_total_revenue_within_timeline(
     timeline: Timeline = Path(..., description="Timeline filter"),
-    db: Session = Depends(get_db),
-    authjwt: AuthJWT = Depends(validate_token)
+    payment_service: PaymentService = Depends(get_payment_service)
 ):
-    payment_service = PaymentService(db)
     return payment_service.get_total_revenue_within_timeline(timeline)
 
 @payment_routes.get("/service/{service_name}", response_model=List[PaymentDto])
 def get_payments_by_service_name(
     service_name: str = Path(..., description="Service name"),
-    db: Session = Depends(get_db),
-    authjwt: AuthJWT = Depends(validate_token)
+    payment_service: PaymentService = Depends(get_payment_service)
 ):
-    payment_service = PaymentService(db)
     return payment_service.get_payments_by_service_name(service_name)
 
 @payment_routes.get("/customer/{customer_name}", response_model=List[PaymentDto])
 def get_payments_by_customer_name(
     customer_name: str = Path(..., description="Customer name"),
-    db: Session = Depends(get_db),
-    authjwt: AuthJWT = Depends(validate_token)
+    payment_service: PaymentService = Depends(get_payment_service)
 ):
-    payment_service = PaymentService(db)
     return payment_service.get_payments_by_customer_name(customer_name)
 
+def _load_payment_status(db: Session, transaction_id: str) -> Optional[dict]:
+    """JSON-ready status summary for a payment, or None if the transaction is unknown."""
+    from core.payments.model.payment import Payment
+
+    # Only the columns returned below; skips hydrating a full Payment entity
+    payment = db.query(
+        Payment.id,
+        Payment.transaction_id,
+        Payment.status,
+        Payment.amount_paid,
+        Payment.payment_method,
+        Payment.date_paid,
+        Payment.updated_on,
+    ).filter(Payment.transaction_id == transaction_id).first()
+
+    if not payment:
+        return None
+
+    return jsonable_encoder({
+        "transaction_id": payment.transaction_id,
+        "payment_id": payment.id,
+        "status": payment.status,
+        "amount": payment.amount_paid,
+        "payment_method": payment.payment_method,
+        "created_at": payment.date_paid,
+        "updated_at": payment.updated_on
+    })
+
+
+def _fetch_payment_status(transaction_id: str) -> Optional[dict]:
+    db = SessionLocal()
+    try:
+        return _load_payment_status(db, transaction_id)
+    finally:
+        db.close()
+
+
 @payment_routes.get("/status/{transaction_id}")
 def get_payment_status(
     transaction_id: str = Path(..., description="Transaction ID to check status"),
-    db: Session = Depends(get_db),
-    authjwt: AuthJWT = Depends(validate_token)
+    db: Session = Depends(get_db)
 ):
     """
     Check the status of a payment by transaction ID.
@@ -142,26 +254,22 @@ def get_payment_status(
     - SUCCESS: Payment completed successfully
     - FAILED: Payment failed
     """
-    from core.payments.model.payment import Payment
+    # Clients poll this until the payment settles; serve repeat polls from Redis.
+    cached = payment_cache.get_status(transaction_id)
+    if cached is not None:
+        return cached
 
     try:
-        payment = db.query(Payment).filter(Payment.transaction_id == transaction_id).first()
+        status = _load_payment_status(db, transaction_id)
 
-        if not payment:
+        if status is None:
             raise HTTPException(
                 status_code=404,
                 detail=f"No payment found with transaction ID: {transaction_id}"
             )
 
-        return {
-            "transaction_id": payment.transaction_id,
-            "payment_id": payment.id,
-            "status": payment.status,
-            "amount": payment.amount_paid,
-            "payment_method": payment.payment_method,
-            "created_at": payment.date_paid,
-            "updated_at": payment.updated_on
-        }
+        payment_cache.set_status(transaction_id, status)
+        return status
     except HTTPException:
         raise
     except Exception as e:
@@ -171,12 +279,59 @@ def get_payment_status(
             detail="Error checking payment status. Please try again."
         )
 
+@payment_routes.get("/status/{transaction_id}/stream")
+async def stream_payment_status(
+    request: Request,
+    transaction_id: str = Path(..., description="Transaction ID to follow")
+):
+    """
+    Server-sent events alternative to polling /status/{transaction_id}.
+
+    Emits the current status immediately, then one event per status change pushed
+    by the payment callback, and closes once the payment reaches a terminal state.
+    If no event arrives within the poll interval the status is re-read from the DB.
+    """
+    initial = await run_in_threadpool(_fetch_payment_status, transaction_id)
+    if initial is None:
+        raise HTTPException(
+            status_code=404,
+            detail=f"No payment found with transaction ID: {transaction_id}"
+        )
+
+    async def events():
+        pubsub = await payment_cache.subscribe_status(transaction_id)
+        try:
+            # Re-read after subscribing so a change published in between is not lost
+            status = await run_in_threadpool(_fetch_payment_status, transaction_id) or initial
+            deadline = time.monotonic() + STATUS_STREAM_MAX_SECONDS
+            while True:
+                yield f"data: {json.dumps(status)}\n\n"
+                if PaymentStatus(status["status"]) in _TERMINAL_STATES:
+                    return
+                previous = status
+                while status == previous:
+                    if time.monotonic() > deadline or await request.is_disconnected():
+                        return
+                    message = await payment_cache.next_status_message(pubsub, STATUS_STREAM_POLL_SECONDS)
+                    if message is None:
+                        yield ": keep-alive\n\n"
+                        message = await run_in_threadpool(_fetch_payment_status, transaction_id)
+                    status = message or previous
+        finally:
+            await payment_cache.unsubscribe_status(pubsub)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
 @payment_routes.post("/send-money")
-def send_money_direct(
+async def send_money_direct(
     amount: Decimal = Query(..., description="Amount in GHS to send"),
-    phone: str = Query(..., description="Receiver phone number (0XXXXXXXXX or 233XXXXXXXXX)"),
+    phone: str = Query(..., pattern=GHANA_PHONE_PATTERN, description="Receiver phone number (0XXXXXXXXX or 233XXXXXXXXX)"),
     reference: str = Query("Direct Payout", description="Optional reference description"),
-    db: Session = Depends(get_db)
+    payment_gateway_client: PaymentGatewayClient = Depends(get_payment_gateway_client)
 ):
     """
     Send money directly to a phone number using MTC (Merchant to Customer).
@@ -195,10 +350,6 @@ def send_money_direct(
         - message: Status message
         - receiver_phone: Phone number money was sent to
     """
-    from utilities.uniqueidgenerator import UniqueIdGenerator
-    from utilities.phone_utils import convert_to_local_ghana_format
-    from core.customers.utility.network_detector import NetworkDetector
-
     try:
         # Validate inputs
         if not amount or amount <= 0:
@@ -223,24 +374,13 @@ def send_money_direct(
         logger.info(f"[SEND_MONEY_DIRECT_NETWORK] Phone: {phone} -> Network: {detected_network} ({network_message})")
 
         # Build MTC request
-        amount_decimal = Decimal(str(amount))
-        mtc_request = {
-            "amount": str(amount_decimal.quantize(Decimal('0.00'))),
-            "customer_number": convert_to_local_ghana_format(phone),
-            "exttrid": mtc_transaction_id,
-            "nw": detected_network,
-            "reference": reference,
-            "service_id": "4892",
-            "ts": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            "callback_url": "https://autobus-dcahe0a8cjecffcm.canadacentral-01.azurewebsites.netapi/api/v1/payment/callback",
-            "trans_type": "MTC"
-        }
+        local_phone = convert_to_local_ghana_format(phone)
+        mtc_request = _orchard_request("MTC", amount, local_phone, mtc_transaction_id, detected_network, reference)
 
-        logger.info(f"[SEND_MONEY_DIRECT_REQUEST] Sending MTC request: {mtc_request}")
+        logger.info("[SEND_MONEY_DIRECT_REQUEST] Sending MTC request: %s", mtc_request)
 
         # Send to Orchard API
-        payment_service = PaymentService(db)
-        response = payment_service.payment_gateway_client.process_payment(mtc_request)
+        response = await run_in_threadpool(payment_gateway_client.process_payment, mtc_request)
 
         logger.info(f"[SEND_MONEY_DIRECT_RESPONSE] Orchard response: status_code={response.status_code}")
 
@@ -255,7 +395,7 @@ def send_money_direct(
                 "resp_code": resp_code,
                 "resp_desc": response_data.get("resp_desc"),
                 "amount": str(amount),
-                "receiver_phone": convert_to_local_ghana_format(phone),
+                "receiver_phone": local_phone,
                 "network": detected_network,
                 "reference": reference,
                 "timestamp": datetime.now().isoformat()
@@ -278,12 +418,12 @@ def send_money_direct(
         )
 
 @payment_routes.post("/pay-bill")
-def pay_bill_direct(
+async def pay_bill_direct(
     amount: Decimal = Query(..., description="Amount in GHS to pay"),
-    account_number: str = Query(..., description="Smart card/account number for bill"),
-    network: str = Query(..., description="Telco biller network (GOT, DST, MPP, VPP, STT, VBB)"),
+    account_number: str = Query(..., pattern=BILL_ACCOUNT_PATTERN, description="Smart card/account number for bill"),
+    network: str = Query(..., pattern=TELCO_BILLER_PATTERN, description="Telco biller network (GOT, DST, MPP, VPP, STT, VBB)"),
     reference: str = Query("Bill Payment", description="Optional reference description"),
-    db: Session = Depends(get_db)
+    payment_gateway_client: PaymentGatewayClient = Depends(get_payment_gateway_client)
 ):
     """
     Pay telco bills directly using BLP (Bill Payment).
@@ -304,8 +444,6 @@ def pay_bill_direct(
         - account_number: Smart card number bill was paid for
         - network: Bill provider network
     """
-    from utilities.uniqueidgenerator import UniqueIdGenerator
-
     try:
         # Validate inputs
         if not amount or amount <= 0:
@@ -332,24 +470,12 @@ def pay_bill_direct(
         blp_transaction_id = str(UniqueIdGenerator.generate())
 
         # Build BLP request directly to Orchard API
-        amount_decimal = Decimal(str(amount))
-        blp_request = {
-            "amount": str(amount_decimal.quantize(Decimal('0.00'))),
-            "customer_number": account_number,
-            "exttrid": blp_transaction_id,
-            "nw": network.upper(),
-            "reference": reference,
-            "service_id": "4892",
-            "ts": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            "callback_url": "https://autobus-dcahe0a8cjecffcm.canadacentral-01.azurewebsites.net/api/v1/payment/callback",
-            "trans_type": "BLP"
-        }
+        blp_request = _orchard_request("BLP", amount, account_number, blp_transaction_id, network.upper(), reference)
 
-        logger.info(f"[PAY_BILL_DIRECT_REQUEST] Sending BLP request: {blp_request}")
+        logger.info("[PAY_BILL_DIRECT_REQUEST] Sending BLP request: %s", blp_request)
 
         # Send to Orchard API
-        payment_service = PaymentService(db)
-        response = payment_service.payment_gateway_client.process_payment(blp_request)
+        response = await run_in_threadpool(payment_gateway_client.process_payment, blp_request)
 
         logger.info(f"[PAY_BILL_DIRECT_RESPONSE] Orchard response: status_code={response.status_code}")
 
@@ -388,13 +514,13 @@ def pay_bill_direct(
 
 
 @payment_routes.post("/pay-external-bill")
-def pay_external_bill_direct(
+async def pay_external_bill_direct(
     amount: Decimal = Query(..., description="Amount in GHS to pay"),
-    account_number: str = Query(..., description="Customer account/reference number with the biller"),
+    account_number: str = Query(..., pattern=BILL_ACCOUNT_PATTERN, description="Customer account/reference number with the biller"),
     ext_biller_ref_id: str = Query(..., description="External biller ID from /ext-billers inquiry (e.g., D9C37F3D52)"),
     ext_biller_ref_type: str = Query(..., description="Biller category/type (e.g., Electricity, School Fees)"),
     reference: str = Query("External Bill Payment", description="Optional reference description"),
-    db: Session = Depends(get_db)
+    payment_gateway_client: PaymentGatewayClient = Depends(get_payment_gateway_client)
 ):
     """
     Pay non-telco bills (ABS external billers) directly using BLP (Bill Payment).
@@ -423,8 +549,6 @@ def pay_external_bill_direct(
     Example:
         POST /api/v1/payment/pay-external-bill?amount=150.00&account_number=233242752911&ext_biller_ref_id=D9C37F3D52&ext_biller_ref_type=Electricity
     """
-    from utilities.uniqueidgenerator import UniqueIdGenerator
-
     try:
         # Validate inputs
         if not amount or amount <= 0:
@@ -456,27 +580,15 @@ def pay_external_bill_direct(
         # Generate transaction ID
         blp_transaction_id = str(UniqueIdGenerator.generate())
 
-        # Build BLP request with ext_biller_ref_id for ABS external billers
-        amount_decimal = Decimal(str(amount))
-        blp_request = {
-            "amount": str(amount_decimal.quantize(Decimal('0.00'))),
-            "customer_number": account_number,
-            "exttrid": blp_transaction_id,
-            "nw": "ABS",  # External billers always use ABS network
-            "reference": reference,
-            "service_id": "4892",
-            "ts": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            "callback_url": "https://autobus-dcahe0a8cjecffcm.canadacentral-01.azurewebsites.net/api/v1/payment/callback",
-            "trans_type": "BLP",
-            "ext_biller_ref_id": ext_biller_ref_id,  # Required for external billers
-            "ext_biller_ref_type": ext_biller_ref_type  # Biller category/type
-        }
+        # Build BLP request with ext_biller_ref_id for ABS external billers (always the ABS network)
+        blp_request = _orchard_request("BLP", amount, account_number, blp_transaction_id, "ABS", reference)
+        blp_request["ext_biller_ref_id"] = ext_biller_ref_id
+        blp_request["ext_biller_ref_type"] = ext_biller_ref_type
 
-        logger.info(f"[PAY_EXTERNAL_BILL_DIRECT_REQUEST] Sending ABS BLP request: {blp_request}")
+        logger.info("[PAY_EXTERNAL_BILL_DIRECT_REQUEST] Sending ABS BLP request: %s", blp_request)
 
         # Send to Orchard API
-        payment_service = PaymentService(db)
-        response = payment_service.payment_gateway_client.process_payment(blp_request)
+        response = await run_in_threadpool(payment_gateway_client.process_payment, blp_request)
 
         logger.info(f"[PAY_EXTERNAL_BILL_DIRECT_RESPONSE] Orchard response: status_code={response.status_code}")
 
@@ -516,61 +628,85 @@ def pay_external_bill_direct(
         )
 
 
-@payment_routes.post("/callback")
-def handle_payment_callback(
-    callback_response: PaymentCallbackResponse,
-    db: Session = Depends(get_db)
+def _post_callback_actions(callback_response: PaymentCallbackResponse) -> None:
+    """Notify the customer and stop the status-check job once a callback has been applied."""
+    from core.payments.model.payment import Payment
+
+    db = SessionLocal()
+    try:
+        payment_service = PaymentService(db)
+        payment = payment_service.find_payment_by_any_transaction_id(
+            str(callback_response.trans_ref),
+            columns=(Payment.transaction_id, Payment.ctm_transaction_id, Payment.mtc_transaction_id),
+        )
+        if not payment:
+            return
+
+        payment_cache.publish_status(payment.transaction_id, _load_payment_status(db, payment.transaction_id))
+
+        status_code = callback_response.trans_status[:3] if callback_response.trans_status else None
+        is_success = status_code == "000"
+
+        # Only send notification if payment is not already in terminal state
+        # This prevents duplicate notifications if background job already processed it
+        if payment.status not in _NOTIFICATION_SKIP_STATES:
+            payment_service.send_payment_notification(
+                payment,
+                is_success=is_success,
+                failure_reason=callback_response.message if not is_success else None
+            )
+            logger.info(f"[CALLBACK_NOTIFICATION] Notification sent for payment {payment.id}")
+        else:
+            logger.info(f"[CALLBACK_SKIP_NOTIFICATION] Payment {payment.id} already in terminal state {payment.status.name}, skipping duplicate notification")
+
+        # Only stop the job if payment is in terminal state
+        # If payment is in MTC_PROCESSING, ATP_PROCESSING, or BLP_PROCESSING, job must continue to check status
+        if payment.status in _TERMINAL_STATES:
+            from core.payments.service.payment_check_service import PaymentCheckService
+            check_service = PaymentCheckService(db)
+            check_service._stop_check_job(payment.id)
+            payment_cache.invalidate_status(payment.transaction_id, str(callback_response.trans_ref))
+            logger.info(f"[CALLBACK_JOB_STOPPED] Background job stopped for payment {payment.id} - payment in terminal state {payment.status.name}")
+        elif payment.status in _PROCESSING_LEGS:
+            leg = _PROCESSING_LEGS[payment.status]
+            logger.info(f"[CALLBACK_JOB_CONTINUING] Payment {payment.id} now in {leg}_PROCESSING state, job will continue to check {leg} status")
+    except Exception:
+        logger.error(f"[CALLBACK_POST_PROCESSING_ERROR] Post-callback actions failed for transaction: {callback_response.trans_ref}", exc_info=True)
+    finally:
+        db.close()
+
+
+@payment_routes.post(
+    "/callback",
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {"application/json": {"schema": PaymentCallbackResponse.model_json_schema()}},
+        }
+    },
+)
+async def handle_payment_callback(
+    request: Request,
+    background_tasks: BackgroundTasks,
+    payment_service: PaymentService = Depends(get_payment_service)
 ):
-    logger.debug(f"Callback payload: {callback_response}")
+    # Parse and validate the raw body in one pass instead of json.loads + model validation
+    try:
+        callback_response = PaymentCallbackResponse.model_validate_json(await request.body())
+    except ValidationError as e:
+        raise RequestValidationError([{**err, "loc": ("body", *err["loc"])} for err in e.errors(include_url=False)])
+    logger.debug("Callback payload: %s", callback_response)
 
     if callback_response.trans_ref is None:
         logger.error("Missing trans_ref in callback")
         raise HTTPException(status_code=400, detail="trans_ref is required")
 
     try:
-        payment_service = PaymentService(db)
-        payment_service.process_payment_callback(callback_response)
+        await run_in_threadpool(payment_service.process_payment_callback, callback_response)
         logger.info(f"Callback processed successfully for transaction: {callback_response.trans_ref}")
 
-        # Send WhatsApp notification after successful callback processing
-        from core.payments.model.payment import Payment
-        payment = db.query(Payment).filter(
-            (Payment.transaction_id == str(callback_response.trans_ref)) |
-            (Payment.ctm_transaction_id == str(callback_response.trans_ref)) |
-            (Payment.mtc_transaction_id == str(callback_response.trans_ref))
-        ).first()
-
-        if payment:
-            from core.payments.model.paymentstatus import PaymentStatus
-
-            status_code = callback_response.trans_status[:3] if callback_response.trans_status else None
-            is_success = status_code == "000"
-
-            # Only send notification if payment is not already in terminal state
-            # This prevents duplicate notifications if background job already processed it
-            if payment.status not in [PaymentStatus.SUCCESS, PaymentStatus.FAILED, PaymentStatus.CTM_FAILED, PaymentStatus.MTC_FAILED]:
-                payment_service.send_payment_notification(
-                    payment,
-                    is_success=is_success,
-                    failure_reason=callback_response.message if not is_success else None
-                )
-                logger.info(f"[CALLBACK_NOTIFICATION] Notification sent for payment {payment.id}")
-            else:
-                logger.info(f"[CALLBACK_SKIP_NOTIFICATION] Payment {payment.id} already in terminal state {payment.status.name}, skipping duplicate notification")
-
-            # Only stop the job if payment is in terminal state
-            # If payment is in MTC_PROCESSING, ATP_PROCESSING, or BLP_PROCESSING, job must continue to check status
-            if payment.status in [PaymentStatus.SUCCESS, PaymentStatus.FAILED, PaymentStatus.CTM_FAILED, PaymentStatus.MTC_FAILED, PaymentStatus.ATP_FAILED, PaymentStatus.BLP_FAILED]:
-                from core.payments.service.payment_check_service import PaymentCheckService
-                check_service = PaymentCheckService(db)
-                check_service._stop_check_job(payment.id)
-                logger.info(f"[CALLBACK_JOB_STOPPED] Background job stopped for payment {payment.id} - payment in terminal state {payment.status.name}")
-            elif payment.status == PaymentStatus.MTC_PROCESSING:
-                logger.info(f"[CALLBACK_JOB_CONTINUING] Payment {payment.id} now in MTC_PROCESSING state, job will continue to check MTC status")
-            elif payment.status == PaymentStatus.ATP_PROCESSING:
-                logger.info(f"[CALLBACK_JOB_CONTINUING] Payment {payment.id} now in ATP_PROCESSING state, job will continue to check ATP status")
-            elif payment.status == PaymentStatus.BLP_PROCESSING:
-                logger.info(f"[CALLBACK_JOB_CONTINUING] Payment {payment.id} now in BLP_PROCESSING state, job will continue to check BLP status")
+        # Notification and job cleanup run after the gateway has its acknowledgement
+        background_tasks.add_task(_post_callback_actions, callback_response)
 
         return {"message": "Callback processed successfully"}
     except PaymentNotFoundException as ex:
@@ -583,9 +719,37 @@ def handle_payment_callback(
         logger.error("Unexpected error during callback processing", exc_info=True)
         raise HTTPException(status_code=500, detail="Failed to process callback. Please try again or contact support.")
 
+def _wallet_balance_response(payment_gateway_client: PaymentGatewayClient) -> dict:
+    """Wallet balance from Orchard, reusing a successful result for a few seconds."""
+    cached = payment_cache.get_wallet_balance()
+    if cached is not None:
+        return cached
+
+    # Call Orchard API using dedicated balance check endpoint
+    http_response = payment_gateway_client.check_wallet_balance()
+
+    logger.info("[TEST_BALANCE_CHECK_RESPONSE] Status: %s", http_response.status_code)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("[TEST_BALANCE_CHECK_RESPONSE] Body: %s", http_response.text)
+
+    if http_response.status_code == 200:
+        result = {
+            "status": "success",
+            "http_status": http_response.status_code,
+            "data": _gateway_body(http_response)
+        }
+        payment_cache.set_wallet_balance(result)
+        return result
+    else:
+        return {
+            "status": "error",
+            "http_status": http_response.status_code,
+            "data": _gateway_body(http_response)
+        }
+
 # Test endpoints for debugging/Postman testing
 @payment_routes.get("/check-wallet-balance")
-def check_wallet_balance(db: Session = Depends(get_db)):
+async def check_wallet_balance(payment_gateway_client: PaymentGatewayClient = Depends(get_payment_gateway_client)):
     """
     Test endpoint to check merchant wallet balance.
     Returns wallet balance for all transaction types (payout, airtime, billpay, etc.)
@@ -600,38 +764,18 @@ def check_wallet_balance(db: Session = Depends(get_db)):
     """
     try:
         logger.info("[TEST_BALANCE_CHECK] Testing wallet balance check endpoint")
-        payment_service = PaymentService(db)
-
-        # Call Orchard API using dedicated balance check endpoint
-        http_response = payment_service.payment_gateway_client.check_wallet_balance()
-
-        logger.info(f"[TEST_BALANCE_CHECK_RESPONSE] Status: {http_response.status_code}, Body: {http_response.text}")
-
-        if http_response.status_code == 200:
-            balance_data = http_response.json()
-            return {
-                "status": "success",
-                "http_status": http_response.status_code,
-                "data": balance_data
-            }
-        else:
-            error_data = http_response.json()
-            return {
-                "status": "error",
-                "http_status": http_response.status_code,
-                "data": error_data
-            }
+        return await run_in_threadpool(_wallet_balance_response, payment_gateway_client)
 
     except Exception as e:
         logger.error(f"[TEST_BALANCE_CHECK_ERROR] Error: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Error checking balance: {str(e)}")
 
 @payment_routes.post("/account-inquiry")
-def account_inquiry(
+async def account_inquiry(
     customer_number: str = Query(..., description="Customer phone number (e.g., 233200018204)"),
     network: str = Query(..., description="Network code (e.g., MTN, VOD, AIR, BNK)"),
     bank_code: str = Query(None, description="Bank code (required for BNK network)"),
-    db: Session = Depends(get_db)
+    payment_gateway_client: PaymentGatewayClient = Depends(get_payment_gateway_client)
 ):
     """
     Account Information Inquiry (AII) endpoint.
@@ -647,10 +791,10 @@ def account_inquiry(
     """
     try:
         logger.info(f"[ACCOUNT_INQUIRY] Request for {customer_number} on {network}")
-        payment_service = PaymentService(db)
 
         # Use PaymentGatewayClient.account_inquiry() method (DRY principle)
-        http_response = payment_service.payment_gateway_client.account_inquiry(
+        http_response = await run_in_threadpool(
+            payment_gateway_client.account_inquiry,
             customer_number=customer_number,
             network=network,
             bank_code=bank_code
@@ -658,36 +802,25 @@ def account_inquiry(
 
         logger.info(f"[ACCOUNT_INQUIRY_RESPONSE] Status: {http_response.status_code}")
 
-        if http_response.status_code == 200:
-            account_data = http_response.json()
-            return {
-                "status": "success",
-                "http_status": http_response.status_code,
-                "customer_number": customer_number,
-                "network": network,
-                "data": account_data
-            }
-        else:
-            error_data = http_response.json()
-            return {
-                "status": "error",
-                "http_status": http_response.status_code,
-                "customer_number": customer_number,
-                "network": network,
-                "data": error_data
-            }
+        return {
+            "status": "success" if http_response.status_code == 200 else "error",
+            "http_status": http_response.status_code,
+            "customer_number": customer_number,
+            "network": network,
+            "data": _gateway_body(http_response)
+        }
 
     except Exception as e:
         logger.error(f"[ACCOUNT_INQUIRY_ERROR] Error: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Error during account inquiry: {str(e)}")
 
 
-@payment_routes.post("/ctm")
-def ctm_test_endpoint(
+@payment_routes.post("/ctm", response_model=None)
+async def ctm_test_endpoint(
     customer_phone: str = Query(..., description="Customer phone number (e.g., 233550748724 or 0550748724)"),
     amount: float = Query(..., description="Amount to test (e.g., 5.0)"),
     reference: str = Query("CTM Test", description="Transaction reference/description"),
-    db: Session = Depends(get_db)
+    payment_gateway_client: PaymentGatewayClient = Depends(get_payment_gateway_client)
 ):
     """
     CTM (Customer to Merchant) test endpoint - ONE-OFF TESTING ONLY.
@@ -705,80 +838,61 @@ def ctm_test_endpoint(
 
     WARNING: This endpoint only tests the API call and does NOT save the transaction.
     """
-    try:
-        logger.info(f"[CTM_TEST] Testing CTM request from {customer_phone}, Amount: GHS {amount}")
-
-        from core.customers.utility.network_detector import NetworkDetector
-        from utilities.uniqueidgenerator import UniqueIdGenerator
-
-        # Detect network from customer phone
-        detected_network, _ = NetworkDetector.detect_network_from_phone(customer_phone)
-
-        network_map = {
-            "MTN": "MTN",
-            "VOD": "VOD",
-            "AIR": "AIR",
-        }
-
-        selected_network = network_map.get(detected_network, "MTN") if detected_network else "MTN"
-
-        # Build CTM request payload
-        ctm_request = {
-            "service_id": "4892",  # From environment config
-            "trans_type": "CTM",
-            "customer_number": customer_phone,
-            "nw": selected_network,
-            "amount": str(amount),
-            "exttrid": str(UniqueIdGenerator.generate()),
-            "ts": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+    logger.info(f"[CTM_TEST] Testing CTM request from {customer_phone}, Amount: GHS {amount}")
+
+    # Detect network from customer phone
+    detected_network, _ = NetworkDetector.detect_network_from_phone(customer_phone)
+
+    selected_network = detected_network if detected_network in CTM_NETWORKS else "MTN"
+
+    # Build CTM request payload
+    ctm_request = _CTM_TEST_STATIC | {
+        "customer_number": customer_phone,
+        "nw": selected_network,
+        "amount": str(amount),
+        "exttrid": str(UniqueIdGenerator.generate()),
+        "ts": _orchard_timestamp(),
+        "reference": reference
+    }
+
+    logger.info("[CTM_TEST] Sending CTM request to Orchard API: %s", ctm_request)
+
+    # Send directly to Orchard API without saving to database
+    http_response = await payment_gateway_client.process_payment_async(ctm_request)
+
+    logger.info("[CTM_TEST_RESPONSE] Status: %s", http_response.status_code)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("[CTM_TEST_RESPONSE] Body: %s", http_response.text)
+
+    api_response = _gateway_body(http_response)
+    if http_response.status_code == 200:
+        return ORJSONResponse({
+            "status": "success",
+            "message": "CTM test request sent successfully (NOT SAVED)",
+            "http_status": http_response.status_code,
+            "customer_phone": customer_phone,
+            "amount": amount,
             "reference": reference,
-            "callback_url": "https://your-callback-url.com/callback"
-        }
-
-        logger.info(f"[CTM_TEST] Sending CTM request to Orchard API: {ctm_request}")
-
-        # Send directly to Orchard API without saving to database
-        payment_service = PaymentService(db)
-        http_response = payment_service.payment_gateway_client.process_payment(ctm_request)
-
-        logger.info(f"[CTM_TEST_RESPONSE] Status: {http_response.status_code}, Body: {http_response.text}")
-
-        if http_response.status_code == 200:
-            response_data = http_response.json()
-            return {
-                "status": "success",
-                "message": "CTM test request sent successfully (NOT SAVED)",
-                "http_status": http_response.status_code,
-                "customer_phone": customer_phone,
-                "amount": amount,
-                "reference": reference,
-                "network": selected_network,
-                "api_response": response_data
-            }
-        else:
-            error_data = http_response.json()
-            return {
-                "status": "error",
-                "message": "CTM test request failed",
-                "http_status": http_response.status_code,
-                "customer_phone": customer_phone,
-                "amount": amount,
-                "reference": reference,
-                "network": selected_network,
-                "api_response": error_data
-            }
-
-    except Exception as e:
-        logger.error(f"[CTM_TEST_ERROR] Error: {str(e)}", exc_info=True)
-        raise HTTPException(status_code=500, detail=f"Error during CTM test: {str(e)}")
+            "network": selected_network,
+            "api_response": api_response
+        })
+    else:
+        return ORJSONResponse({
+            "status": "error",
+            "message": "CTM test request failed",
+            "http_status": http_response.status_code,
+            "customer_phone": customer_phone,
+            "amount": amount,
+            "reference": reference,
+            "network": selected_network,
+            "api_response": api_response
+        })
 
 
-@payment_routes.post("/ext-billers")
-def external_billers_inquiry(
-    customer_number: str = Query(..., description="Customer phone number (e.g., 020410181221)"),
-    network: str = Query("ABS", description="Network code (default: ABS for external billers)"),
-    operation: str = Query("INF", description="Operation type (default: INF for information inquiry)"),
-    db: Session = Depends(get_db)
+@payment_routes.post("/ext-billers", response_model=None)
+async def external_billers_inquiry(
+    query: Annotated[ExtBillersInquiry, Query()],
+    payment_gateway_client: Annotated[PaymentGatewayClient, Depends(get_payment_gateway_client)]
 ):
     """
     External Billers Inquiry (BLI) endpoint.
@@ -792,53 +906,36 @@ def external_billers_inquiry(
     Example:
     POST /api/v1/payment/ext-billers?customer_number=020410181221&network=ABS&operation=INF
     """
-    try:
-        logger.info(f"[EXT_BILLERS_INQUIRY] Request for {customer_number} on {network}, operation: {operation}")
-        payment_service = PaymentService(db)
+    logger.info(f"[EXT_BILLERS_INQUIRY] Request for {query.customer_number} on {query.network}, operation: {query.operation}")
 
-        # Use PaymentGatewayClient.external_billers_inquiry() method
-        http_response = payment_service.payment_gateway_client.external_billers_inquiry(
-            customer_number=customer_number,
-            network=network,
-            operation=operation
-        )
+    # Use PaymentGatewayClient.external_billers_inquiry_async() method
+    http_response = await payment_gateway_client.external_billers_inquiry_async(
+        **query.model_dump()
+    )
 
-        logger.info(f"[EXT_BILLERS_INQUIRY_RESPONSE] Status: {http_response.status_code}")
+    logger.info(f"[EXT_BILLERS_INQUIRY_RESPONSE] Status: {http_response.status_code}")
 
-        if http_response.status_code == 200:
-            billers_data = http_response.json()
-            return {
-                "status": "success",
-                "http_status": http_response.status_code,
-                "customer_number": customer_number,
-                "network": network,
-                "operation": operation,
-                "data": billers_data
-            }
-        else:
-            error_data = http_response.json()
-            return {
-                "status": "error",
-                "http_status": http_response.status_code,
-                "customer_number": customer_number,
-                "network": network,
-                "operation": operation,
-                "data": error_data
-            }
+    return ORJSONResponse({
+        "status": "success" if http_response.status_code == 200 else "error",
+        "http_status": http_response.status_code,
+        **query.model_dump(),
+        "data": _gateway_body(http_response)
+    })
 
-    except Exception as e:
-        logger.error(f"[EXT_BILLERS_INQUIRY_ERROR] Error: {str(e)}", exc_info=True)
-        raise HTTPException(status_code=500, detail=f"Error during external billers inquiry: {str(e)}")
 
+def _invoice_inquiry_result(query: ExtBillerQuery, http_response) -> dict:
+    return {
+        "status": "success" if http_response.status_code == 200 else "error",
+        "http_status": http_response.status_code,
+        **query.model_dump(),
+        "data": _gateway_body(http_response)
+    }
 
-@payment_routes.post("/ext-biller-invoice")
-def external_biller_invoice_inquiry(
-    ext_biller_ref_id: str = Query(..., description="Biller ID from billers list (e.g., D9C37F3D52)"),
-    ext_biller_pan: str = Query(..., description="Customer reference/ID for that biller (e.g., 20784533)"),
-    ext_biller_ref_type: str = Query(..., description="Biller category/type (e.g., School Fees)"),
-    network: str = Query("ABS", description="Network code (default: ABS for external billers)"),
-    operation: str = Query("INV", description="Operation type (default: INV for invoice inquiry)"),
-    db: Session = Depends(get_db)
+
+@payment_routes.post("/ext-biller-invoice", response_model=None)
+async def external_biller_invoice_inquiry(
+    query: Annotated[ExtBillerQuery, Query()],
+    payment_gateway_client: Annotated[PaymentGatewayClient, Depends(get_payment_gateway_client)]
 ):
     """
     External Biller Invoice Inquiry endpoint.
@@ -854,46 +951,47 @@ def external_biller_invoice_inquiry(
     Example:
     POST /api/v1/payment/ext-biller-invoice?ext_biller_ref_id=D9C37F3D52&ext_biller_pan=20784533&ext_biller_ref_type=School%20Fees
     """
-    try:
-        logger.info(f"[EXT_BILLER_INVOICE_INQUIRY] Request for biller_ref_id={ext_biller_ref_id}, pan={ext_biller_pan}, type={ext_biller_ref_type}")
-        payment_service = PaymentService(db)
+    logger.info(f"[EXT_BILLER_INVOICE_INQUIRY] Request for biller_ref_id={query.ext_biller_ref_id}, pan={query.ext_biller_pan}, type={query.ext_biller_ref_type}")
 
-        # Use PaymentGatewayClient.external_biller_invoice_inquiry() method
-        http_response = payment_service.payment_gateway_client.external_biller_invoice_inquiry(
-            ext_biller_ref_id=ext_biller_ref_id,
-            ext_biller_pan=ext_biller_pan,
-            ext_biller_ref_type=ext_biller_ref_type,
-            network=network,
-            operation=operation
-        )
+    # Use PaymentGatewayClient.external_biller_invoice_inquiry_async() method
+    http_response = await payment_gateway_client.external_biller_invoice_inquiry_async(
+        **query.model_dump()
+    )
 
-        logger.info(f"[EXT_BILLER_INVOICE_INQUIRY_RESPONSE] Status: {http_response.status_code}")
+    logger.info(f"[EXT_BILLER_INVOICE_INQUIRY_RESPONSE] Status: {http_response.status_code}")
 
-        if http_response.status_code == 200:
-            invoice_data = http_response.json()
-            return {
-                "status": "success",
-                "http_status": http_response.status_code,
-                "ext_biller_ref_id": ext_biller_ref_id,
-                "ext_biller_pan": ext_biller_pan,
-                "ext_biller_ref_type": ext_biller_ref_type,
-                "network": network,
-                "operation": operation,
-                "data": invoice_data
-            }
-        else:
-            error_data = http_response.json()
-            return {
-                "status": "error",
-                "http_status": http_response.status_code,
-                "ext_biller_ref_id": ext_biller_ref_id,
-                "ext_biller_pan": ext_biller_pan,
-                "ext_biller_ref_type": ext_biller_ref_type,
-                "network": network,
-                "operation": operation,
-                "data": error_data
-            }
+    return ORJSONResponse(_invoice_inquiry_result(query, http_response))
 
-    except Exception as e:
-        logger.error(f"[EXT_BILLER_INVOICE_INQUIRY_ERROR] Error: {str(e)}", exc_info=True)
-        raise HTTPException(status_code=500, detail=f"Error during external biller invoice inquiry: {str(e)}")
+
+@payment_routes.post("/ext-biller-invoice/batch", response_model=None)
+async def external_biller_invoice_batch(
+    queries: List[ExtBillerQuery] = Body(..., min_length=1, max_length=MAX_BATCH_INQUIRIES),
+    payment_gateway_client: PaymentGatewayClient = Depends(get_payment_gateway_client)
+):
+    """
+    Batched External Biller Invoice Inquiry endpoint.
+    Runs up to MAX_BATCH_INQUIRIES invoice inquiries concurrently instead of one request per biller.
+
+    Body: a list of inquiries, each with the same fields as /ext-biller-invoice.
+    Returns one result per inquiry, in input order. A failed inquiry yields
+    {"status": "error", "detail": ...} in its slot without failing the batch.
+    """
+    logger.info(f"[EXT_BILLER_INVOICE_BATCH] {len(queries)} inquiries")
+
+    async def inquire(query: ExtBillerQuery) -> dict:
+        async with _orchard_inquiry_slots:
+            http_response = await payment_gateway_client.external_biller_invoice_inquiry_async(
+                **query.model_dump()
+            )
+        return _invoice_inquiry_result(query, http_response)
+
+    results = await asyncio.gather(*(inquire(query) for query in queries), return_exceptions=True)
+
+    batch = []
+    for query, result in zip(queries, results):
+        if isinstance(result, Exception):
+            logger.error(f"[EXT_BILLER_INVOICE_BATCH_ERROR] {query.ext_biller_ref_id}/{query.ext_biller_pan}: {str(result)}")
+            batch.append({**query.model_dump(), "status": "error", "detail": str(result)})
+        else:
+            batch.append(result)
+    return ORJSONResponse(batch)
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from datetime import datetime
 from decimal import Decimal
 from typing import Optional
@@ -16,9 +16,9 @@ class BillCreate(BaseModel):
     payment_method: PaymentMethod = Field(..., description="Payment method")
     status: BillStatus = Field(default=BillStatus.PENDING, description="Bill status")
 
-    class Config:
-        from_attributes = True
-        json_schema_extra = {
+    model_config = ConfigDict(
+        from_attributes=True,
+        json_schema_extra={
             "example": {
                 "form_id": 123,
                 "discount_id": 1,
@@ -30,4 +30,5 @@ class BillCreate(BaseModel):
                 "payment_method": "CREDIT_CARD",
                 "status": "PENDING"
             }
-        }
\ No newline at end of file
+        }
+    )
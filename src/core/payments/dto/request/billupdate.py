@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from datetime import datetime
 from decimal import Decimal
 from typing import Optional
@@ -17,12 +17,13 @@ class BillUpdate(BaseModel):
     payment_method: Optional[PaymentMethod] = Field(None, description="Payment method")
     status: Optional[BillStatus] = Field(None, description="Bill status")
 
-    class Config:
-        from_attributes = True
-        json_schema_extra = {
+    model_config = ConfigDict(
+        from_attributes=True,
+        json_schema_extra={
             "example": {
                 "service_name": "Updated Premium Subscription",
                 "amount": "89.99",
                 "status": "ACTIVE"
             }
-        }
\ No newline at end of file
+        }
+    )
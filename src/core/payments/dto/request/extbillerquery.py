@@ -0,0 +1,20 @@
+from pydantic import BaseModel, ConfigDict, Field
+
+class ExtBillerQuery(BaseModel):
+    ext_biller_ref_id: str = Field(..., description="Biller ID from billers list (e.g., D9C37F3D52)")
+    ext_biller_pan: str = Field(..., description="Customer reference/ID for that biller (e.g., 20784533)")
+    ext_biller_ref_type: str = Field(..., description="Biller category/type (e.g., School Fees)")
+    network: str = Field("ABS", description="Network code (default: ABS for external billers)")
+    operation: str = Field("INV", description="Operation type (default: INV for invoice inquiry)")
+
+    model_config = ConfigDict(
+        json_schema_extra={
+            "example": {
+                "ext_biller_ref_id": "D9C37F3D52",
+                "ext_biller_pan": "20784533",
+                "ext_biller_ref_type": "School Fees",
+                "network": "ABS",
+                "operation": "INV"
+            }
+        }
+    )
@@ -0,0 +1,16 @@
+from pydantic import BaseModel, ConfigDict, Field
+
+class ExtBillersInquiry(BaseModel):
+    customer_number: str = Field(..., description="Customer phone number (e.g., 020410181221)")
+    network: str = Field("ABS", description="Network code (default: ABS for external billers)")
+    operation: str = Field("INF", description="Operation type (default: INF for information inquiry)")
+
+    model_config = ConfigDict(
+        json_schema_extra={
+            "example": {
+                "customer_number": "020410181221",
+                "network": "ABS",
+                "operation": "INF"
+            }
+        }
+    )
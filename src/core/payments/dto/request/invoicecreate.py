@@ -1,4 +1,4 @@
-from pydantic import BaseModel, EmailStr, Field
+from pydantic import BaseModel, ConfigDict, EmailStr, Field
 from datetime import datetime
 from decimal import Decimal
 from typing import Optional
@@ -11,9 +11,9 @@ class InvoiceCreate(BaseModel):
     service_name: str = Field(..., description="Name of the service being billed")
     amount: Decimal = Field(..., ge=0, description="Invoice amount", max_digits=10, decimal_places=2)
 
-    class Config:
-        from_attributes = True
-        json_schema_extra = {
+    model_config = ConfigDict(
+        from_attributes=True,
+        json_schema_extra={
             "example": {
                 "bill_id": 123,
                 "invoice_number": "INV-2023-001",
@@ -22,4 +22,5 @@ class InvoiceCreate(BaseModel):
                 "service_name": "Premium Subscription",
                 "amount": "99.99"
             }
-        }
\ No newline at end of file
+        }
+    )
@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from typing import List, Optional
 from datetime import datetime
 from core.payments.model.bill import BillingType, BillFrequency, BillStatus, PaymentMethod
@@ -17,5 +17,4 @@ class BillResponse(BaseModel):
     created_on: datetime
     updated_on: datetime
 
-    class Config:
-        from_attributes = True
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
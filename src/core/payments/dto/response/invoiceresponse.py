@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from typing import List, Optional
 from datetime import datetime
 from core.payments.model.invoice import Invoice
@@ -14,5 +14,4 @@ class InvoiceResponse(BaseModel):
     created_on: datetime
     updated_on: datetime
 
-    class Config:
-        from_attributes = True  # Allows ORM mode for SQLAlchemy objects
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
@@ -1,11 +1,12 @@
 from pydantic import BaseModel
-from typing import List
+from typing import List, Optional
 from core.payments.dto.response.billresponse import BillResponse
 
 class PaginatedBillsResponse(BaseModel):
     bills: List[BillResponse]
-    total: int
+    total: Optional[int] = None  # not counted for cursor pages
     page: int
     size: int
     has_next: bool
-    has_prev: bool
\ No newline at end of file
+    has_prev: bool
+    next_cursor: Optional[str] = None
\ No newline at end of file
@@ -5,8 +5,9 @@ from core.payments.model.invoice import Invoice
 
 class PaginatedInvoicesResponse(BaseModel):
     invoices: List[InvoiceResponse]
-    total: int
+    total: Optional[int] = None  # not counted for cursor pages
     page: int
     size: int
     has_next: bool
-    has_prev: bool
\ No newline at end of file
+    has_prev: bool
+    next_cursor: Optional[str] = None
\ No newline at end of file
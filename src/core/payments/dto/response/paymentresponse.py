@@ -1,5 +1,5 @@
 from enum import Enum
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import Optional
 from decimal import Decimal
 from datetime import datetime
@@ -8,5 +8,4 @@ class PaymentResponse(BaseModel):
     resp_code: Optional[str] = Field(default=None, alias="resp_code")
     resp_desc: Optional[str] = Field(default=None, alias="resp_desc")
 
-    class Config:
-        populate_by_name = True  # allows using field names or aliases
\ No newline at end of file
+    model_config = ConfigDict(populate_by_name=True)
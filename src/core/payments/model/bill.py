@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, String, DateTime, Enum, Numeric
+from sqlalchemy import Column, Computed, Integer, String, DateTime, Enum, Index, Numeric, text
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.sql import func
 from core.payments.model.paymentmethod import PaymentMethod
 from utilities.dbconfig import Base
@@ -16,17 +17,17 @@ from typing import Optional
 from sqlalchemy import String, DateTime, Integer
 from sqlalchemy.orm import relationship, Mapped, mapped_column
 
-class BillingType(str, enum.Enum):
+class BillingType(enum.StrEnum):
     RECURRING = "RECURRING"
     ONE_TIME = "ONE_TIME"
 
-class BillFrequency(str, enum.Enum):
+class BillFrequency(enum.StrEnum):
     DAILY = "DAILY"
     WEEKLY = "WEEKLY"
     MONTHLY = "MONTHLY"
     YEARLY = "YEARLY"
 
-class BillStatus(str, enum.Enum):
+class BillStatus(enum.StrEnum):
     ACTIVE = "ACTIVE"
     INACTIVE = "INACTIVE"
     PENDING = "PENDING"
@@ -34,11 +35,35 @@ class BillStatus(str, enum.Enum):
 
 class Bill(Base):
     __tablename__ = "billing"
+    __table_args__ = (
+        # Backs the newest-first listing and its (created_on, id) keyset cursor
+        Index("ix_billing_created_on_id", text("created_on DESC"), text("id DESC")),
+        # One bill per form; backs the ON CONFLICT insert in create_bill. NULLs don't collide.
+        Index("uq_billing_form_id", "form_id", unique=True),
+        # Status/type filters read newest-first straight off these, with no Sort node
+        Index("ix_billing_status_created_on", "status", text("created_on DESC")),
+        Index("ix_billing_billing_type_created_on", "billing_type", text("created_on DESC")),
+        # Trigram GIN index so find_bill_by_service_name's ILIKE '%...%' avoids a full scan
+        Index(
+            "ix_billing_service_name_trgm",
+            "service_name",
+            postgresql_using="gin",
+            postgresql_ops={"service_name": "gin_trgm_ops"},
+        ),
+        # Word/prefix search over service_name; see find_bill_by_service_name
+        Index("ix_billing_search_tsv", "search_tsv", postgresql_using="gin"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     form_id: Mapped[Optional[int]] = mapped_column(Integer)
     discount_id: Mapped[Optional[int]] = mapped_column(Integer)
     service_name: Mapped[Optional[str]] = mapped_column(String)
+    # Generated by Postgres from service_name; deferred so listings never fetch it
+    search_tsv: Mapped[Optional[str]] = mapped_column(
+        TSVECTOR,
+        Computed("to_tsvector('simple', coalesce(service_name, ''))", persisted=True),
+        deferred=True,
+    )
     
     billing_type: Mapped[Optional[BillingType]] = mapped_column(Enum(BillingType))
     currency: Mapped[Optional[str]] = mapped_column(String)
@@ -1,4 +1,4 @@
-from sqlalchemy import Integer, String, DateTime, Numeric
+from sqlalchemy import Integer, String, DateTime, Index, Numeric, text
 from sqlalchemy.sql import func
 from utilities.dbconfig import Base
 from datetime import datetime
@@ -15,6 +15,10 @@ from sqlalchemy.orm import Mapped, mapped_column
 
 class Invoice(Base):
     __tablename__ = "invoice"
+    __table_args__ = (
+        # Backs the newest-first listing and its (created_on, id) keyset cursor
+        Index("ix_invoice_created_on_id", text("created_on DESC"), text("id DESC")),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     bill_id: Mapped[Optional[int]] = mapped_column(Integer)
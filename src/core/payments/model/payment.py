@@ -23,13 +23,13 @@ class Payment(Base):
 
     # Transaction IDs - tracks both CTM and second stage (MTC or ATP)
     transaction_id: Mapped[str] = mapped_column(String, nullable=False, unique=True)  # Original CTM transaction
-    ctm_transaction_id: Mapped[Optional[str]] = mapped_column(String)  # CTM (Customer to Merchant) transaction ID
-    mtc_transaction_id: Mapped[Optional[str]] = mapped_column(String)  # MTC (Merchant to Customer) transaction ID for send_money
-    atp_transaction_id: Mapped[Optional[str]] = mapped_column(String)  # ATP (Airtime Top-Up) transaction ID for buy_airtime
-    blp_transaction_id: Mapped[Optional[str]] = mapped_column(String)  # BLP (Bill Payment) transaction ID for pay_bill
+    ctm_transaction_id: Mapped[Optional[str]] = mapped_column(String, index=True)  # CTM (Customer to Merchant) transaction ID
+    mtc_transaction_id: Mapped[Optional[str]] = mapped_column(String, index=True)  # MTC (Merchant to Customer) transaction ID for send_money
+    atp_transaction_id: Mapped[Optional[str]] = mapped_column(String, index=True)  # ATP (Airtime Top-Up) transaction ID for buy_airtime
+    blp_transaction_id: Mapped[Optional[str]] = mapped_column(String, index=True)  # BLP (Bill Payment) transaction ID for pay_bill
 
     # Reversal tracking - for reversal payments, links back to the original failed payment
-    original_payment_id: Mapped[Optional[int]] = mapped_column(Integer)  # Links reversal payment to original payment
+    original_payment_id: Mapped[Optional[int]] = mapped_column(Integer, index=True)  # Links reversal payment to original payment
 
     service_name: Mapped[Optional[str]] = mapped_column(String)
     intent: Mapped[Optional[str]] = mapped_column(String)
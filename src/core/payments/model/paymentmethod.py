@@ -1,8 +1,8 @@
-from enum import Enum
+from enum import StrEnum
 from pydantic import BaseModel
 from typing import Optional
 
-class PaymentMethod(str, Enum):
+class PaymentMethod(StrEnum):
     CARD = "CARD"
     MOBILE_MONEY = "MOBILE_MONEY"
     BANK_TRANSFER = "BANK_TRANSFER"
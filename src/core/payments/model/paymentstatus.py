@@ -1,9 +1,9 @@
-from enum import Enum
+from enum import StrEnum
 from pydantic import BaseModel
 from typing import Optional
 
 
-class PaymentStatus(str, Enum):
+class PaymentStatus(StrEnum):
     # Initial state
     PENDING = "PENDING"
 
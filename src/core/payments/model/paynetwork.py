@@ -1,10 +1,10 @@
-from enum import Enum
+from enum import StrEnum
 from pydantic import BaseModel, Field
 from typing import Optional
 from decimal import Decimal
 from datetime import datetime
 
-class Network(str, Enum):
+class Network(StrEnum):
     # Mobile Networks
     MTN = "MTN"           # MTN network
     VOD = "VOD"           # Vodafone network
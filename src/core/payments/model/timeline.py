@@ -1,6 +1,6 @@
-from enum import Enum
+from enum import StrEnum
 
-class Timeline(str, Enum):
+class Timeline(StrEnum):
     TODAY = "TODAY"
     THIS_WEEK = "THIS_WEEK"
     THIS_MONTH = "THIS_MONTH"
@@ -1,113 +1,241 @@
-from datetime import datetime, timedelta
-from typing import Optional, List
+import re
+import threading
+from functools import wraps
+from typing import AsyncIterator, Optional, List
 from decimal import Decimal
-from sqlalchemy.orm import Session
-from sqlalchemy import desc
+from cachetools import TTLCache
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import Row, delete, desc, func, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from fastapi import HTTPException
 from core.payments.model.bill import Bill, BillStatus, BillingType
 from core.payments.dto.request.billcreate import BillCreate
 from core.payments.dto.request.billupdate import BillUpdate
+from core.payments.dto.response.billresponse import BillResponse
 from core.exceptions.BillException import BillNotFoundException
 from core.payments.model.timeline import Timeline
+from core.payments.service.pagination import encode_cursor, keyset_page
+from core.payments.service.timelines import since_start_date, timeline_criteria, timeline_params
+
+# Listing pages return plain rows of just the rendered columns, skipping ORM entity construction
+BILL_LIST_COLUMNS = tuple(getattr(Bill, name) for name in BillResponse.model_fields)
+
+# Listing statements are built once per (statement, timeline filter on/off); the
+# timeline start is bound at execute time from timeline_params()
+_BILL_LIST = select(Bill).order_by(desc(Bill.created_on), desc(Bill.id))
+_BILL_PAGE = select(*BILL_LIST_COLUMNS, func.count().over().label("total")).order_by(desc(Bill.created_on), desc(Bill.id))
+_BILL_COUNT = select(func.count()).select_from(Bill)
+_BILL_ROWS = select(*BILL_LIST_COLUMNS).order_by(desc(Bill.created_on), desc(Bill.id))
+_BILL_LIST_STMTS = {False: _BILL_LIST, True: since_start_date(_BILL_LIST, Bill.created_on)}
+_BILL_PAGE_STMTS = {False: _BILL_PAGE, True: since_start_date(_BILL_PAGE, Bill.created_on)}
+_BILL_COUNT_STMTS = {False: _BILL_COUNT, True: since_start_date(_BILL_COUNT, Bill.created_on)}
+_BILL_ROWS_STMTS = {False: _BILL_ROWS, True: since_start_date(_BILL_ROWS, Bill.created_on)}
+
+# Insert statements are built once; each call only binds the DTO's values.
+# The unique form_id index rejects duplicates atomically; nothing comes back on conflict
+_BILL_INSERT = pg_insert(Bill).on_conflict_do_nothing(index_elements=["form_id"]).returning(Bill.id)
+_BILL_BULK_INSERT = insert(Bill).returning(Bill.id, sort_by_parameter_order=True)
+
+# Service-name searches of up to this many plain words use the tsvector index
+SERVICE_NAME_MAX_TSQUERY_WORDS = 3
+_WORD = re.compile(r"[^\W_]+")
+
+# Rows per server-side cursor fetch when streaming a listing
+BILL_STREAM_CHUNK_SIZE = 200
+
+# Ids of recent list results, so bursts of identical list calls skip the filter/sort.
+# Keys carry a version that every bill write bumps; other workers age out within the TTL.
+_BILL_LIST_CACHE_TTL_SECONDS = 5
+_bill_list_cache = TTLCache(maxsize=1024, ttl=_BILL_LIST_CACHE_TTL_SECONDS)
+_bill_list_cache_lock = threading.Lock()
+_bill_list_version = 0
+
+
+def _invalidate_bill_lists() -> None:
+    global _bill_list_version
+    with _bill_list_cache_lock:
+        _bill_list_version += 1
+
+
+def _cached_bill_list(fn):
+    """Cache the ids a List[Bill] query returns; hits reload just those rows by primary key."""
+    @wraps(fn)
+    async def wrapper(self, *args, **kwargs):
+        with _bill_list_cache_lock:
+            key = (fn.__name__, args, tuple(sorted(kwargs.items())), _bill_list_version)
+            ids = _bill_list_cache.get(key)
+        if ids is not None:
+            return await self._bills_by_ids(ids)
+        bills = await fn(self, *args, **kwargs)
+        with _bill_list_cache_lock:
+            _bill_list_cache[key] = tuple(bill.id for bill in bills)
+        return bills
+    return wrapper
+
 
 class BillService:
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
     
-    def create_bill(self, bill_data: BillCreate) -> int:
+    async def create_bill(self, bill_data: BillCreate) -> int:
         if not bill_data.payment_method:
             raise BillNotFoundException("Payment methods cannot be empty.")
         
-        # Check if a bill already exists for the given form_id
-        existing_bill = self.db.query(Bill).filter(Bill.form_id == bill_data.form_id).first()
-        if existing_bill:
+        bill_id = await self.db.scalar(_BILL_INSERT, bill_data.model_dump())
+        if bill_id is None:
+            await self.db.rollback()
             raise ValueError(f"A bill already exists for the provided formId: {bill_data.form_id}")
         
-        db_bill = Bill(**bill_data.model_dump())
-        self.db.add(db_bill)
-        self.db.commit()
-        self.db.refresh(db_bill)
-        return db_bill.id
+        await self.db.commit()
+        _invalidate_bill_lists()
+        return bill_id
+    
+    async def create_bills_bulk(self, bill_data_list: List[BillCreate]) -> List[int]:
+        """
+        Insert many bills in one executemany and a single commit; returns their ids in input order.
+        
+        A duplicate form_id fails the whole batch.
+        """
+        if any(not bill_data.payment_method for bill_data in bill_data_list):
+            raise BillNotFoundException("Payment methods cannot be empty.")
+        if not bill_data_list:
+            return []
+        
+        try:
+            bill_ids = list(await self.db.scalars(
+                _BILL_BULK_INSERT, [bill_data.model_dump() for bill_data in bill_data_list]
+            ))
+        except IntegrityError:
+            await self.db.rollback()
+            raise ValueError("A bill already exists for one of the provided formIds")
+        
+        await self.db.commit()
+        _invalidate_bill_lists()
+        return bill_ids
     
-    def get_bill_by_id(self, bill_id: int) -> Bill:
-        bill = self.db.query(Bill).filter(Bill.id == bill_id).first()
+    async def get_bill_by_id(self, bill_id: int) -> Bill:
+        bill = await self.db.get(Bill, bill_id)
         if not bill:
             raise BillNotFoundException(f"Bill not found with ID: {bill_id}")
         return bill
     
-    def update_bill(self, bill_id: int, bill_data: BillUpdate) -> Bill:
-        bill = self.get_bill_by_id(bill_id)
+    async def update_bill(self, bill_id: int, bill_data: BillUpdate) -> Bill:
+        changes = bill_data.model_dump(exclude_unset=True)
+        if not changes:
+            return await self.get_bill_by_id(bill_id)
         
-        # Update bill properties
-        for key, value in bill_data.model_dump(exclude_unset=True).items():
-            setattr(bill, key, value)
+        # One UPDATE ... RETURNING instead of load, mutate, flush and refresh
+        bill = (await self.db.execute(
+            update(Bill).where(Bill.id == bill_id).values(**changes).returning(Bill)
+        )).scalar_one_or_none()
+        if not bill:
+            await self.db.rollback()
+            raise BillNotFoundException(f"Bill not found with ID: {bill_id}")
         
-        self.db.commit()
-        self.db.refresh(bill)
+        await self.db.commit()
+        _invalidate_bill_lists()
         return bill
     
-    def delete_bill(self, bill_id: int) -> None:
-        bill = self.get_bill_by_id(bill_id)
-        self.db.delete(bill)
-        self.db.commit()
+    async def delete_bill(self, bill_id: int) -> None:
+        deleted = (await self.db.execute(delete(Bill).where(Bill.id == bill_id).returning(Bill.id))).scalar_one_or_none()
+        if deleted is None:
+            raise BillNotFoundException(f"Bill not found with ID: {bill_id}")
+        await self.db.commit()
+        _invalidate_bill_lists()
     
-    def get_all_bills(self, page: int, size: int, timeline: Optional[Timeline] = None) -> List[Bill]:
-        query = self.db.query(Bill)
-        
-        if timeline and timeline != Timeline.ALL:
-            start_date = self.calculate_start_date(timeline)
-            query = query.filter(Bill.created_on >= start_date)
+    async def _bills_by_ids(self, ids: tuple) -> List[Bill]:
+        if not ids:
+            return []
+        by_id = {bill.id: bill for bill in await self.db.scalars(select(Bill).where(Bill.id.in_(ids)))}
+        return [by_id[id] for id in ids if id in by_id]
+    
+    @_cached_bill_list
+    async def get_all_bills(self, page: int, size: int, timeline: Optional[Timeline] = None) -> List[Bill]:
+        params = timeline_params(timeline)
+        stmt = _BILL_LIST_STMTS[bool(params)].offset(page * size).limit(size)
+        return list(await self.db.scalars(stmt, params))
+    
+    async def stream_bills(self, page: int, size: int, timeline: Optional[Timeline] = None) -> AsyncIterator[Row]:
+        """
+        Offset page of bills as plain rows, read from a server-side cursor.
         
-        return query.order_by(desc(Bill.created_on)).offset(page * size).limit(size).all()
+        Only BILL_STREAM_CHUNK_SIZE rows are held at a time, so large pages don't
+        materialize in full; the session must stay open until the iterator is exhausted.
+        """
+        params = timeline_params(timeline)
+        stmt = _BILL_ROWS_STMTS[bool(params)].offset(page * size).limit(size)
+        async for row in await self.db.stream(stmt.execution_options(yield_per=BILL_STREAM_CHUNK_SIZE), params):
+            yield row
     
-    def get_all_bills_paginated(self, page: int, size: int, timeline: Optional[Timeline] = None) -> dict:
-        query = self.db.query(Bill)
+    async def get_all_bills_paginated(self, page: int, size: int, timeline: Optional[Timeline] = None, cursor: Optional[str] = None) -> dict:
+        """Offset page of bills, or with `cursor` the keyset page after it (page is then ignored)."""
+        if cursor is not None:
+            criteria = timeline_criteria(Bill.created_on, timeline)
+            result = await keyset_page(self.db, Bill, BILL_LIST_COLUMNS, criteria, size, cursor)
+            return {
+                "bills": result["rows"],
+                "total": None,
+                "page": page,
+                "size": size,
+                "has_next": result["has_next"],
+                "has_prev": True,
+                "next_cursor": result["next_cursor"]
+            }
         
-        if timeline and timeline != Timeline.ALL:
-            start_date = self.calculate_start_date(timeline)
-            query = query.filter(Bill.created_on >= start_date)
+        # count(*) OVER () returns the filtered total alongside the page in one round-trip
+        params = timeline_params(timeline)
+        rows = (await self.db.execute(
+            _BILL_PAGE_STMTS[bool(params)].offset(page * size).limit(size), params
+        )).all()
         
-        total = query.count()
-        bills = query.order_by(desc(Bill.created_on)).offset(page * size).limit(size).all()
+        if rows:
+            total = rows[0].total
+        elif page > 0:
+            # Past the last page there is no row to carry the window count
+            total = (await self.db.execute(_BILL_COUNT_STMTS[bool(params)], params)).scalar_one()
+        else:
+            total = 0
         
         return {
-            "bills": bills,
+            "bills": rows,
             "total": total,
             "page": page,
             "size": size,
             "has_next": (page + 1) * size < total,
-            "has_prev": page > 0
+            "has_prev": page > 0,
+            "next_cursor": encode_cursor(rows[-1].created_on, rows[-1].id) if rows and (page + 1) * size < total else None
         }
     
-    def find_bill_by_service_name(self, service_name: str) -> List[Bill]:
-        return self.db.query(Bill).filter(Bill.service_name.ilike(f"%{service_name}%")).all()
+    async def find_bill_by_service_name(self, service_name: str) -> List[Bill]:
+        # Plain words go to the tsvector index as prefix matches; anything else, or a
+        # search no word starts with, falls back to the trigram-indexed substring ILIKE
+        words = service_name.split()
+        if words and len(words) <= SERVICE_NAME_MAX_TSQUERY_WORDS and all(_WORD.fullmatch(word) for word in words):
+            tsquery = func.to_tsquery("simple", " & ".join(f"{word}:*" for word in words))
+            bills = list(await self.db.scalars(select(Bill).where(Bill.search_tsv.op("@@")(tsquery))))
+            if bills:
+                return bills
+        return list(await self.db.scalars(select(Bill).where(Bill.service_name.ilike(f"%{service_name}%"))))
     
-    def find_bills_by_status(self, status: BillStatus) -> List[Bill]:
-        return self.db.query(Bill).filter(Bill.status == status).all()
+    @_cached_bill_list
+    async def find_bills_by_status(self, status: BillStatus) -> List[Bill]:
+        return list(await self.db.scalars(select(Bill).where(Bill.status == status).order_by(desc(Bill.created_on))))
     
-    def find_bills_by_billing_type(self, billing_type: BillingType) -> List[Bill]:
-        return self.db.query(Bill).filter(Bill.billing_type == billing_type).all()
+    @_cached_bill_list
+    async def find_bills_by_billing_type(self, billing_type: BillingType) -> List[Bill]:
+        return list(await self.db.scalars(select(Bill).where(Bill.billing_type == billing_type).order_by(desc(Bill.created_on))))
     
-    def find_bill_by_form_id(self, form_id: int) -> Bill:
-        bill = self.db.query(Bill).filter(Bill.form_id == form_id).first()
+    async def find_bill_by_form_id(self, form_id: int) -> Bill:
+        bill = (await self.db.scalars(select(Bill).where(Bill.form_id == form_id).limit(1))).first()
         if not bill:
             raise BillNotFoundException(f"Bill not found with formId: {form_id}")
         return bill
     
-    def delete_bill_by_form_id(self, form_id: int) -> None:
-        bill = self.find_bill_by_form_id(form_id)
-        self.db.delete(bill)
-        self.db.commit()
-    
-    def calculate_start_date(self, timeline: Timeline) -> datetime:
-        now = datetime.now()
-        if timeline == Timeline.TODAY:
-            return now.replace(hour=0, minute=0, second=0, microsecond=0)
-        elif timeline == Timeline.THIS_WEEK:
-            return now.replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=now.weekday())
-        elif timeline == Timeline.THIS_MONTH:
-            return now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-        elif timeline == Timeline.THIS_YEAR:
-            return now.replace(month=1, day=1, hour=0, minute=0, second=0, microsecond=0)
-        else:
-            raise ValueError("Invalid timeline")
\ No newline at end of file
+    async def delete_bill_by_form_id(self, form_id: int) -> None:
+        # form_id is unique, so at most one row comes back
+        deleted = (await self.db.execute(delete(Bill).where(Bill.form_id == form_id).returning(Bill.id))).scalar_one_or_none()
+        if deleted is None:
+            raise BillNotFoundException(f"Bill not found with formId: {form_id}")
+        await self.db.commit()
+        _invalidate_bill_lists()
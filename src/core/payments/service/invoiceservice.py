@@ -1,63 +1,96 @@
 from datetime import datetime
 from typing import Optional, List
 from decimal import Decimal
-from sqlalchemy.orm import Session
-from sqlalchemy import desc
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import desc, func, insert, select
 from fastapi import HTTPException, status
 from core.payments.model.invoice import Invoice
 from core.payments.dto.request.invoicecreate import InvoiceCreate
+from core.payments.dto.response.invoiceresponse import InvoiceResponse
 from core.payments.model.timeline import Timeline
-from core.payments.service.billservice import BillService
+from core.payments.service.pagination import encode_cursor, keyset_page
+from core.payments.service.timelines import since_start_date, timeline_criteria, timeline_params
 from core.exceptions.InvoiceException import InvoiceNotFoundException
 
+# Listing pages return plain rows of just the rendered columns, skipping ORM entity construction
+INVOICE_LIST_COLUMNS = tuple(getattr(Invoice, name) for name in InvoiceResponse.model_fields)
+
+# Listing statements are built once per (statement, timeline filter on/off); the
+# timeline start is bound at execute time from timeline_params()
+_INVOICE_LIST = select(Invoice).order_by(desc(Invoice.created_on), desc(Invoice.id))
+_INVOICE_PAGE = select(*INVOICE_LIST_COLUMNS, func.count().over().label("total")).order_by(desc(Invoice.created_on), desc(Invoice.id))
+_INVOICE_COUNT = select(func.count()).select_from(Invoice)
+_INVOICE_LIST_STMTS = {False: _INVOICE_LIST, True: since_start_date(_INVOICE_LIST, Invoice.created_on)}
+_INVOICE_PAGE_STMTS = {False: _INVOICE_PAGE, True: since_start_date(_INVOICE_PAGE, Invoice.created_on)}
+_INVOICE_COUNT_STMTS = {False: _INVOICE_COUNT, True: since_start_date(_INVOICE_COUNT, Invoice.created_on)}
+
+# Built once; create_invoice only binds the DTO's values
+_INVOICE_INSERT = insert(Invoice).returning(Invoice)
+
 class InvoiceService:
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
-        self.bill_service = BillService(db)
     
-    def create_invoice(self, invoice_data: InvoiceCreate) -> Invoice:
-        db_invoice = Invoice(**invoice_data.model_dump())
-        self.db.add(db_invoice)
-        self.db.commit()
-        self.db.refresh(db_invoice)
+    async def create_invoice(self, invoice_data: InvoiceCreate) -> Invoice:
+        # RETURNING hands back the server-defaulted timestamps, so no refresh is needed
+        db_invoice = await self.db.scalar(_INVOICE_INSERT, invoice_data.model_dump())
+        await self.db.commit()
         return db_invoice
     
-    def get_invoice_by_id(self, id: int) -> Invoice:
-        invoice = self.db.query(Invoice).filter(Invoice.id == id).first()
+    async def get_invoice_by_id(self, id: int) -> Invoice:
+        invoice = await self.db.get(Invoice, id)
         if not invoice:
             raise InvoiceNotFoundException(f"Invoice not found with id: {id}")
         return invoice
     
-    def get_invoice_by_invoice_number(self, invoice_number: str) -> Invoice:
-        invoice = self.db.query(Invoice).filter(Invoice.invoice_number == invoice_number).first()
+    async def get_invoice_by_invoice_number(self, invoice_number: str) -> Invoice:
+        invoice = (await self.db.execute(
+            select(Invoice).where(Invoice.invoice_number == invoice_number)
+        )).scalar_one_or_none()
         if not invoice:
             raise InvoiceNotFoundException(f"Invoice not found with invoice number: {invoice_number}")
         return invoice
     
-    def get_all_invoices(self, page: int, size: int, timeline: Optional[Timeline] = None) -> List[Invoice]:
-        query = self.db.query(Invoice)
-        
-        if timeline and timeline != Timeline.ALL:
-            start_date = self.bill_service.calculate_start_date(timeline)
-            query = query.filter(Invoice.created_on >= start_date)
-        
-        return query.order_by(desc(Invoice.created_on)).offset(page * size).limit(size).all()
+    async def get_all_invoices(self, page: int, size: int, timeline: Optional[Timeline] = None) -> List[Invoice]:
+        params = timeline_params(timeline)
+        stmt = _INVOICE_LIST_STMTS[bool(params)].offset(page * size).limit(size)
+        return list(await self.db.scalars(stmt, params))
     
-    def get_all_invoices_paginated(self, page: int, size: int, timeline: Optional[Timeline] = None) -> dict:
-        query = self.db.query(Invoice)
+    async def get_all_invoices_paginated(self, page: int, size: int, timeline: Optional[Timeline] = None, cursor: Optional[str] = None) -> dict:
+        """Offset page of invoices, or with `cursor` the keyset page after it (page is then ignored)."""
+        if cursor is not None:
+            criteria = timeline_criteria(Invoice.created_on, timeline)
+            result = await keyset_page(self.db, Invoice, INVOICE_LIST_COLUMNS, criteria, size, cursor)
+            return {
+                "invoices": result["rows"],
+                "total": None,
+                "page": page,
+                "size": size,
+                "has_next": result["has_next"],
+                "has_prev": True,
+                "next_cursor": result["next_cursor"]
+            }
         
-        if timeline and timeline != Timeline.ALL:
-            start_date = self.bill_service.calculate_start_date(timeline)
-            query = query.filter(Invoice.created_on >= start_date)
+        # count(*) OVER () returns the filtered total alongside the page in one round-trip
+        params = timeline_params(timeline)
+        rows = (await self.db.execute(
+            _INVOICE_PAGE_STMTS[bool(params)].offset(page * size).limit(size), params
+        )).all()
         
-        total = query.count()
-        invoices = query.order_by(desc(Invoice.created_on)).offset(page * size).limit(size).all()
+        if rows:
+            total = rows[0].total
+        elif page > 0:
+            # Past the last page there is no row to carry the window count
+            total = (await self.db.execute(_INVOICE_COUNT_STMTS[bool(params)], params)).scalar_one()
+        else:
+            total = 0
         
         return {
-            "invoices": invoices,
+            "invoices": rows,
             "total": total,
             "page": page,
             "size": size,
             "has_next": (page + 1) * size < total,
-            "has_prev": page > 0
+            "has_prev": page > 0,
+            "next_cursor": encode_cursor(rows[-1].created_on, rows[-1].id) if rows and (page + 1) * size < total else None
         }
\ No newline at end of file
@@ -0,0 +1,44 @@
+# core/payments/service/pagination.py
+
+import base64
+from datetime import datetime
+from typing import Tuple
+
+from sqlalchemy import desc, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+def encode_cursor(created_on: datetime, id: int) -> str:
+    """Opaque, URL-safe cursor for the row after which the next page starts."""
+    return base64.urlsafe_b64encode(f"{created_on.isoformat()}|{id}".encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        created_on, id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(created_on), int(id)
+    except ValueError:
+        raise ValueError(f"Invalid page cursor: {cursor}")
+
+
+async def keyset_page(db: AsyncSession, model, columns: tuple, criteria: list, size: int, cursor: str) -> dict:
+    """
+    Newest-first page of `columns` rows of `model` strictly after `cursor`.
+
+    Seeks on the (created_on, id) index instead of skipping rows with OFFSET; no
+    total is counted, since that would scan every remaining row anyway.
+    """
+    created_on, id = decode_cursor(cursor)
+    rows = (await db.execute(
+        select(*columns)
+        .where(*criteria, tuple_(model.created_on, model.id) < tuple_(created_on, id))
+        .order_by(desc(model.created_on), desc(model.id))
+        .limit(size + 1)
+    )).all()
+    has_next = len(rows) > size
+    rows = rows[:size]
+    return {
+        "rows": rows,
+        "has_next": has_next,
+        "next_cursor": encode_cursor(rows[-1].created_on, rows[-1].id) if has_next else None,
+    }
@@ -0,0 +1,153 @@
+# core/payments/service/payment_cache.py
+
+import asyncio
+import logging
+from typing import Any, Optional
+
+import orjson
+import redis
+import redis.asyncio as aioredis
+from redis.exceptions import RedisError
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class PaymentCache:
+    """
+    Short-lived Redis cache for read-only payment lookups that clients poll.
+
+    Also carries status-change events for the payment status stream over Pub/Sub.
+    A cache outage never fails a request: reads return None and writes are skipped.
+    """
+
+    STATUS_TTL_SECONDS = 3
+    WALLET_BALANCE_TTL_SECONDS = 15
+    WALLET_BALANCE_KEY = "pay:wallet:balance"
+
+    def __init__(self, client: Optional[redis.Redis] = None, async_client: Optional[aioredis.Redis] = None):
+        self._client = client
+        self._async_client = async_client
+
+    def _redis(self) -> redis.Redis:
+        if self._client is None:
+            pool = redis.BlockingConnectionPool(
+                host=settings.REDIS_HOST,
+                port=int(settings.REDIS_PORT),
+                password=settings.REDIS_PASSWORD or None,
+                db=0,
+                decode_responses=True,
+                max_connections=50,
+                timeout=1,
+                socket_connect_timeout=1,
+                socket_timeout=1,
+            )
+            self._client = redis.Redis(connection_pool=pool)
+        return self._client
+
+    def _async_redis(self) -> aioredis.Redis:
+        if self._async_client is None:
+            self._async_client = aioredis.Redis(
+                host=settings.REDIS_HOST,
+                port=int(settings.REDIS_PORT),
+                password=settings.REDIS_PASSWORD or None,
+                db=0,
+                decode_responses=True,
+                socket_connect_timeout=1,
+            )
+        return self._async_client
+
+    @staticmethod
+    def _status_key(transaction_id: str) -> str:
+        return f"pay:status:{transaction_id}"
+
+    @staticmethod
+    def _status_channel(transaction_id: str) -> str:
+        return f"pay:events:{transaction_id}"
+
+    def _get(self, key: str) -> Optional[Any]:
+        try:
+            cached = self._redis().get(key)
+        except RedisError as e:
+            logger.warning(f"Payment cache unavailable, reading {key} from source: {e}")
+            return None
+        return orjson.loads(cached) if cached is not None else None
+
+    def _set(self, key: str, ttl_seconds: int, value: Any) -> None:
+        try:
+            self._redis().setex(key, ttl_seconds, orjson.dumps(value))
+        except RedisError as e:
+            logger.warning(f"Payment cache unavailable, not caching {key}: {e}")
+
+    def get_status(self, transaction_id: str) -> Optional[dict]:
+        return self._get(self._status_key(transaction_id))
+
+    def set_status(self, transaction_id: str, status: dict) -> None:
+        self._set(self._status_key(transaction_id), self.STATUS_TTL_SECONDS, status)
+
+    def invalidate_status(self, *transaction_ids: Optional[str]) -> None:
+        keys = [self._status_key(txn_id) for txn_id in transaction_ids if txn_id]
+        if not keys:
+            return
+        try:
+            self._redis().delete(*keys)
+        except RedisError as e:
+            logger.warning(f"Payment cache unavailable, could not invalidate {keys}: {e}")
+
+    def publish_status(self, transaction_id: str, status: Optional[dict]) -> None:
+        if status is None:
+            return
+        try:
+            self._redis().publish(self._status_channel(transaction_id), orjson.dumps(status))
+        except RedisError as e:
+            logger.warning(f"Payment cache unavailable, status event for {transaction_id} not published: {e}")
+
+    async def subscribe_status(self, transaction_id: str) -> Optional[aioredis.client.PubSub]:
+        """Subscribe to status events for a transaction; None if Redis is unavailable."""
+        pubsub = self._async_redis().pubsub(ignore_subscribe_messages=True)
+        try:
+            await pubsub.subscribe(self._status_channel(transaction_id))
+        except RedisError as e:
+            logger.warning(f"Payment cache unavailable, status stream for {transaction_id} will poll: {e}")
+            await pubsub.aclose()
+            return None
+        return pubsub
+
+    async def next_status_message(self, pubsub: Optional[aioredis.client.PubSub], timeout: float) -> Optional[dict]:
+        """Next published status within `timeout` seconds, or None."""
+        if pubsub is None:
+            await asyncio.sleep(timeout)
+            return None
+        try:
+            message = await pubsub.get_message(timeout=timeout)
+        except RedisError as e:
+            logger.warning(f"Payment status subscription failed, falling back to polling: {e}")
+            await asyncio.sleep(timeout)
+            return None
+        return orjson.loads(message["data"]) if message else None
+
+    async def unsubscribe_status(self, pubsub: Optional[aioredis.client.PubSub]) -> None:
+        if pubsub is None:
+            return
+        try:
+            await pubsub.aclose()
+        except RedisError:
+            pass
+
+    async def close(self) -> None:
+        if self._async_client is not None:
+            await self._async_client.aclose()
+            self._async_client = None
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+
+    def get_wallet_balance(self) -> Optional[dict]:
+        return self._get(self.WALLET_BALANCE_KEY)
+
+    def set_wallet_balance(self, balance: dict) -> None:
+        self._set(self.WALLET_BALANCE_KEY, self.WALLET_BALANCE_TTL_SECONDS, balance)
+
+
+payment_cache = PaymentCache()
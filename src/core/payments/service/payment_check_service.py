@@ -1,30 +1,77 @@
 import logging
 import os
-from datetime import datetime
-from sqlalchemy.orm import Session
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session, load_only
 from apscheduler.schedulers.background import BackgroundScheduler
 from core.payments.model.payment import Payment
 from core.payments.model.paymentstatus import PaymentStatus
-from utilities.paymentgatewayclient import PaymentGatewayClient
+from core.payments.service.paymentservice import PaymentService
+from utilities.paymentgatewayclient import get_payment_gateway_client
 
 logger = logging.getLogger(__name__)
 
 class PaymentCheckService:
     _scheduler_instance = None
-    _payment_attempt_counts = {}  # Track attempts per payment
+    _orchard_executor = None
+    _payment_attempt_counts = OrderedDict()  # Track attempts per payment, oldest first
+    _pending_checks = {}  # payment_id -> (max_attempts, monotonic time the next check is due)
+    _pending_lock = threading.Lock()
+
+    SWEEPER_JOB_ID = "payment_check_sweeper"
 
     # Default configuration
     DEFAULT_CHECK_INTERVAL_SECONDS = 30
     DEFAULT_MAX_ATTEMPTS = 10
+    # First check runs this soon; each later delay doubles up to the configured check interval
+    INITIAL_CHECK_DELAY_SECONDS = 5
+    # Orchard status lookups run concurrently per sweep over the gateway client's pooled connections
+    ORCHARD_QUERY_WORKERS = 16
+    # Payments left mid-flight this recently are picked back up at startup
+    RESUME_LOOKBACK_SECONDS = 3600
+    # Upper bound on payments tracked at once; the oldest is dropped beyond this
+    MAX_TRACKED_PAYMENTS = 50_000
+
+    TERMINAL_FAILED_STATES = frozenset({
+        PaymentStatus.CTM_FAILED, PaymentStatus.MTC_FAILED, PaymentStatus.ATP_FAILED,
+        PaymentStatus.BLP_FAILED, PaymentStatus.FAILED,
+    })
+    # Status -> (leg to query on Orchard, Payment attribute holding that leg's transaction id)
+    CHECK_LEGS = {
+        PaymentStatus.PENDING: ("CTM", "transaction_id"),
+        PaymentStatus.MTC_PROCESSING: ("MTC", "mtc_transaction_id"),
+        PaymentStatus.ATP_PROCESSING: ("ATP", "atp_transaction_id"),
+        PaymentStatus.BLP_PROCESSING: ("BLP", "blp_transaction_id"),
+    }
+    # Second-stage status -> (status when that leg fails, failure reason sent to the customer)
+    SECOND_STAGE_LEGS = {
+        PaymentStatus.MTC_PROCESSING: (PaymentStatus.MTC_FAILED, "Payout failed. Reversal being processed."),
+        PaymentStatus.ATP_PROCESSING: (PaymentStatus.ATP_FAILED, "Airtime request failed. Refund being processed."),
+        PaymentStatus.BLP_PROCESSING: (PaymentStatus.BLP_FAILED, "Bill payment failed. Refund being processed."),
+    }
+
+    # Columns the status check reads; the rest load on access when a transition hands the payment on
+    CHECK_COLUMNS = load_only(
+        Payment.status, Payment.transaction_id, Payment.mtc_transaction_id, Payment.atp_transaction_id,
+        Payment.blp_transaction_id, Payment.intent, Payment.original_payment_id, Payment.updated_on
+    )
 
     def __init__(self, db: Session = None):
         self.db = db
-        self.payment_gateway_client = PaymentGatewayClient()
+        self.payment_gateway_client = get_payment_gateway_client()
 
         # Use singleton scheduler instance
         if PaymentCheckService._scheduler_instance is None:
             PaymentCheckService._scheduler_instance = BackgroundScheduler()
         self.scheduler = PaymentCheckService._scheduler_instance
+        if PaymentCheckService._orchard_executor is None:
+            PaymentCheckService._orchard_executor = ThreadPoolExecutor(
+                max_workers=PaymentCheckService.ORCHARD_QUERY_WORKERS, thread_name_prefix="orchard-status"
+            )
 
         # Load configuration from environment variables
         self.check_interval_seconds = self._get_check_interval()
@@ -58,131 +105,186 @@ class PaymentCheckService:
             logger.warning(f"[CONFIG] Invalid PAYMENT_CHECK_MAX_ATTEMPTS, using default: {PaymentCheckService.DEFAULT_MAX_ATTEMPTS}")
             return PaymentCheckService.DEFAULT_MAX_ATTEMPTS
 
-    def schedule_payment_status_check(self, payment_id: int, check_interval_seconds: int = None, max_attempts: int = None):
+    def schedule_payment_status_check(self, payment_id: int, max_attempts: int = None):
         """
-        Schedule a background job to check payment status.
+        Add a payment to the background status sweep.
 
-        Uses configured intervals from environment variables if not explicitly provided.
+        A single sweeper job checks every pending payment that is due, instead of one
+        scheduler job per payment. Checks back off from INITIAL_CHECK_DELAY_SECONDS to the
+        configured check interval, so fast payments resolve sooner and slow ones are polled less.
 
         Args:
             payment_id: The payment ID to check
-            check_interval_seconds: Check every N seconds (default: from env or 30)
             max_attempts: Maximum number of checks before marking as failed (default: from env or 10)
         """
         try:
-            # Use instance config if not provided
-            if check_interval_seconds is None:
-                check_interval_seconds = self.check_interval_seconds
             if max_attempts is None:
                 max_attempts = self.max_attempts
 
-            job_id = f"payment_check_{payment_id}"
+            with PaymentCheckService._pending_lock:
+                PaymentCheckService._pending_checks[payment_id] = (max_attempts, time.monotonic() + self._check_delay(0))
+                # Initialize attempt counter for this payment
+                PaymentCheckService._payment_attempt_counts[payment_id] = 0
+
+            total_duration_seconds = self._total_wait_seconds(max_attempts)
+            logger.info(f"[PAYMENT_CHECK_SCHEDULED] Payment {payment_id} added to status sweep - Checks back off from {self._check_delay(0)}s to every {self.check_interval_seconds}s, max {max_attempts} attempts ({total_duration_seconds}s total)")
+
+            self._ensure_sweeper()
+
+        except Exception as e:
+            logger.error(f"[PAYMENT_CHECK_SCHEDULE_ERROR] Failed to schedule payment check: {str(e)}", exc_info=True)
 
-            # Initialize attempt counter for this payment
-            PaymentCheckService._payment_attempt_counts[payment_id] = 0
+    def _check_delay(self, attempt: int) -> int:
+        """Seconds to wait before the check that follows `attempt` completed checks."""
+        return min(PaymentCheckService.INITIAL_CHECK_DELAY_SECONDS << min(attempt, 16), self.check_interval_seconds)
 
-            # Calculate total duration
-            total_duration_seconds = check_interval_seconds * max_attempts
+    def _total_wait_seconds(self, max_attempts: int) -> int:
+        return sum(self._check_delay(attempt) for attempt in range(max_attempts))
 
-            # Schedule the check to run every N seconds
+    def _ensure_sweeper(self):
+        """Register the sweeper job and start the scheduler on first use."""
+        if self.scheduler.get_job(PaymentCheckService.SWEEPER_JOB_ID) is None:
             self.scheduler.add_job(
-                func=self.check_payment_status,
+                func=self._sweep,
                 trigger="interval",
-                seconds=check_interval_seconds,
-                args=[payment_id, max_attempts, check_interval_seconds],
-                id=job_id,
+                seconds=self._check_delay(0),  # Finest back-off step, so due checks run close to on time
+                id=PaymentCheckService.SWEEPER_JOB_ID,
                 replace_existing=True,
-                max_instances=1  # Prevent multiple concurrent runs of same job
+                max_instances=1,  # A slow sweep delays the next one rather than overlapping it
+                coalesce=True,
+                misfire_grace_time=60
             )
+            logger.info(f"[PAYMENT_CHECK_SWEEPER] Sweeper job registered - every {self._check_delay(0)}s")
 
-            logger.info(f"[PAYMENT_CHECK_SCHEDULED] Job {job_id} scheduled for payment {payment_id} - Check every {check_interval_seconds}s, max {max_attempts} attempts ({total_duration_seconds}s total)")
+        if not self.scheduler.running:
+            self.scheduler.start()
+            logger.info("[SCHEDULER] Background scheduler started")
 
-            if not self.scheduler.running:
-                self.scheduler.start()
-                logger.info("[SCHEDULER] Background scheduler started")
+    @classmethod
+    def resume_pending_checks(cls) -> int:
+        """
+        Re-enrol payments still awaiting an Orchard leg in the status sweep.
 
+        Pending checks are held in memory, so a restart drops them; the payment rows
+        themselves record which payments are mid-flight.
+        """
+        from utilities.dbconfig import SessionLocal
+        with SessionLocal() as db:
+            payment_ids = db.scalars(
+                select(Payment.id).where(
+                    Payment.status.in_(list(cls.CHECK_LEGS)),
+                    Payment.updated_on >= func.now() - timedelta(seconds=cls.RESUME_LOOKBACK_SECONDS)
+                )
+            ).all()
+
+        if payment_ids:
+            service = cls()
+            for payment_id in payment_ids:
+                service.schedule_payment_status_check(payment_id)
+            logger.info(f"[PAYMENT_CHECK_RESUMED] Resumed status checks for {len(payment_ids)} payment(s)")
+        return len(payment_ids)
+
+    def _sweep(self):
+        """Check every pending payment that is due, loading them all in one query and one session."""
+        now = time.monotonic()
+        with PaymentCheckService._pending_lock:
+            due = {
+                payment_id: max_attempts
+                for payment_id, (max_attempts, due_at) in PaymentCheckService._pending_checks.items()
+                if due_at <= now
+            }
+        if not due:
+            return
+
+        from utilities.dbconfig import SessionLocal
+        try:
+            with SessionLocal(expire_on_commit=False) as db:
+                payments = {payment.id: payment for payment in db.query(Payment).options(PaymentCheckService.CHECK_COLUMNS).filter(Payment.id.in_(due)).all()}
+                logger.info(f"[PAYMENT_CHECK_SWEEP] Checking {len(due)} due payment(s)")
+                orchard_statuses = self._query_orchard_statuses(payments.values())
+                for payment_id, max_attempts in due.items():
+                    # A callback may have settled and unscheduled the payment while Orchard was queried
+                    if payment_id not in PaymentCheckService._pending_checks:
+                        continue
+                    self._check_payment(db, payment_id, payments.get(payment_id), max_attempts, orchard_statuses)
+                    self._schedule_next_check(payment_id)
         except Exception as e:
-            logger.error(f"[PAYMENT_CHECK_SCHEDULE_ERROR] Failed to schedule payment check: {str(e)}", exc_info=True)
+            logger.error(f"[PAYMENT_CHECK_SWEEP_ERROR] Payment status sweep failed: {str(e)}", exc_info=True)
+
+    def _query_orchard_statuses(self, payments) -> dict:
+        """Look up every payment's current leg on Orchard concurrently; transaction id -> status."""
+        transaction_ids = list({
+            transaction_id
+            for transaction_id in (self._transaction_to_check(payment)[1] for payment in payments)
+            if transaction_id
+        })
+        statuses = PaymentCheckService._orchard_executor.map(self._query_orchard_transaction_status, transaction_ids)
+        return dict(zip(transaction_ids, statuses))
 
-    def check_payment_status(self, payment_id: int, max_attempts: int, check_interval_seconds: int):
+    @staticmethod
+    def _transaction_to_check(payment: Payment):
+        """(leg name, transaction id) to query for the payment's current status, or (None, None)."""
+        leg = PaymentCheckService.CHECK_LEGS.get(payment.status)
+        if not leg:
+            return None, None
+        check_type, id_attr = leg
+        return check_type, getattr(payment, id_attr)
+
+    def _schedule_next_check(self, payment_id: int):
+        """Push a still-pending payment's next check out by its back-off delay."""
+        with PaymentCheckService._pending_lock:
+            entry = PaymentCheckService._pending_checks.get(payment_id)
+            if entry is not None:
+                attempt = PaymentCheckService._payment_attempt_counts.get(payment_id, 0)
+                PaymentCheckService._pending_checks[payment_id] = (entry[0], time.monotonic() + self._check_delay(attempt))
+
+    def _check_payment(self, db: Session, payment_id: int, payment, max_attempts: int, orchard_statuses: dict = None):
         """
         Check the payment status with Orchard API.
-        Runs every 30 seconds, up to 10 times (5 minutes total).
+        `orchard_statuses` carries statuses the sweep already fetched, keyed by transaction id.
+        Runs on a back-off from 5 seconds up to the check interval (30 seconds), up to max attempts (10).
         If still processing after max attempts, mark as failed.
         """
         try:
-            from utilities.dbconfig import SessionLocal
-            db = SessionLocal()
-
-            # Increment attempt counter
-            current_attempt = PaymentCheckService._payment_attempt_counts.get(payment_id, 0) + 1
-            PaymentCheckService._payment_attempt_counts[payment_id] = current_attempt
+            current_attempt = PaymentCheckService._record_attempt(payment_id)
+            payment_service = PaymentService(db, self.payment_gateway_client)
 
             logger.info(f"[PAYMENT_CHECK_START] Checking status for payment {payment_id} (Attempt {current_attempt}/{max_attempts})")
 
-            payment = db.query(Payment).filter(Payment.id == payment_id).first()
-
             if not payment:
                 logger.error(f"[PAYMENT_CHECK_NOT_FOUND] Payment not found: {payment_id}")
                 self._stop_check_job(payment_id)
-                db.close()
                 return
 
-            logger.info(f"[PAYMENT_CHECK_STATUS] Current status: {payment.status} | Transaction ID: {payment.transaction_id} | MTC Transaction ID: {payment.mtc_transaction_id}")
+            # Status as loaded; branches below dispatch on this and assign payment.status for writes
+            current_status = payment.status
+            logger.info(f"[PAYMENT_CHECK_STATUS] Current status: {current_status} | Transaction ID: {payment.transaction_id} | MTC Transaction ID: {payment.mtc_transaction_id}")
 
             # If already SUCCESS, stop checking
-            if payment.status == PaymentStatus.SUCCESS:
+            if current_status == PaymentStatus.SUCCESS:
                 logger.info(f"[PAYMENT_CHECK_ALREADY_SUCCESS] Payment {payment_id} already marked SUCCESS")
                 self._stop_check_job(payment_id)
-                db.close()
                 return
 
             # If terminal failed state, stop checking
-            if payment.status in [PaymentStatus.CTM_FAILED, PaymentStatus.MTC_FAILED, PaymentStatus.ATP_FAILED, PaymentStatus.BLP_FAILED, PaymentStatus.FAILED]:
-                logger.info(f"[PAYMENT_CHECK_TERMINAL_FAILED] Payment {payment_id} in terminal failed state: {payment.status}")
+            if current_status in PaymentCheckService.TERMINAL_FAILED_STATES:
+                logger.info(f"[PAYMENT_CHECK_TERMINAL_FAILED] Payment {payment_id} in terminal failed state: {current_status}")
                 logger.info(f"[PAYMENT_CHECK_TERMINAL_FAILED_STOP] Stopping job - no further checks needed")
                 self._stop_check_job(payment_id)
-                db.close()
                 return
 
             # Query Orchard API for either CTM or MTC status based on payment status
-            transaction_id_to_check = None
-            check_type = None
-
-            if payment.status == PaymentStatus.PENDING:
-                # Check CTM status using main transaction_id
-                if payment.transaction_id:
-                    transaction_id_to_check = payment.transaction_id
-                    check_type = "CTM"
-                else:
-                    logger.warning(f"[PAYMENT_CHECK_MISSING_TXN_ID] Payment {payment_id} is PENDING but has no transaction_id")
-            elif payment.status == PaymentStatus.MTC_PROCESSING:
-                # Check MTC status using mtc_transaction_id
-                if payment.mtc_transaction_id:
-                    transaction_id_to_check = payment.mtc_transaction_id
-                    check_type = "MTC"
-                else:
-                    logger.warning(f"[PAYMENT_CHECK_MISSING_MTC_TXN_ID] Payment {payment_id} is MTC_PROCESSING but has no mtc_transaction_id")
-            elif payment.status == PaymentStatus.ATP_PROCESSING:
-                # Check ATP status using atp_transaction_id
-                if payment.atp_transaction_id:
-                    transaction_id_to_check = payment.atp_transaction_id
-                    check_type = "ATP"
-                else:
-                    logger.warning(f"[PAYMENT_CHECK_MISSING_ATP_TXN_ID] Payment {payment_id} is ATP_PROCESSING but has no atp_transaction_id")
-            elif payment.status == PaymentStatus.BLP_PROCESSING:
-                # Check BLP status using blp_transaction_id
-                if payment.blp_transaction_id:
-                    transaction_id_to_check = payment.blp_transaction_id
-                    check_type = "BLP"
-                else:
-                    logger.warning(f"[PAYMENT_CHECK_MISSING_BLP_TXN_ID] Payment {payment_id} is BLP_PROCESSING but has no blp_transaction_id")
+            check_type, transaction_id_to_check = self._transaction_to_check(payment)
+            if check_type and not transaction_id_to_check:
+                logger.warning(f"[PAYMENT_CHECK_MISSING_{check_type}_TXN_ID] Payment {payment_id} is {current_status} but has no {PaymentCheckService.CHECK_LEGS[current_status][1]}")
 
             if transaction_id_to_check:
                 logger.info(f"[PAYMENT_CHECK_QUERY_API] Querying Orchard API for {check_type} transaction: {transaction_id_to_check}")
 
-                # Query Orchard API for transaction status
-                status = self._query_orchard_transaction_status(transaction_id_to_check)
+                # Query Orchard API for transaction status, unless the sweep already did
+                status = (orchard_statuses or {}).get(transaction_id_to_check)
+                if status is None:
+                    status = self._query_orchard_transaction_status(transaction_id_to_check)
 
                 if status == "SUCCESS":
                     logger.info(f"[PAYMENT_CHECK_API_SUCCESS] Orchard API confirms payment success for {payment_id} on attempt {current_attempt}")
@@ -193,28 +295,17 @@ class PaymentCheckService:
                     if is_reversal:
                         # This is a reversal payment - it's just a single MTC, no second stage
                         logger.info(f"[PAYMENT_CHECK_REVERSAL_SUCCESS] Reversal payment {payment_id} confirmed successful (refund to original sender)")
-                        payment.status = PaymentStatus.SUCCESS
-                        payment.updated_on = datetime.now()
-                        db.add(payment)
-                        db.commit()
-                        db.refresh(payment)
+                        self._set_status(db, payment, PaymentStatus.SUCCESS)
                         logger.info(f"[PAYMENT_CHECK_UPDATED] Reversal payment {payment_id} marked SUCCESS")
                         self._stop_check_job(payment_id)
-                    elif payment.status == PaymentStatus.PENDING:
+                    elif current_status == PaymentStatus.PENDING:
                         # This is CTM success - initiate second stage (MTC or ATP)
                         logger.info(f"[PAYMENT_CHECK_CTM_SUCCESS] CTM confirmed successful for payment {payment_id}")
-                        payment.status = PaymentStatus.CTM_SUCCESS
-                        payment.updated_on = datetime.now()
-                        db.add(payment)
-                        db.commit()
-                        db.refresh(payment)  # Refresh to ensure object is in sync with database
+                        self._set_status(db, payment, PaymentStatus.CTM_SUCCESS)
                         logger.info(f"[PAYMENT_CHECK_STATUS_UPDATED] Payment {payment_id} marked CTM_SUCCESS")
 
                         # Determine second stage based on intent
                         try:
-                            from core.payments.service.paymentservice import PaymentService
-                            payment_service = PaymentService(db)
-
                             if payment.intent == "buy_airtime":
                                 # Check if ATP was already initiated by callback to prevent duplicate ATP initiation
                                 if payment.atp_transaction_id is not None:
@@ -260,65 +351,18 @@ class PaymentCheckService:
                             payment = db.query(Payment).filter(Payment.id == payment_id).first()
                             if payment:
                                 payment.status = PaymentStatus.CTM_FAILED
-                                db.add(payment)
                                 db.commit()
+                            self._stop_check_job(payment_id)
 
-                    elif payment.status == PaymentStatus.MTC_PROCESSING:
-                        # This is MTC success - final success
-                        logger.info(f"[PAYMENT_CHECK_MTC_SUCCESS] MTC confirmed successful for payment {payment_id}")
-                        payment.status = PaymentStatus.SUCCESS
-                        payment.updated_on = datetime.now()
-                        db.add(payment)
-                        db.commit()
-                        db.refresh(payment)  # Refresh to ensure object is in sync with database
-                        logger.info(f"[PAYMENT_CHECK_UPDATED] Payment {payment_id} marked SUCCESS")
-
-                        # Send WhatsApp notification with receipt
-                        try:
-                            from core.payments.service.paymentservice import PaymentService
-                            payment_service = PaymentService(db)
-                            payment_service.send_payment_notification(payment, is_success=True)
-                            logger.info(f"[PAYMENT_CHECK_NOTIFICATION] Success notification sent for payment {payment_id}")
-                        except Exception as e:
-                            logger.error(f"[PAYMENT_CHECK_NOTIFICATION_ERROR] Failed to send success notification for payment {payment_id}: {str(e)}", exc_info=True)
-
-                        self._stop_check_job(payment_id)
-
-                    elif payment.status == PaymentStatus.ATP_PROCESSING:
-                        # This is ATP success - final success
-                        logger.info(f"[PAYMENT_CHECK_ATP_SUCCESS] ATP confirmed successful for payment {payment_id}")
-                        payment.status = PaymentStatus.SUCCESS
-                        payment.updated_on = datetime.now()
-                        db.add(payment)
-                        db.commit()
-                        db.refresh(payment)  # Refresh to ensure object is in sync with database
-                        logger.info(f"[PAYMENT_CHECK_UPDATED] Payment {payment_id} marked SUCCESS")
-
-                        # Send WhatsApp notification with receipt
-                        try:
-                            from core.payments.service.paymentservice import PaymentService
-                            payment_service = PaymentService(db)
-                            payment_service.send_payment_notification(payment, is_success=True)
-                            logger.info(f"[PAYMENT_CHECK_NOTIFICATION] Success notification sent for payment {payment_id}")
-                        except Exception as e:
-                            logger.error(f"[PAYMENT_CHECK_NOTIFICATION_ERROR] Failed to send success notification for payment {payment_id}: {str(e)}", exc_info=True)
-
-                        self._stop_check_job(payment_id)
-
-                    elif payment.status == PaymentStatus.BLP_PROCESSING:
-                        # This is BLP success - final success
-                        logger.info(f"[PAYMENT_CHECK_BLP_SUCCESS] BLP confirmed successful for payment {payment_id}")
-                        payment.status = PaymentStatus.SUCCESS
-                        payment.updated_on = datetime.now()
-                        db.add(payment)
-                        db.commit()
-                        db.refresh(payment)  # Refresh to ensure object is in sync with database
+                    elif current_status in PaymentCheckService.SECOND_STAGE_LEGS:
+                        # Second-stage (MTC/ATP/BLP) success - final success
+                        leg = PaymentCheckService.CHECK_LEGS[current_status][0]
+                        logger.info(f"[PAYMENT_CHECK_{leg}_SUCCESS] {leg} confirmed successful for payment {payment_id}")
+                        self._set_status(db, payment, PaymentStatus.SUCCESS)
                         logger.info(f"[PAYMENT_CHECK_UPDATED] Payment {payment_id} marked SUCCESS")
 
                         # Send WhatsApp notification with receipt
                         try:
-                            from core.payments.service.paymentservice import PaymentService
-                            payment_service = PaymentService(db)
                             payment_service.send_payment_notification(payment, is_success=True)
                             logger.info(f"[PAYMENT_CHECK_NOTIFICATION] Success notification sent for payment {payment_id}")
                         except Exception as e:
@@ -328,11 +372,8 @@ class PaymentCheckService:
 
                     else:
                         # Unexpected status, mark as success anyway
-                        logger.warning(f"[PAYMENT_CHECK_UNEXPECTED_STATUS] Payment {payment_id} in status {payment.status}, marking SUCCESS")
-                        payment.status = PaymentStatus.SUCCESS
-                        payment.updated_on = datetime.now()
-                        db.add(payment)
-                        db.commit()
+                        logger.warning(f"[PAYMENT_CHECK_UNEXPECTED_STATUS] Payment {payment_id} in status {current_status}, marking SUCCESS")
+                        self._set_status(db, payment, PaymentStatus.SUCCESS)
                         self._stop_check_job(payment_id)
 
                 elif status == "FAILED":
@@ -345,15 +386,13 @@ class PaymentCheckService:
                         # Reversal payment failed - just mark as failed, don't create another reversal
                         logger.warning(f"[PAYMENT_CHECK_REVERSAL_FAILED] Reversal payment {payment_id} failed")
                         payment.status = PaymentStatus.FAILED
-                    elif payment.status == PaymentStatus.PENDING:
+                    elif current_status == PaymentStatus.PENDING:
                         # CTM failed - send notification to user
                         logger.warning(f"[PAYMENT_CHECK_CTM_FAILED] Payment {payment_id} CTM failed")
                         payment.status = PaymentStatus.CTM_FAILED
 
                         # Send failure notification for CTM
                         try:
-                            from core.payments.service.paymentservice import PaymentService
-                            payment_service = PaymentService(db)
                             payment_service.send_payment_notification(
                                 payment,
                                 is_success=False,
@@ -362,15 +401,15 @@ class PaymentCheckService:
                             logger.info(f"[PAYMENT_CHECK_CTM_NOTIFICATION] CTM failure notification sent for payment {payment_id}")
                         except Exception as e:
                             logger.error(f"[PAYMENT_CHECK_CTM_NOTIFICATION_ERROR] Failed to send CTM failure notification: {str(e)}", exc_info=True)
-                    elif payment.status == PaymentStatus.MTC_PROCESSING:
-                        # MTC failed - initiate reversal and send failure notification
-                        logger.warning(f"[PAYMENT_CHECK_MTC_FAILED] Payment {payment_id} MTC failed")
-                        payment.status = PaymentStatus.MTC_FAILED
+                    elif current_status in PaymentCheckService.SECOND_STAGE_LEGS:
+                        # Second-stage (MTC/ATP/BLP) failed - initiate reversal and send failure notification
+                        leg = PaymentCheckService.CHECK_LEGS[current_status][0]
+                        failed_status, failure_reason = PaymentCheckService.SECOND_STAGE_LEGS[current_status]
+                        logger.warning(f"[PAYMENT_CHECK_{leg}_FAILED] Payment {payment_id} {leg} failed")
+                        payment.status = failed_status
 
                         # Initiate reversal transaction (refund to sender)
                         try:
-                            from core.payments.service.paymentservice import PaymentService
-                            payment_service = PaymentService(db)
                             payment_service._initiate_reversal(payment)
                             logger.info(f"[REVERSAL_INITIATED] Reversal initiated for failed payment {payment_id}")
                         except Exception as e:
@@ -378,72 +417,16 @@ class PaymentCheckService:
 
                         # Send failure notification with receipt
                         try:
-                            from core.payments.service.paymentservice import PaymentService
-                            payment_service = PaymentService(db)
                             payment_service.send_payment_notification(
                                 payment,
                                 is_success=False,
-                                failure_reason="Payout failed. Reversal being processed."
+                                failure_reason=failure_reason
                             )
                             logger.info(f"[PAYMENT_CHECK_NOTIFICATION] Failure notification sent for payment {payment_id}")
                         except Exception as e:
                             logger.error(f"[PAYMENT_CHECK_NOTIFICATION_ERROR] Failed to send failure notification: {str(e)}", exc_info=True)
-                    elif payment.status == PaymentStatus.ATP_PROCESSING:
-                        # ATP failed - initiate reversal and send failure notification
-                        logger.warning(f"[PAYMENT_CHECK_ATP_FAILED] Payment {payment_id} ATP failed")
-                        payment.status = PaymentStatus.ATP_FAILED
-
-                        # Initiate reversal transaction (refund to sender)
-                        try:
-                            from core.payments.service.paymentservice import PaymentService
-                            payment_service = PaymentService(db)
-                            payment_service._initiate_reversal(payment)
-                            logger.info(f"[REVERSAL_INITIATED] Reversal initiated for failed payment {payment_id}")
-                        except Exception as e:
-                            logger.error(f"[REVERSAL_ERROR] Error initiating reversal: {str(e)}", exc_info=True)
 
-                        # Send failure notification with receipt
-                        try:
-                            from core.payments.service.paymentservice import PaymentService
-                            payment_service = PaymentService(db)
-                            payment_service.send_payment_notification(
-                                payment,
-                                is_success=False,
-                                failure_reason="Airtime request failed. Refund being processed."
-                            )
-                            logger.info(f"[PAYMENT_CHECK_NOTIFICATION] Failure notification sent for payment {payment_id}")
-                        except Exception as e:
-                            logger.error(f"[PAYMENT_CHECK_NOTIFICATION_ERROR] Failed to send failure notification: {str(e)}", exc_info=True)
-
-                    elif payment.status == PaymentStatus.BLP_PROCESSING:
-                        # BLP failed - initiate reversal and send failure notification
-                        logger.warning(f"[PAYMENT_CHECK_BLP_FAILED] Payment {payment_id} BLP failed")
-                        payment.status = PaymentStatus.BLP_FAILED
-
-                        # Initiate reversal transaction (refund to sender)
-                        try:
-                            from core.payments.service.paymentservice import PaymentService
-                            payment_service = PaymentService(db)
-                            payment_service._initiate_reversal(payment)
-                            logger.info(f"[REVERSAL_INITIATED] Reversal initiated for failed payment {payment_id}")
-                        except Exception as e:
-                            logger.error(f"[REVERSAL_ERROR] Error initiating reversal: {str(e)}", exc_info=True)
-
-                        # Send failure notification with receipt
-                        try:
-                            from core.payments.service.paymentservice import PaymentService
-                            payment_service = PaymentService(db)
-                            payment_service.send_payment_notification(
-                                payment,
-                                is_success=False,
-                                failure_reason="Bill payment failed. Refund being processed."
-                            )
-                            logger.info(f"[PAYMENT_CHECK_NOTIFICATION] Failure notification sent for payment {payment_id}")
-                        except Exception as e:
-                            logger.error(f"[PAYMENT_CHECK_NOTIFICATION_ERROR] Failed to send failure notification: {str(e)}", exc_info=True)
-
-                    payment.updated_on = datetime.now()
-                    db.add(payment)
+                    payment.updated_on = func.now()
                     db.commit()
                     logger.warning(f"[PAYMENT_CHECK_UPDATED] Payment {payment_id} marked as failed")
                     self._stop_check_job(payment_id)
@@ -452,7 +435,7 @@ class PaymentCheckService:
                     # Still processing (PENDING)
                     if current_attempt >= max_attempts:
                         # Max attempts reached, mark as failed
-                        total_wait_seconds = check_interval_seconds * max_attempts
+                        total_wait_seconds = self._total_wait_seconds(max_attempts)
                         logger.warning(f"[PAYMENT_CHECK_MAX_ATTEMPTS] Payment {payment_id} reached max attempts ({max_attempts}) after {total_wait_seconds}s")
 
                         # Check if this is a reversal payment
@@ -462,14 +445,12 @@ class PaymentCheckService:
                             # Reversal timeout - just mark as failed
                             payment.status = PaymentStatus.FAILED
                             logger.warning(f"[PAYMENT_CHECK_REVERSAL_TIMEOUT] Reversal payment {payment_id} timeout after {total_wait_seconds}s")
-                        elif payment.status == PaymentStatus.PENDING:
+                        elif current_status == PaymentStatus.PENDING:
                             payment.status = PaymentStatus.CTM_FAILED
                             logger.warning(f"[PAYMENT_CHECK_CTM_TIMEOUT] Payment {payment_id} CTM timeout after {total_wait_seconds}s")
 
                             # Send timeout notification for CTM
                             try:
-                                from core.payments.service.paymentservice import PaymentService
-                                payment_service = PaymentService(db)
                                 payment_service.send_payment_notification(
                                     payment,
                                     is_success=False,
@@ -482,8 +463,7 @@ class PaymentCheckService:
                             payment.status = PaymentStatus.MTC_FAILED
                             logger.warning(f"[PAYMENT_CHECK_MTC_TIMEOUT] Payment {payment_id} MTC timeout after {total_wait_seconds}s")
 
-                        payment.updated_on = datetime.now()
-                        db.add(payment)
+                        payment.updated_on = func.now()
                         db.commit()
                         logger.warning(f"[PAYMENT_CHECK_UPDATED] Payment {payment_id} marked as failed due to timeout")
                         self._stop_check_job(payment_id)
@@ -497,7 +477,7 @@ class PaymentCheckService:
 
                 if current_attempt >= max_attempts:
                     # Max attempts reached, mark as failed
-                    total_wait_seconds = check_interval_seconds * max_attempts
+                    total_wait_seconds = self._total_wait_seconds(max_attempts)
                     logger.warning(f"[PAYMENT_CHECK_MAX_ATTEMPTS] Payment {payment_id} reached max attempts ({max_attempts}) after {total_wait_seconds}s")
 
                     # Check if this is a reversal payment
@@ -507,23 +487,20 @@ class PaymentCheckService:
                         # Reversal timeout - just mark as failed
                         payment.status = PaymentStatus.FAILED
                         logger.warning(f"[PAYMENT_CHECK_REVERSAL_TIMEOUT] Reversal payment {payment_id} timeout after {total_wait_seconds}s")
-                    elif payment.status == PaymentStatus.PENDING:
+                    elif current_status == PaymentStatus.PENDING:
                         payment.status = PaymentStatus.CTM_FAILED
                         logger.warning(f"[PAYMENT_CHECK_CTM_TIMEOUT] Payment {payment_id} CTM timeout after {total_wait_seconds}s")
                     else:
                         payment.status = PaymentStatus.MTC_FAILED
                         logger.warning(f"[PAYMENT_CHECK_MTC_TIMEOUT] Payment {payment_id} MTC timeout after {total_wait_seconds}s")
 
-                    payment.updated_on = datetime.now()
-                    db.add(payment)
+                    payment.updated_on = func.now()
                     db.commit()
                     logger.warning(f"[PAYMENT_CHECK_UPDATED] Payment {payment_id} marked as failed due to timeout")
 
                     # Send notification for CTM timeout (no transaction ID case)
                     if payment.status == PaymentStatus.CTM_FAILED:
                         try:
-                            from core.payments.service.paymentservice import PaymentService
-                            payment_service = PaymentService(db)
                             payment_service.send_payment_notification(
                                 payment,
                                 is_success=False,
@@ -539,29 +516,46 @@ class PaymentCheckService:
 
         except Exception as e:
             logger.error(f"[PAYMENT_CHECK_ERROR] Error checking payment status for payment {payment_id}: {str(e)}", exc_info=True)
+            # Leave the session usable for the rest of the sweep
+            db.rollback()
             # Continue retrying on error unless max attempts reached
             current_attempt = PaymentCheckService._payment_attempt_counts.get(payment_id, 0)
             if current_attempt >= max_attempts:
                 self._stop_check_job(payment_id)
-        finally:
-            db.close()
+
+    @staticmethod
+    def _set_status(db: Session, payment: Payment, status: PaymentStatus):
+        """Write only the status columns of a payment, keeping the loaded object in step."""
+        db.query(Payment).filter(Payment.id == payment.id).update(
+            {Payment.status: status, Payment.updated_on: func.now()},
+            synchronize_session="evaluate"
+        )
+        db.commit()
+
+    @staticmethod
+    def _record_attempt(payment_id: int) -> int:
+        """Increment and return the attempt count for a payment, evicting the oldest tracked payment when full."""
+        counts = PaymentCheckService._payment_attempt_counts
+        with PaymentCheckService._pending_lock:
+            current_attempt = counts.get(payment_id, 0) + 1
+            counts[payment_id] = current_attempt
+            counts.move_to_end(payment_id)
+            while len(counts) > PaymentCheckService.MAX_TRACKED_PAYMENTS:
+                evicted_id, _ = counts.popitem(last=False)
+                PaymentCheckService._pending_checks.pop(evicted_id, None)
+                logger.warning(f"[PAYMENT_CHECK_EVICTED] Too many tracked payments, dropped payment {evicted_id} from status sweep")
+        return current_attempt
 
     def _stop_check_job(self, payment_id: int):
         """
-        Stop the background job for a payment and clean up attempt counter.
+        Drop a payment from the status sweep and clean up its attempt counter.
         """
-        try:
-            job_id = f"payment_check_{payment_id}"
-            if self.scheduler.get_job(job_id):
-                self.scheduler.remove_job(job_id)
-                logger.info(f"[PAYMENT_CHECK_JOB_REMOVED] Job {job_id} removed for payment {payment_id}")
+        with PaymentCheckService._pending_lock:
+            if PaymentCheckService._pending_checks.pop(payment_id, None) is not None:
+                logger.info(f"[PAYMENT_CHECK_JOB_REMOVED] Payment {payment_id} removed from status sweep")
 
             # Clean up attempt counter
-            if payment_id in PaymentCheckService._payment_attempt_counts:
-                del PaymentCheckService._payment_attempt_counts[payment_id]
-
-        except Exception as e:
-            logger.error(f"[PAYMENT_CHECK_JOB_REMOVE_ERROR] Error removing job for payment {payment_id}: {str(e)}", exc_info=True)
+            PaymentCheckService._payment_attempt_counts.pop(payment_id, None)
 
     def _query_orchard_transaction_status(self, transaction_id: str) -> str:
         """
@@ -647,3 +641,6 @@ class PaymentCheckService:
         if PaymentCheckService._scheduler_instance and PaymentCheckService._scheduler_instance.running:
             PaymentCheckService._scheduler_instance.shutdown()
             logger.info("[SCHEDULER] Background scheduler shutdown")
+        if PaymentCheckService._orchard_executor is not None:
+            PaymentCheckService._orchard_executor.shutdown(wait=False)
+            PaymentCheckService._orchard_executor = None
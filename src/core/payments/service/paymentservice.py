@@ -5,7 +5,7 @@ from enum import Enum
 import logging
 import os
 from sqlalchemy.orm import Session
-from sqlalchemy import desc, func
+from sqlalchemy import desc, func, select, union_all
 from fastapi import HTTPException
 
 from core.payments.dto.paymentdto import PaymentDto
@@ -18,16 +18,16 @@ from core.exceptions.PaymentException import PaymentNotFoundException, PaymentVa
 from core.payments.model.payment import Payment
 from core.payments.model.bill import Bill
 from core.payments.model.invoice import Invoice
-from utilities.paymentgatewayclient import PaymentGatewayClient
+from utilities.paymentgatewayclient import PaymentGatewayClient, get_payment_gateway_client
 from utilities.uniqueidgenerator import UniqueIdGenerator
 from utilities.provider_mapper import ProviderMapper
 
 logger = logging.getLogger(__name__)
 
 class PaymentService:
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, payment_gateway_client: Optional[PaymentGatewayClient] = None):
         self.db = db
-        self.payment_gateway_client = PaymentGatewayClient()
+        self.payment_gateway_client = payment_gateway_client or get_payment_gateway_client()
         self.service_id = self.payment_gateway_client.service_id
     
     def make_payment(self, payment_dto: PaymentDto, intent: str, request: Any = None) -> PaymentResultResponse:
@@ -175,13 +175,7 @@ class PaymentService:
             # Find payment by looking up both ctm_transaction_id and transaction_id
             logger.debug(f"[DB_QUERY_START] Searching for payment with trans_ref_str: '{trans_ref_str}'")
             logger.debug(f"[DB_QUERY_FILTERS] Looking for payment where: transaction_id='{trans_ref_str}' OR ctm_transaction_id='{trans_ref_str}' OR mtc_transaction_id='{trans_ref_str}' OR atp_transaction_id='{trans_ref_str}' OR blp_transaction_id='{trans_ref_str}'")
-            payment = self.db.query(Payment).filter(
-                (Payment.transaction_id == trans_ref_str) |
-                (Payment.ctm_transaction_id == trans_ref_str) |
-                (Payment.mtc_transaction_id == trans_ref_str) |
-                (Payment.atp_transaction_id == trans_ref_str) |
-                (Payment.blp_transaction_id == trans_ref_str)
-            ).first()
+            payment = self.find_payment_by_any_transaction_id(trans_ref_str)
             logger.debug(f"[DB_QUERY_END] Query completed, payment found: {payment is not None}")
 
             if not payment:
@@ -756,12 +750,11 @@ class PaymentService:
                 )
                 return
 
-            # Mark the original payment as MTC_FAILED (terminal state)
+            # Mark the original payment as MTC_FAILED (terminal state); committed together
+            # with the reversal record below so neither is persisted without the other
             payment.status = PaymentStatus.MTC_FAILED
             payment.updated_on = datetime.now()
             self.db.add(payment)
-            self.db.commit()
-            logger.info(f"[REVERSAL_ORIGINAL_MARKED_FAILED] Original payment {payment.id} marked MTC_FAILED")
 
             # Generate unique transaction ID for reversal
             reversal_transaction_id = str(UniqueIdGenerator.generate())
@@ -788,8 +781,8 @@ class PaymentService:
                 updated_on=datetime.now()
             )
             self.db.add(reversal_payment)
-            self.db.flush()  # Flush to get the reversal_payment.id
             self.db.commit()
+            logger.info(f"[REVERSAL_ORIGINAL_MARKED_FAILED] Original payment {payment.id} marked MTC_FAILED")
             logger.info(f"[REVERSAL_NEW_PAYMENT_CREATED] New reversal payment created with id={reversal_payment.id}, transaction_id={reversal_transaction_id}")
 
             # Build reversal payment request (send money back to sender)
@@ -891,6 +884,24 @@ class PaymentService:
             logger.warning(f"Unknown status code received: {trans_status}")
             return PaymentStatus.FAILED
     
+    def find_payment_by_any_transaction_id(self, transaction_ref: str, columns=None) -> Optional[Payment]:
+        """
+        Find the payment whose transaction_id or any per-leg transaction ID equals `transaction_ref`.
+
+        Each column is probed with its own indexed SELECT joined by UNION ALL, instead
+        of a single OR filter that Postgres resolves with a bitmap-OR over every index.
+        """
+        if columns is None:
+            columns = (
+                Payment.transaction_id,
+                Payment.ctm_transaction_id,
+                Payment.mtc_transaction_id,
+                Payment.atp_transaction_id,
+                Payment.blp_transaction_id,
+            )
+        lookup = union_all(*(select(Payment).where(column == transaction_ref) for column in columns)).limit(1)
+        return self.db.execute(select(Payment).from_statement(lookup)).scalars().first()
+
     def get_payment_by_id(self, id: int) -> Payment:
         payment = self.db.query(Payment).filter(Payment.id == id).first()
         if not payment:
@@ -898,13 +909,33 @@ class PaymentService:
         return payment
     
     def get_all_payments(self, page: int, size: int, timeline: Timeline) -> Any:
-        query = self.db.query(Payment)
-        
+        criteria = []
         if timeline and timeline != Timeline.ALL:
-            start_date = self._calculate_start_date(timeline)
-            query = query.filter(Payment.date_paid >= start_date)
+            criteria.append(Payment.date_paid >= self._calculate_start_date(timeline))
+        
+        # count(*) OVER () returns the filtered total alongside the page in one round-trip
+        rows = self.db.execute(
+            select(Payment, func.count().over().label("total"))
+            .where(*criteria)
+            .order_by(desc(Payment.date_paid))
+            .offset(page * size)
+            .limit(size)
+        ).all()
         
-        return query.order_by(desc(Payment.date_paid)).offset(page * size).limit(size).all()
+        if rows:
+            total = rows[0].total
+        elif page > 0:
+            # Past the last page there is no row to carry the window count
+            total = self.db.execute(select(func.count()).select_from(Payment).where(*criteria)).scalar_one()
+        else:
+            total = 0
+        
+        return {
+            "total": total,
+            "page": page,
+            "size": size,
+            "users": [row.Payment for row in rows]
+        }
     
     def get_payments_by_method(self, payment_method: PaymentMethod) -> List[Payment]:
         return self.db.query(Payment).filter(Payment.payment_method == payment_method).all()
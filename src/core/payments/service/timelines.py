@@ -0,0 +1,48 @@
+# core/payments/service/timelines.py
+
+from datetime import date, datetime, time, timedelta
+from functools import lru_cache
+from typing import Optional
+
+from sqlalchemy import bindparam
+
+from core.payments.model.timeline import Timeline
+
+
+def calculate_start_date(timeline: Timeline) -> datetime:
+    # Every timeline starts at a midnight, so the result only changes with the date
+    return _start_date(timeline, date.today())
+
+
+@lru_cache(maxsize=64)
+def _start_date(timeline: Timeline, today: date) -> datetime:
+    midnight = datetime.combine(today, time.min)
+    if timeline == Timeline.TODAY:
+        return midnight
+    elif timeline == Timeline.THIS_WEEK:
+        return midnight - timedelta(days=today.weekday())
+    elif timeline == Timeline.THIS_MONTH:
+        return midnight.replace(day=1)
+    elif timeline == Timeline.THIS_YEAR:
+        return midnight.replace(month=1, day=1)
+    else:
+        raise ValueError("Invalid timeline")
+
+
+def timeline_criteria(column, timeline: Optional[Timeline]) -> list:
+    """WHERE criteria restricting `column` to the given timeline."""
+    if timeline and timeline != Timeline.ALL:
+        return [column >= calculate_start_date(timeline)]
+    return []
+
+
+def timeline_params(timeline: Optional[Timeline]) -> dict:
+    """Execute-time parameters for statements built with `since_start_date`; empty for ALL/None."""
+    if timeline and timeline != Timeline.ALL:
+        return {"start_date": calculate_start_date(timeline)}
+    return {}
+
+
+def since_start_date(stmt, column):
+    """`stmt` restricted to `column >= :start_date`, so it can be built once and bound per call."""
+    return stmt.where(column >= bindparam("start_date"))
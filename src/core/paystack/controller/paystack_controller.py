@@ -6,20 +6,12 @@ import string
 
 from core.user.controller.usercontroller import validate_token, get_db
 from another_fastapi_jwt_auth import AuthJWT
-from utilities.dbconfig import SessionLocal
 from core.paystack.dto.request.paystack_request import PaystackInitializeRequest
 from core.paystack.dto.response.paystack_response import PaystackInitializeResponse, PaystackVerifyResponse
 from core.paystack.service.paystack_service import PaystackService
 
 paystack_routes = APIRouter()
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
 @paystack_routes.post("/transaction/initialize", response_model=PaystackInitializeResponse)
 async def initialize_paystack_transaction(
     request: PaystackInitializeRequest,
@@ -17,7 +17,6 @@ from core.product.dto.inventory_update_dto import InventoryUpdateDTO
 from core.user.controller.usercontroller import validate_token, get_db
 from another_fastapi_jwt_auth import AuthJWT
 
-logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
 product_routes = APIRouter()
@@ -1,18 +1,17 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from datetime import datetime
 from typing import List, Optional
-import jwt
 from pydantic import BaseModel
 from core.auth.service.sessiondriver import SessionDriver, TokenData
 from another_fastapi_jwt_auth import AuthJWT
 from core.exceptions import *
 from core.user.dto.response.paged_users import PagedUserResponse
-from utilities.dbconfig import SessionLocal
+from utilities.dbconfig import get_db
+from utilities.deps import validate_token
 from sqlalchemy.orm import Session
 from core.user.model.User import User
 import logging
 
-logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
 # DTO Models
@@ -21,7 +20,6 @@ from core.user.dto.response.user_response import UserResponse
 from core.user.dto.response.sent_emails_response import SentEmailsResponse, SentEmailItem
 
 from core.user.service.user_service import UserService
-from another_fastapi_jwt_auth.exceptions import MissingTokenError
 from core.user.dto.request.user_update_request import UserUpdateRequest
 from core.user.dto.request.notification_settings_update_request import (
     NotificationSettingsUpdateRequest,
@@ -36,38 +34,9 @@ from core.receipts.service.receipt_service import ReceiptService
 from core.receipts.dto.response.receiptresponse import ReceiptResponse
 from core.agent.tools.email.email import EmailTool
 
-def validate_token(authjwt: AuthJWT = Depends()):
-    try:
-        authjwt.jwt_required()
-        return authjwt
-    except jwt.ExpiredSignatureError:
-        raise HTTPException(
-            status_code=401, 
-            detail="Token expired. Please log in again."
-        )
-    except MissingTokenError:
-        raise HTTPException(
-            status_code=401,
-            detail="No token found. Please create an account and log in.",
-        )
-    except Exception as e:
-        logger.error(f"Token validation error: {str(e)}", exc_info=True)
-        raise HTTPException(
-            status_code=401,
-            detail=f"Invalid token: {str(e)}"
-        )
-    
 # Controller (Router)
 user_routes = APIRouter()
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
-
 @user_routes.get("/me", response_model=UserResponse)
 def get_current_user_endpoint(authjwt: AuthJWT = Depends(validate_token), db: Session = Depends(get_db)):
     # Get the current user's email/subject from the JWT
@@ -11,7 +11,6 @@ from sqlalchemy.orm import Session
 from core.user.model.User import User
 import logging
 
-logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
 # DTO Models
@@ -15,7 +15,6 @@ from core.webhooks.service.whatsapp_service import WhatsAppService
 from utilities.phone_utils import normalize_ghana_phone_number
 from core.auth.service.authservice import AuthService
 
-logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
 # Public routes: no JWT / Bearer dependency (external providers & simple chat clients).
@@ -1,12 +1,40 @@
 import requests
+import httpx
 import logging
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple
 from config import settings
 import xml.etree.ElementTree as ET
 import re
+from functools import lru_cache
 
 logger = logging.getLogger(__name__)
 
+# Formatting characters users commonly type into phone numbers; also how OTPs are keyed by phone
+PHONE_STRIP = str.maketrans('', '', '+ -()')
+_NON_DIGITS = re.compile(r"\D")
+
+# Shared async client so OTP sends from async endpoints reuse keep-alive
+# connections (and skip a TLS handshake) instead of reconnecting per SMS.
+_async_client: Optional[httpx.AsyncClient] = None
+
+
+def _get_async_client() -> httpx.AsyncClient:
+    global _async_client
+    if _async_client is None:
+        _async_client = httpx.AsyncClient(
+            timeout=30,
+            limits=httpx.Limits(max_keepalive_connections=50),
+        )
+    return _async_client
+
+
+async def close_async_client() -> None:
+    """Close the shared async client; called on application shutdown."""
+    global _async_client
+    if _async_client is not None:
+        await _async_client.aclose()
+        _async_client = None
+
 
 class WirepickSMSException(Exception):
     """Custom exception for Wirepick SMS errors"""
@@ -23,6 +51,8 @@ class WirepickSMSService:
         self.public_key = settings.WIREPICK_PUBLIC_KEY
         self.sender_id = settings.WIREPICK_SENDER_ID
         self.use_api_key = getattr(settings, 'USE_WIREPICK_API_KEY', False)
+        # Pooled connections for the sync send/query paths
+        self.session = requests.Session()
 
     @staticmethod
     def _normalize_phone(phone: str) -> str:
@@ -36,17 +66,18 @@ class WirepickSMSService:
         if phone is None:
             return ""
 
-        # Keep only digits and leading '+', then strip international prefixes.
+        # Keep only digits, then strip international prefixes.
         raw = str(phone).strip()
         if not raw:
             return ""
 
-        # Remove spaces, dashes, parentheses, etc. but keep a leading '+' for now.
-        raw = re.sub(r"(?!^\+)[^\d]", "", raw)
+        # Strip '+', spaces, dashes and parentheses in one pass; only fall back
+        # to the regex for any other stray characters.
+        raw = raw.translate(PHONE_STRIP)
+        if not (raw.isascii() and raw.isdigit()):
+            raw = _NON_DIGITS.sub("", raw)
 
-        # Convert +233... -> 233..., 00233... -> 233...
-        if raw.startswith("+"):
-            raw = raw[1:]
+        # Convert 00233... -> 233... (a leading '+' is already gone)
         if raw.startswith("00"):
             raw = raw[2:]
 
@@ -56,14 +87,9 @@ class WirepickSMSService:
 
         return raw
         
-    def _send_with_client_auth(self, phone: str, message: str) -> Dict[str, Any]:
-        """
-        Send SMS using client ID and password authentication (legacy method)
-        Documentation reference: Page 2-3
-        """
+    def _client_auth_request(self, phone: str, message: str) -> Tuple[str, Dict[str, str]]:
+        """Build the URL and query parameters for the client ID/password send endpoint."""
         url = f"{self.base_url}/send"
-        
-        # Prepare parameters
         params = {
             "client": self.client_id,
             "password": self.password,
@@ -72,32 +98,83 @@ class WirepickSMSService:
             "from": self.sender_id,
             "flash": "NO",  # Regular SMS, not flash
         }
+        return url, params
+
+    @staticmethod
+    def _parse_client_auth_response(text: str) -> Dict[str, Any]:
+        """Parse the XML response returned by the client auth send endpoint (documentation page 3)."""
+        root = ET.fromstring(text)
+        sms_element = root.find('sms')
+
+        if sms_element is not None:
+            msgid = sms_element.find('msgid')
+            status = sms_element.find('status')
+
+            return {
+                "success": True,
+                "msgid": msgid.text if msgid is not None else None,
+                "status": status.text if status is not None else None,
+                "raw_response": text
+            }
+        return {
+            "success": False,
+            "error": "Invalid response format",
+            "raw_response": text
+        }
+
+    def _api_key_request(self, phone: str, message: str) -> Tuple[str, Dict[str, Any], Dict[str, str]]:
+        """Build the URL, JSON payload and headers for the API key send endpoint."""
+        url = f"{self.base_url}/sendsms"
+
+        # Headers with API key
+        headers = {
+            "wpkKey": self.public_key,
+            "Content-Type": "application/json"
+        }
+
+        # Request body
+        payload = {
+            "phone": phone,
+            "text": message,
+            "from": self.sender_id,
+            "flash": "N",  # N for normal SMS, Y for flash
+            "dlr": "Y"     # Request delivery report
+        }
+        return url, payload, headers
+
+    @staticmethod
+    def _parse_api_key_response(data: Dict[str, Any]) -> Dict[str, Any]:
+        """Parse the JSON response returned by the API key send endpoint."""
+        messages = data.get('messages', [])
+
+        if messages:
+            msg = messages[0]
+            return {
+                "success": True,
+                "msgid": msg.get('msgid'),
+                "status": msg.get('status'),
+                "phone": msg.get('phone'),
+                "total_cost": msg.get('totalCost'),
+                "raw_response": data
+            }
+        return {
+            "success": False,
+            "error": "No message in response",
+            "raw_response": data
+        }
+
+    def _send_with_client_auth(self, phone: str, message: str) -> Dict[str, Any]:
+        """
+        Send SMS using client ID and password authentication (legacy method)
+        Documentation reference: Page 2-3
+        """
+        url, params = self._client_auth_request(phone, message)
         
         try:
             logger.info(f"Sending SMS via Wirepick (client auth) to {phone}")
-            response = requests.get(url, params=params, timeout=30)
+            response = self.session.get(url, params=params, timeout=30)
             response.raise_for_status()
-            
-            # Parse XML response (documentation page 3)
-            root = ET.fromstring(response.text)
-            sms_element = root.find('sms')
-            
-            if sms_element is not None:
-                msgid = sms_element.find('msgid')
-                status = sms_element.find('status')
-                
-                return {
-                    "success": True,
-                    "msgid": msgid.text if msgid is not None else None,
-                    "status": status.text if status is not None else None,
-                    "raw_response": response.text
-                }
-            else:
-                return {
-                    "success": False,
-                    "error": "Invalid response format",
-                    "raw_response": response.text
-                }
+            return self._parse_client_auth_response(response.text)
                 
         except requests.exceptions.RequestException as e:
             logger.error(f"Wirepick SMS request failed: {str(e)}")
@@ -111,48 +188,13 @@ class WirepickSMSService:
         Send SMS using API key authentication (newer method)
         Documentation reference: Page 5-8
         """
-        url = f"{self.base_url}/sendsms"
-        
-        # Headers with API key
-        headers = {
-            "wpkKey": self.public_key,
-            "Content-Type": "application/json"
-        }
-        
-        # Request body
-        payload = {
-            "phone": phone,
-            "text": message,
-            "from": self.sender_id,
-            "flash": "N",  # N for normal SMS, Y for flash
-            "dlr": "Y"     # Request delivery report
-        }
+        url, payload, headers = self._api_key_request(phone, message)
         
         try:
             logger.info(f"Sending SMS via Wirepick (API key auth) to {phone}")
-            response = requests.post(url, json=payload, headers=headers, timeout=30)
+            response = self.session.post(url, json=payload, headers=headers, timeout=30)
             response.raise_for_status()
-            
-            # Parse JSON response
-            data = response.json()
-            messages = data.get('messages', [])
-            
-            if messages:
-                msg = messages[0]
-                return {
-                    "success": True,
-                    "msgid": msg.get('msgid'),
-                    "status": msg.get('status'),
-                    "phone": msg.get('phone'),
-                    "total_cost": msg.get('totalCost'),
-                    "raw_response": data
-                }
-            else:
-                return {
-                    "success": False,
-                    "error": "No message in response",
-                    "raw_response": data
-                }
+            return self._parse_api_key_response(response.json())
                 
         except requests.exceptions.RequestException as e:
             logger.error(f"Wirepick SMS request failed: {str(e)}")
@@ -167,6 +209,47 @@ class WirepickSMSService:
         except ValueError as e:
             logger.error(f"Failed to parse Wirepick JSON response: {str(e)}")
             raise WirepickSMSException(f"Invalid response from SMS provider: {str(e)}")
+
+    async def _asend_with_client_auth(self, phone: str, message: str) -> Dict[str, Any]:
+        """Non-blocking variant of `_send_with_client_auth`."""
+        url, params = self._client_auth_request(phone, message)
+
+        try:
+            logger.info(f"Sending SMS via Wirepick (client auth) to {phone}")
+            response = await _get_async_client().get(url, params=params)
+            response.raise_for_status()
+            return self._parse_client_auth_response(response.text)
+
+        except httpx.HTTPError as e:
+            logger.error(f"Wirepick SMS request failed: {str(e)}")
+            raise WirepickSMSException(f"SMS sending failed: {str(e)}")
+        except ET.ParseError as e:
+            logger.error(f"Failed to parse Wirepick response: {str(e)}")
+            raise WirepickSMSException(f"Invalid response from SMS provider: {str(e)}")
+
+    async def _asend_with_api_key(self, phone: str, message: str) -> Dict[str, Any]:
+        """Non-blocking variant of `_send_with_api_key`."""
+        url, payload, headers = self._api_key_request(phone, message)
+
+        try:
+            logger.info(f"Sending SMS via Wirepick (API key auth) to {phone}")
+            response = await _get_async_client().post(url, json=payload, headers=headers)
+            response.raise_for_status()
+            return self._parse_api_key_response(response.json())
+
+        except httpx.HTTPStatusError as e:
+            logger.error(f"Wirepick SMS request failed: {str(e)}")
+            try:
+                logger.error(f"Wirepick error details: {e.response.json()}")
+            except ValueError:
+                pass
+            raise WirepickSMSException(f"SMS sending failed: {str(e)}")
+        except httpx.HTTPError as e:
+            logger.error(f"Wirepick SMS request failed: {str(e)}")
+            raise WirepickSMSException(f"SMS sending failed: {str(e)}")
+        except ValueError as e:
+            logger.error(f"Failed to parse Wirepick JSON response: {str(e)}")
+            raise WirepickSMSException(f"Invalid response from SMS provider: {str(e)}")
     
     def send_sms(self, phone: str, message: str) -> Dict[str, Any]:
         """
@@ -189,6 +272,20 @@ class WirepickSMSService:
         else:
             return self._send_with_client_auth(phone, message)
     
+    async def send_sms_async(self, phone: str, message: str) -> Dict[str, Any]:
+        """
+        Send SMS via Wirepick API without blocking the event loop.
+
+        Same contract as `send_sms`; use this from `async def` endpoints.
+        """
+        phone = self._normalize_phone(phone)
+        if not phone:
+            raise WirepickSMSException("Phone number is missing or invalid")
+
+        if self.use_api_key and self.public_key:
+            return await self._asend_with_api_key(phone, message)
+        return await self._asend_with_client_auth(phone, message)
+
     def check_message_status(self, msgid: str) -> Dict[str, Any]:
         """
         Query the status of a message using its msgid
@@ -209,7 +306,7 @@ class WirepickSMSService:
             }
             
             try:
-                response = requests.get(url, params=params, headers=headers, timeout=30)
+                response = self.session.get(url, params=params, headers=headers, timeout=30)
                 response.raise_for_status()
                 
                 # Parse JSON response
@@ -233,7 +330,7 @@ class WirepickSMSService:
             }
             
             try:
-                response = requests.get(url, params=params, timeout=30)
+                response = self.session.get(url, params=params, timeout=30)
                 response.raise_for_status()
                 
                 # Parse XML response
@@ -248,4 +345,13 @@ class WirepickSMSService:
                 }
             except Exception as e:
                 logger.error(f"Failed to check message status: {str(e)}")
-                return {"success": False, "error": str(e)}
\ No newline at end of file
+                return {"success": False, "error": str(e)}
+
+
+@lru_cache(maxsize=1)
+def get_sms_service() -> WirepickSMSService:
+    """Process-wide instance; settings are read once and the HTTP connections are reused."""
+    return WirepickSMSService()
+
+
+wirepick_sms_service = get_sms_service()
@@ -1,3 +1,5 @@
+import logging
+
 from fastapi.exception_handlers import request_validation_exception_handler
 from fastapi.exceptions import RequestValidationError
 from fastapi.responses import JSONResponse
@@ -5,6 +7,9 @@ from starlette.requests import Request
 from starlette.status import HTTP_422_UNPROCESSABLE_ENTITY
 
 from utilities.exceptions import DatabaseValidationError
+from utilities.paymentgatewayclient import PaymentGatewayException
+
+logger = logging.getLogger(__name__)
 
 
 async def database_validation_exception_handler(request: Request, exc: DatabaseValidationError) -> JSONResponse:
@@ -56,5 +61,11 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
     )
 
 
+async def payment_gateway_exception_handler(request: Request, exc: PaymentGatewayException) -> JSONResponse:
+    """Orchard call failures raised straight out of route handlers"""
+    logger.error(f"[PAYMENT_GATEWAY_ERROR] {request.method} {request.url.path}: {exc}", exc_info=exc)
+    return JSONResponse(status_code=500, content={"detail": str(exc)})
+
+
 class ObjectDoesNotExist(Exception):
     pass
@@ -7,5 +7,8 @@ if __name__ == "__main__":
         "main:app",
         host="0.0.0.0",
         port=3090,
-        reload=settings.DEBUG
+        reload=settings.DEBUG,
+        # uvloop / httptools where installed, stdlib asyncio / h11 otherwise
+        loop="auto",
+        http="auto"
     )
\ No newline at end of file
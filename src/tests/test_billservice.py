@@ -0,0 +1,27 @@
+import asyncio
+from unittest.mock import AsyncMock
+
+import pytest
+
+from core.exceptions.BillException import BillNotFoundException
+from core.payments.dto.request.billupdate import BillUpdate
+from core.payments.service.billservice import BillService
+
+
+def test_update_bill_with_empty_body_returns_the_bill():
+    bill = object()
+    db = AsyncMock()
+    db.get.return_value = bill
+
+    result = asyncio.run(BillService(db).update_bill(1, BillUpdate()))
+
+    assert result is bill
+    db.execute.assert_not_called()
+
+
+def test_update_bill_with_empty_body_raises_for_missing_bill():
+    db = AsyncMock()
+    db.get.return_value = None
+
+    with pytest.raises(BillNotFoundException):
+        asyncio.run(BillService(db).update_bill(404, BillUpdate()))
@@ -1,5 +1,7 @@
-from typing import Generator
+from typing import AsyncGenerator, Generator
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 import os
@@ -23,15 +25,39 @@ if not DATABASE_URL:
 
 engine = create_engine(
     DATABASE_URL,
-    pool_size=20,
-    max_overflow=10,
-    pool_pre_ping=True
+    pool_size=int(os.getenv("DB_POOL_SIZE", "20")),
+    max_overflow=int(os.getenv("DB_MAX_OVERFLOW", "40")),
+    pool_timeout=int(os.getenv("DB_POOL_TIMEOUT", "10")),
+    # Recycle before server/PgBouncer idle timeouts drop the connection
+    pool_recycle=int(os.getenv("DB_POOL_RECYCLE", "1800")),
+    pool_pre_ping=True,
+    # Reuse the most recently returned connection so surplus ones go idle and get recycled
+    pool_use_lifo=True,
+    # Compiled-statement cache for 2.0-style select()/delete() constructs; values are
+    # bound parameters, so one entry serves every id/form_id/status lookup
+    query_cache_size=int(os.getenv("DB_QUERY_CACHE_SIZE", "1200"))
 )
 
 # SessionLocal
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine (asyncpg) for routes that await the database instead of holding a worker thread
+
+async_engine = create_async_engine(
+    make_url(DATABASE_URL).set(drivername="postgresql+asyncpg"),
+    pool_size=int(os.getenv("DB_POOL_SIZE", "20")),
+    max_overflow=int(os.getenv("DB_MAX_OVERFLOW", "40")),
+    pool_timeout=int(os.getenv("DB_POOL_TIMEOUT", "10")),
+    pool_recycle=int(os.getenv("DB_POOL_RECYCLE", "1800")),
+    pool_pre_ping=True,
+    pool_use_lifo=True,
+    query_cache_size=int(os.getenv("DB_QUERY_CACHE_SIZE", "1200"))
+)
+
+# Objects stay loaded after commit, so async handlers never trigger an implicit reload
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 
 # Dependency for FastAPI
 
@@ -41,3 +67,8 @@ def get_db() -> Generator:
         yield db
     finally:
         db.close()
+
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    async with AsyncSessionLocal() as db:
+        yield db
\ No newline at end of file
@@ -0,0 +1,79 @@
+"""Shared FastAPI dependencies for route handlers."""
+import hashlib
+import logging
+import threading
+import time
+from typing import Optional
+
+import jwt
+from cachetools import TTLCache
+from fastapi import Depends, HTTPException, Request
+from another_fastapi_jwt_auth import AuthJWT
+from another_fastapi_jwt_auth.exceptions import MissingTokenError
+
+logger = logging.getLogger(__name__)
+
+# Verified claims keyed by SHA-256 of the token, so repeat calls skip signature checks.
+_JWT_CACHE_TTL_SECONDS = 30
+_jwt_cache = TTLCache(maxsize=10_000, ttl=_JWT_CACHE_TTL_SECONDS)
+_jwt_cache_lock = threading.Lock()
+
+
+def _jwt_cache_key(token: str) -> bytes:
+    return hashlib.sha256(token.encode()).digest()
+
+
+def get_cached_claims(token: str) -> Optional[dict]:
+    """Claims of a token verified within the last few seconds, or None."""
+    with _jwt_cache_lock:
+        return _jwt_cache.get(_jwt_cache_key(token))
+
+
+def cache_claims(token: str, claims: dict) -> None:
+    """Remember verified claims unless the token expires before the cache entry would."""
+    exp = claims.get("exp")
+    if exp is None or exp - time.time() <= _JWT_CACHE_TTL_SECONDS:
+        return
+    with _jwt_cache_lock:
+        _jwt_cache[_jwt_cache_key(token)] = claims
+
+
+def validate_token(request: Request, authjwt: AuthJWT = Depends()):
+    """
+    Require a valid access token and return the verified AuthJWT.
+
+    The verified instance and its decoded claims are kept on `request.state`, so
+    other dependencies in the same request reuse them instead of re-verifying.
+    """
+    cached = getattr(request.state, "authjwt", None)
+    if cached is not None:
+        return cached
+    token = authjwt._token
+    claims = get_cached_claims(token) if token else None
+    if claims is not None:
+        request.state.jwt_claims = claims
+        request.state.authjwt = authjwt
+        return authjwt
+    try:
+        authjwt.jwt_required()
+        claims = authjwt.get_raw_jwt()
+        cache_claims(token, claims)
+        request.state.jwt_claims = claims
+        request.state.authjwt = authjwt
+        return authjwt
+    except jwt.ExpiredSignatureError:
+        raise HTTPException(
+            status_code=401,
+            detail="Token expired. Please log in again."
+        )
+    except MissingTokenError:
+        raise HTTPException(
+            status_code=401,
+            detail="No token found. Please create an account and log in.",
+        )
+    except Exception as e:
+        logger.error(f"Token validation error: {str(e)}", exc_info=True)
+        raise HTTPException(
+            status_code=401,
+            detail=f"Invalid token: {str(e)}"
+        )
@@ -0,0 +1,78 @@
+"""Pure ASGI access-token check for hot route groups."""
+import json
+import logging
+
+import jwt
+
+from config import settings
+from utilities.deps import cache_claims, get_cached_claims
+
+logger = logging.getLogger(__name__)
+
+
+class JWTAuthMiddleware:
+    """
+    Verify the bearer access token for requests under `path_prefixes`.
+
+    Runs below FastAPI's dependency solver, so protected routes need no
+    `validate_token` parameter. Decoded claims are placed on the scope state and
+    are readable as `request.state.jwt_claims` inside the handler.
+    """
+
+    def __init__(self, app, path_prefixes: tuple):
+        self.app = app
+        self.path_prefixes = tuple(path_prefixes)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not scope["path"].startswith(self.path_prefixes):
+            await self.app(scope, receive, send)
+            return
+
+        token = self._bearer_token(scope)
+        if token is None:
+            await self._reject(send, "No token found. Please create an account and log in.")
+            return
+
+        claims = get_cached_claims(token)
+        if claims is None:
+            try:
+                claims = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+            except jwt.ExpiredSignatureError:
+                await self._reject(send, "Token expired. Please log in again.")
+                return
+            except jwt.InvalidTokenError as e:
+                logger.error(f"Token validation error: {str(e)}")
+                await self._reject(send, f"Invalid token: {str(e)}")
+                return
+
+            if claims.get("type") != "access":
+                await self._reject(send, "Invalid token: Only access tokens are allowed")
+                return
+            cache_claims(token, claims)
+
+        scope.setdefault("state", {})["jwt_claims"] = claims
+        await self.app(scope, receive, send)
+
+    @staticmethod
+    def _bearer_token(scope):
+        for name, value in scope["headers"]:
+            if name == b"authorization":
+                scheme, _, token = value.decode("latin-1").partition(" ")
+                if scheme.lower() == "bearer" and token:
+                    return token.strip()
+                return None
+        return None
+
+    @staticmethod
+    async def _reject(send, detail: str):
+        body = json.dumps({"detail": detail}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 401,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"www-authenticate", b"Bearer"),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
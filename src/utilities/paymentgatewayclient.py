@@ -1,18 +1,54 @@
+import asyncio
 import hmac
 import hashlib
 import json
 import httpx
+import orjson
 import os
-from datetime import datetime, timezone
-from typing import Dict, Any, Optional
+import threading
+import time
+from cachetools import TTLCache
+from typing import Dict, Any, Optional, Union
 import logging
 from urllib.parse import urljoin
+from dataclasses import dataclass
+from functools import cached_property, lru_cache
 
 logger = logging.getLogger(__name__)
 
 class PaymentGatewayException(Exception):
     pass
 
+
+def _log_response(label: str, response: httpx.Response) -> None:
+    """Log the status at INFO; the body is decoded only when DEBUG is enabled."""
+    logger.info("%s status=%s", label, response.status_code)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("%s body=%s", label, response.text)
+
+# Biller lists change over hours; failed lookups are held briefly so retries don't stampede Orchard.
+BILLERS_CACHE_TTL_SECONDS = 300
+BILLERS_NEGATIVE_CACHE_TTL_SECONDS = 10
+
+
+@dataclass
+class CachedResponse:
+    """
+    Replay of an Orchard response exposing the parts of httpx.Response callers read.
+
+    Holds the body already parsed, so cache hits skip JSON decoding; callers must
+    treat the returned payload as read-only.
+    """
+    status_code: int
+    _parsed: Any
+
+    def json(self) -> Any:
+        return self._parsed
+
+    @cached_property
+    def text(self) -> str:
+        return orjson.dumps(self._parsed).decode()
+
 class PaymentGatewayClient:
     def __init__(self):
         # Load from environment variables
@@ -26,6 +62,43 @@ class PaymentGatewayClient:
         # Validate required config
         self._validate_config()
 
+        # Kept open so consecutive Orchard calls reuse TLS connections. Transport retries
+        # only cover failed connection attempts, so a payment request is never sent twice.
+        self._http = httpx.Client(
+            timeout=self.timeout,
+            transport=httpx.HTTPTransport(
+                retries=2,
+                limits=httpx.Limits(max_connections=50, max_keepalive_connections=20),
+            ),
+        )
+        # Async twin for the event-loop endpoints; opened on first use and closed at shutdown.
+        self._async_http: Optional[httpx.AsyncClient] = None
+
+        self._billers_cache = TTLCache(maxsize=10_000, ttl=BILLERS_CACHE_TTL_SECONDS)
+        self._billers_failures = TTLCache(maxsize=10_000, ttl=BILLERS_NEGATIVE_CACHE_TTL_SECONDS)
+        self._billers_cache_lock = threading.Lock()
+        # Upstream BLI requests in flight on the event loop, keyed like the cache
+        self._billers_inflight: Dict[tuple, asyncio.Future] = {}
+
+    def close(self) -> None:
+        self._http.close()
+
+    def _async_client(self) -> httpx.AsyncClient:
+        if self._async_http is None:
+            self._async_http = httpx.AsyncClient(
+                timeout=self.timeout,
+                transport=httpx.AsyncHTTPTransport(
+                    retries=2,
+                    limits=httpx.Limits(max_connections=100, max_keepalive_connections=50),
+                ),
+            )
+        return self._async_http
+
+    async def aclose(self) -> None:
+        if self._async_http is not None:
+            await self._async_http.aclose()
+            self._async_http = None
+
     def _validate_config(self):
         """Validate that all required config is present"""
         required_vars = {
@@ -42,31 +115,49 @@ class PaymentGatewayClient:
             logger.error(error_msg)
             raise PaymentGatewayException(error_msg)
     
+    def _payment_post(self, payment_request: Dict[str, Any]) -> Dict[str, Any]:
+        # Serialize once with sorted keys; the same string is signed and sent as the body
+        json_string = json.dumps(payment_request, sort_keys=True, separators=(',', ':'))
+        logger.debug("Request payload: %s", json_string)
+
+        authorization = self._create_authorization_header(json_string)
+        logger.info("Authorization Header: %s", authorization)
+
+        # Orchard API endpoint is /sendRequest
+        endpoint_url = urljoin(self.base_url, "/sendRequest")
+        logger.info(f"Sending payment request to: {endpoint_url}")
+
+        return {
+            "url": endpoint_url,
+            "headers": {
+                "Authorization": authorization,
+                "Content-Type": "application/json"
+            },
+            "content": json_string,
+        }
+
     def process_payment(self, payment_request: Dict[str, Any]) -> httpx.Response:
         try:
-            # Create authorization header with sorted JSON (for consistent signature)
-            authorization = self._create_authorization_header(payment_request)
-            logger.info(f"Authorization Header: {authorization}")
-
-            # Use the same sorted JSON format for the request body to match signature
-            json_string = json.dumps(payment_request, sort_keys=True, separators=(',', ':'))
-            logger.debug(f"Request payload: {json_string}")
-
-            # Orchard API endpoint is /sendRequest
-            endpoint_url = urljoin(self.base_url, "/sendRequest")
-            logger.info(f"Sending payment request to: {endpoint_url}")
-
-            with httpx.Client(timeout=self.timeout) as client:
-                response = client.post(
-                    endpoint_url,
-                    headers={
-                        "Authorization": authorization,
-                        "Content-Type": "application/json"
-                    },
-                    content=json_string
-                )
-
-            logger.info(f"Payment gateway raw response: status={response.status_code}, body={response.text}")
+            response = self._http.post(**self._payment_post(payment_request))
+
+            _log_response("Payment gateway raw response", response)
+            return response
+
+        except httpx.TimeoutException:
+            logger.error("Payment processing timeout")
+            raise PaymentGatewayException("Payment processing timeout")
+        except httpx.RequestError as e:
+            logger.error(f"Network error processing payment request: {e}")
+            raise PaymentGatewayException(f"Network error: {e}")
+        except Exception as e:
+            logger.error(f"Error processing payment request: {e}", exc_info=True)
+            raise PaymentGatewayException(f"Failed to process payment request: {e}")
+
+    async def process_payment_async(self, payment_request: Dict[str, Any]) -> httpx.Response:
+        try:
+            response = await self._async_client().post(**self._payment_post(payment_request))
+
+            _log_response("Payment gateway raw response", response)
             return response
 
         except httpx.TimeoutException:
@@ -79,15 +170,14 @@ class PaymentGatewayClient:
             logger.error(f"Error processing payment request: {e}", exc_info=True)
             raise PaymentGatewayException(f"Failed to process payment request: {e}")
     
-    def _create_authorization_header(self, request: Dict[str, Any]) -> str:
-        # Use sorted keys and compact separators for consistent signature generation
-        json_payload = json.dumps(request, sort_keys=True, separators=(',', ':'))
-        logger.debug(f"Creating signature for payload: {json_payload}")
+    def _create_authorization_header(self, json_payload: str) -> str:
+        # json_payload must be the exact body sent (sorted keys, compact separators)
+        logger.debug("Creating signature for payload: %s", json_payload)
         signature = self._get_signature(json_payload)
         return f"{self.client_id}:{signature}"
     
     def _get_signature(self, json_payload: str) -> str:
-        logger.info(f"HmacSHA256 =================> {json_payload}")
+        logger.info("HmacSHA256 =================> %s", json_payload)
         try:
             # Create HMAC-SHA256 signature
             signature = hmac.new(
@@ -101,7 +191,7 @@ class PaymentGatewayClient:
             raise PaymentGatewayException(f"Signature generation failed: {e}")
     
     def get_current_timestamp(self) -> str:
-        return datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+        return time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime())
     
     def build_callback_url(self) -> str:
         return self.callback_url  # Just return the callback URL directly
@@ -117,19 +207,18 @@ class PaymentGatewayClient:
             # Use sorted JSON for consistent signature and request body
             json_payload = json.dumps(request, sort_keys=True, separators=(',', ':'))
             signature = self._get_signature(json_payload)
-            logger.debug(f"Status check request payload: {json_payload}")
-
-            with httpx.Client(timeout=self.timeout) as client:
-                response = client.post(
-                    urljoin(self.base_url, "checkTransaction"),
-                    headers={
-                        "Authorization": f"{self.client_id}:{signature}",
-                        "Content-Type": "application/json"
-                    },
-                    content=json_payload
-                )
-
-            logger.info(f"Transaction status check response: status={response.status_code}, body={response.text}")
+            logger.debug("Status check request payload: %s", json_payload)
+
+            response = self._http.post(
+                urljoin(self.base_url, "checkTransaction"),
+                headers={
+                    "Authorization": f"{self.client_id}:{signature}",
+                    "Content-Type": "application/json"
+                },
+                content=json_payload
+            )
+
+            _log_response("Transaction status check response", response)
             return response
 
         except httpx.TimeoutException:
@@ -159,19 +248,18 @@ class PaymentGatewayClient:
             # Use sorted JSON for consistent signature and request body
             json_payload = json.dumps(request, sort_keys=True, separators=(',', ':'))
             signature = self._get_signature(json_payload)
-            logger.debug(f"Balance check request payload: {json_payload}")
-
-            with httpx.Client(timeout=self.timeout) as client:
-                response = client.post(
-                    urljoin(self.base_url, "/check_wallet_balance"),
-                    headers={
-                        "Authorization": f"{self.client_id}:{signature}",
-                        "Content-Type": "application/json"
-                    },
-                    content=json_payload
-                )
-
-            logger.info(f"Wallet balance check response: status={response.status_code}, body={response.text}")
+            logger.debug("Balance check request payload: %s", json_payload)
+
+            response = self._http.post(
+                urljoin(self.base_url, "/check_wallet_balance"),
+                headers={
+                    "Authorization": f"{self.client_id}:{signature}",
+                    "Content-Type": "application/json"
+                },
+                content=json_payload
+            )
+
+            _log_response("Wallet balance check response", response)
             return response
 
         except httpx.TimeoutException:
@@ -213,19 +301,18 @@ class PaymentGatewayClient:
             # Use sorted JSON with spaces for signature (Orchard API requirement)
             json_payload = json.dumps(request, sort_keys=True, separators=(', ', ': '))
             signature = self._get_signature(json_payload)
-            logger.info(f"[ACCOUNT_INQUIRY] Request payload: {json_payload}")
-
-            with httpx.Client(timeout=self.timeout) as client:
-                response = client.post(
-                    urljoin(self.base_url, "/sendRequest"),
-                    headers={
-                        "Authorization": f"{self.client_id}:{signature}",
-                        "Content-Type": "application/json"
-                    },
-                    content=json_payload
-                )
-
-            logger.info(f"[ACCOUNT_INQUIRY_RESPONSE] Status: {response.status_code}, Body: {response.text}")
+            logger.info("[ACCOUNT_INQUIRY] Request payload: %s", json_payload)
+
+            response = self._http.post(
+                urljoin(self.base_url, "/sendRequest"),
+                headers={
+                    "Authorization": f"{self.client_id}:{signature}",
+                    "Content-Type": "application/json"
+                },
+                content=json_payload
+            )
+
+            _log_response("[ACCOUNT_INQUIRY_RESPONSE]", response)
             return response
 
         except httpx.TimeoutException:
@@ -238,7 +325,52 @@ class PaymentGatewayClient:
             logger.error(f"Error performing account inquiry: {e}", exc_info=True)
             raise PaymentGatewayException(f"Failed to perform account inquiry: {e}")
 
-    def external_billers_inquiry(self, customer_number: str, network: str = "ABS", operation: str = "INF") -> httpx.Response:
+    def _cached_billers(self, key: tuple) -> Optional[CachedResponse]:
+        with self._billers_cache_lock:
+            cached = self._billers_cache.get(key) or self._billers_failures.get(key)
+        if cached is not None:
+            logger.info("[EXTERNAL_BILLERS_INQUIRY] Cache hit for %s", key)
+        return cached
+
+    def _cache_billers(self, key: tuple, response: httpx.Response) -> None:
+        try:
+            cached = CachedResponse(response.status_code, orjson.loads(response.content))
+        except orjson.JSONDecodeError:
+            return
+        with self._billers_cache_lock:
+            if response.status_code == 200:
+                self._billers_cache[key] = cached
+            else:
+                self._billers_failures[key] = cached
+
+    def _external_billers_post(self, customer_number: str, network: str, operation: str) -> Dict[str, Any]:
+        from utilities.uniqueidgenerator import UniqueIdGenerator
+
+        request = {
+            "service_id": self.service_id,
+            "trans_type": "BLI",  # Bill Inquiry
+            "customer_number": customer_number,
+            "nw": network,  # Network code (ABS for external billers)
+            "operation": operation,  # Operation type (INF for information)
+            "exttrid": str(UniqueIdGenerator.generate()),  # Required: unique transaction ID
+            "ts": self.get_current_timestamp()  # Required: timestamp
+        }
+
+        # Use sorted JSON for consistent signature and request body
+        json_payload = json.dumps(request, sort_keys=True, separators=(',', ':'))
+        signature = self._get_signature(json_payload)
+        logger.info("[EXTERNAL_BILLERS_INQUIRY] Request payload: %s", json_payload)
+
+        return {
+            "url": urljoin(self.base_url, "/extBillers"),
+            "headers": {
+                "Authorization": f"{self.client_id}:{signature}",
+                "Content-Type": "application/json"
+            },
+            "content": json_payload,
+        }
+
+    def external_billers_inquiry(self, customer_number: str, network: str = "ABS", operation: str = "INF") -> Union[httpx.Response, CachedResponse]:
         """
         Perform external billers inquiry (BLI) to query available billers and bill information.
         Uses the /extBillers endpoint instead of /sendRequest.
@@ -248,38 +380,60 @@ class PaymentGatewayClient:
             network: Network code (default: "ABS" for external billers)
             operation: Operation type (default: "INF" for information inquiry)
 
+        Responses are cached per (customer_number, network, operation): successes for
+        BILLERS_CACHE_TTL_SECONDS, failures for BILLERS_NEGATIVE_CACHE_TTL_SECONDS.
+
         Returns:
-            httpx.Response with available billers and bill information from Orchard API
+            httpx.Response (or a CachedResponse replay) with available billers and bill information from Orchard API
         """
+        cache_key = (customer_number, network, operation)
+        cached = self._cached_billers(cache_key)
+        if cached is not None:
+            return cached
+
         try:
-            from utilities.uniqueidgenerator import UniqueIdGenerator
+            response = self._http.post(**self._external_billers_post(customer_number, network, operation))
 
-            request = {
-                "service_id": self.service_id,
-                "trans_type": "BLI",  # Bill Inquiry
-                "customer_number": customer_number,
-                "nw": network,  # Network code (ABS for external billers)
-                "operation": operation,  # Operation type (INF for information)
-                "exttrid": str(UniqueIdGenerator.generate()),  # Required: unique transaction ID
-                "ts": self.get_current_timestamp()  # Required: timestamp
-            }
+            _log_response("[EXTERNAL_BILLERS_INQUIRY_RESPONSE]", response)
+            self._cache_billers(cache_key, response)
+            return response
 
-            # Use sorted JSON for consistent signature and request body
-            json_payload = json.dumps(request, sort_keys=True, separators=(',', ':'))
-            signature = self._get_signature(json_payload)
-            logger.info(f"[EXTERNAL_BILLERS_INQUIRY] Request payload: {json_payload}")
-
-            with httpx.Client(timeout=self.timeout) as client:
-                response = client.post(
-                    urljoin(self.base_url, "/extBillers"),
-                    headers={
-                        "Authorization": f"{self.client_id}:{signature}",
-                        "Content-Type": "application/json"
-                    },
-                    content=json_payload
-                )
-
-            logger.info(f"[EXTERNAL_BILLERS_INQUIRY_RESPONSE] Status: {response.status_code}, Body: {response.text}")
+        except httpx.TimeoutException:
+            logger.error("External billers inquiry timeout")
+            raise PaymentGatewayException("External billers inquiry timeout")
+        except httpx.RequestError as e:
+            logger.error(f"Network error during external billers inquiry: {e}")
+            raise PaymentGatewayException(f"Network error: {e}")
+        except Exception as e:
+            logger.error(f"Error performing external billers inquiry: {e}", exc_info=True)
+            raise PaymentGatewayException(f"Failed to perform external billers inquiry: {e}")
+
+    async def external_billers_inquiry_async(self, customer_number: str, network: str = "ABS", operation: str = "INF") -> Union[httpx.Response, CachedResponse]:
+        """
+        Event-loop variant of external_billers_inquiry().
+
+        Concurrent calls for the same key share one upstream request; a caller that
+        disconnects does not cancel it for the others.
+        """
+        cache_key = (customer_number, network, operation)
+        cached = self._cached_billers(cache_key)
+        if cached is not None:
+            return cached
+
+        inflight = self._billers_inflight.get(cache_key)
+        if inflight is None:
+            inflight = asyncio.ensure_future(self._fetch_billers_async(cache_key))
+            self._billers_inflight[cache_key] = inflight
+            inflight.add_done_callback(lambda _: self._billers_inflight.pop(cache_key, None))
+        return await asyncio.shield(inflight)
+
+    async def _fetch_billers_async(self, cache_key: tuple) -> httpx.Response:
+        customer_number, network, operation = cache_key
+        try:
+            response = await self._async_client().post(**self._external_billers_post(customer_number, network, operation))
+
+            _log_response("[EXTERNAL_BILLERS_INQUIRY_RESPONSE]", response)
+            self._cache_billers(cache_key, response)
             return response
 
         except httpx.TimeoutException:
@@ -292,6 +446,40 @@ class PaymentGatewayClient:
             logger.error(f"Error performing external billers inquiry: {e}", exc_info=True)
             raise PaymentGatewayException(f"Failed to perform external billers inquiry: {e}")
 
+    def _external_biller_invoice_post(self,
+                                      ext_biller_ref_id: str,
+                                      ext_biller_pan: str,
+                                      ext_biller_ref_type: str,
+                                      network: str,
+                                      operation: str) -> Dict[str, Any]:
+        from utilities.uniqueidgenerator import UniqueIdGenerator
+
+        request = {
+            "service_id": self.service_id,
+            "trans_type": "BLI",  # Bill Inquiry
+            "ext_biller_ref_id": ext_biller_ref_id,  # Biller ID
+            "ext_biller_pan": ext_biller_pan,  # Customer reference for biller
+            "ext_biller_ref_type": ext_biller_ref_type,  # Biller category/type
+            "nw": network,  # Network code (ABS for external billers)
+            "operation": operation,  # Operation type (INV for invoice)
+            "exttrid": str(UniqueIdGenerator.generate()),  # Required: unique transaction ID
+            "ts": self.get_current_timestamp()  # Required: timestamp
+        }
+
+        # Use sorted JSON for consistent signature and request body
+        json_payload = json.dumps(request, sort_keys=True, separators=(',', ':'))
+        signature = self._get_signature(json_payload)
+        logger.info("[EXTERNAL_BILLER_INVOICE_INQUIRY] Request payload: %s", json_payload)
+
+        return {
+            "url": urljoin(self.base_url, "/extBillers"),
+            "headers": {
+                "Authorization": f"{self.client_id}:{signature}",
+                "Content-Type": "application/json"
+            },
+            "content": json_payload,
+        }
+
     def external_biller_invoice_inquiry(self,
                                        ext_biller_ref_id: str,
                                        ext_biller_pan: str,
@@ -313,36 +501,36 @@ class PaymentGatewayClient:
             httpx.Response with customer invoice information from Orchard API
         """
         try:
-            from utilities.uniqueidgenerator import UniqueIdGenerator
+            response = self._http.post(**self._external_biller_invoice_post(
+                ext_biller_ref_id, ext_biller_pan, ext_biller_ref_type, network, operation
+            ))
 
-            request = {
-                "service_id": self.service_id,
-                "trans_type": "BLI",  # Bill Inquiry
-                "ext_biller_ref_id": ext_biller_ref_id,  # Biller ID
-                "ext_biller_pan": ext_biller_pan,  # Customer reference for biller
-                "ext_biller_ref_type": ext_biller_ref_type,  # Biller category/type
-                "nw": network,  # Network code (ABS for external billers)
-                "operation": operation,  # Operation type (INV for invoice)
-                "exttrid": str(UniqueIdGenerator.generate()),  # Required: unique transaction ID
-                "ts": self.get_current_timestamp()  # Required: timestamp
-            }
+            _log_response("[EXTERNAL_BILLER_INVOICE_INQUIRY_RESPONSE]", response)
+            return response
 
-            # Use sorted JSON for consistent signature and request body
-            json_payload = json.dumps(request, sort_keys=True, separators=(',', ':'))
-            signature = self._get_signature(json_payload)
-            logger.info(f"[EXTERNAL_BILLER_INVOICE_INQUIRY] Request payload: {json_payload}")
-
-            with httpx.Client(timeout=self.timeout) as client:
-                response = client.post(
-                    urljoin(self.base_url, "/extBillers"),
-                    headers={
-                        "Authorization": f"{self.client_id}:{signature}",
-                        "Content-Type": "application/json"
-                    },
-                    content=json_payload
-                )
-
-            logger.info(f"[EXTERNAL_BILLER_INVOICE_INQUIRY_RESPONSE] Status: {response.status_code}, Body: {response.text}")
+        except httpx.TimeoutException:
+            logger.error("External biller invoice inquiry timeout")
+            raise PaymentGatewayException("External biller invoice inquiry timeout")
+        except httpx.RequestError as e:
+            logger.error(f"Network error during external biller invoice inquiry: {e}")
+            raise PaymentGatewayException(f"Network error: {e}")
+        except Exception as e:
+            logger.error(f"Error performing external biller invoice inquiry: {e}", exc_info=True)
+            raise PaymentGatewayException(f"Failed to perform external biller invoice inquiry: {e}")
+
+    async def external_biller_invoice_inquiry_async(self,
+                                                    ext_biller_ref_id: str,
+                                                    ext_biller_pan: str,
+                                                    ext_biller_ref_type: str,
+                                                    network: str = "ABS",
+                                                    operation: str = "INV") -> httpx.Response:
+        """Event-loop variant of external_biller_invoice_inquiry()."""
+        try:
+            response = await self._async_client().post(**self._external_biller_invoice_post(
+                ext_biller_ref_id, ext_biller_pan, ext_biller_ref_type, network, operation
+            ))
+
+            _log_response("[EXTERNAL_BILLER_INVOICE_INQUIRY_RESPONSE]", response)
             return response
 
         except httpx.TimeoutException:
@@ -353,4 +541,10 @@ class PaymentGatewayClient:
             raise PaymentGatewayException(f"Network error: {e}")
         except Exception as e:
             logger.error(f"Error performing external biller invoice inquiry: {e}", exc_info=True)
-            raise PaymentGatewayException(f"Failed to perform external biller invoice inquiry: {e}")
\ No newline at end of file
+            raise PaymentGatewayException(f"Failed to perform external biller invoice inquiry: {e}")
+
+
+@lru_cache(maxsize=1)
+def get_payment_gateway_client() -> PaymentGatewayClient:
+    """Process-wide Orchard client shared by the payment services."""
+    return PaymentGatewayClient()
@@ -1,4 +1,4 @@
-import uuid
+import secrets
 from datetime import datetime
 
 
@@ -41,6 +41,6 @@ class UniqueIdGenerator:
     @staticmethod
     def generate() -> int:
         """
-        Generate a positive random long integer using UUID.
+        Generate a positive random long integer (63 random bits, fits a signed BIGINT).
         """
-        return uuid.uuid4().int & ((1 << 63) - 1)
+        return secrets.randbits(63)